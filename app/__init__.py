@@ -1,19 +1,82 @@
-from flask import Flask
+from flask import Flask, jsonify, request, g
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 import os
+import time
+from app.exception import APIError
 
 
 def create_app():
+    from app.config import (
+        MAX_UPLOAD_BYTES,
+        CLIENT_WARMUP,
+        LOG_LEVEL,
+        LOG_FORMAT,
+        TRUSTED_PROXY_HOPS,
+        clients,
+    )
+    from app.utils.log import configure_logging
+    from app.utils.metrics import observe_request
+
+    configure_logging(LOG_LEVEL, LOG_FORMAT)
+
     # 앱 인스턴스 생성
     app = Flask(__name__)
     app.config["JSON_AS_ASCII"] = False
+    app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
+
+    # 신뢰하는 프록시 뒤에서만 X-Forwarded-For 로 remote_addr 를 복원 (요청 한도 키)
+    if TRUSTED_PROXY_HOPS > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
 
     # 리스폰스 헤더용 미들웨어 설정
     @app.after_request
     def add_header(response):
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        # JSON 응답에만 charset 을 명시하고, SSE/오디오 응답은 그대로 둠
+        if response.is_json:
+            response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    # 라우트별 지연 시간과 요청/응답 크기 기록 (스트리밍 응답은 헤더 전송 시점까지)
+    @app.after_request
+    def record_metrics(response):
+        started = g.get("request_started")
+        if started is not None:
+            observe_request(
+                request.method,
+                request.url_rule.rule if request.url_rule else "<unmatched>",
+                response.status_code,
+                time.perf_counter() - started,
+                request.content_length,
+                None if response.is_streamed else response.content_length,
+            )
         return response
 
+    # 업로드 크기 초과(MAX_CONTENT_LENGTH), 잘못된 JSON 본문 등 werkzeug 오류도
+    # APIError 와 같은 JSON 형태로 응답
+    @app.errorhandler(HTTPException)
+    def handle_http_error(error):
+        message = error.description
+        if error.code == 413:
+            message = f"업로드 크기 제한({MAX_UPLOAD_BYTES}바이트)을 초과했습니다"
+        return jsonify({"status": "error", "message": message}), error.code
+
+    # 서비스에서 올라온 APIError 를 상태 코드가 담긴 JSON 으로 변환
+    @app.errorhandler(APIError)
+    def handle_api_error(error):
+        response = jsonify(error.to_dict())
+        # 429 (요청 한도/업스트림 혼잡)는 다시 시도할 시점을 알려줌
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            response.headers["Retry-After"] = str(retry_after)
+        return response, error.status_code
+
     CORS(
         app,
         resources={
@@ -25,9 +88,34 @@ def create_app():
     from app.controllers.text_controller import text_bp
     from app.controllers.audio_controller import audio_bp
     from app.controllers.test_controller import test_bp
+    from app.controllers.health_controller import health_bp
+    from app.controllers.job_controller import job_bp
+    from app.controllers.metrics_controller import metrics_bp
+    from app.controllers.pipeline_controller import pipeline_bp
 
     app.register_blueprint(text_bp)
     app.register_blueprint(audio_bp)
     app.register_blueprint(test_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(job_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(pipeline_bp)
+
+    # 원격 클라이언트와 Kiwi 를 백그라운드에서 미리 연결 (부팅은 막지 않음)
+    if CLIENT_WARMUP:
+        clients.warm_up()
+
+    # 질문 은행을 부팅 시점에 미리 파싱
+    from app.services.test_service import question_bank
+
+    try:
+        question_bank.load()
+    except Exception as e:
+        app.logger.warning(f"Question bank preload failed: {str(e)}")
+
+    # CLI 명령 등록 (flask warm-translations 등)
+    from app.commands import register_commands
+
+    register_commands(app)
 
     return app
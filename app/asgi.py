@@ -0,0 +1,21 @@
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount
+from app import create_app
+from app.config import ASGI_WSGI_WORKERS
+from app.controllers.async_controller import async_routes
+
+
+def create_asgi_app():
+    # 원격 호출 위주 라우트는 asyncio 로 처리하고, 나머지는 기존 Flask 앱으로 전달
+    # Flask 요청은 전용 스레드 풀에서 실행 (SSE 스트림 하나가 스레드 하나를 끝날 때까지 점유)
+    flask_app = WSGIMiddleware(create_app(), workers=ASGI_WSGI_WORKERS)
+
+    return Starlette(
+        routes=[*async_routes(flask_app), Mount("/", app=flask_app)],
+        middleware=[
+            Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+        ],
+    )
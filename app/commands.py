@@ -0,0 +1,66 @@
+import click
+from app.exception import APIError
+
+
+@click.command("warm-translations")
+@click.option("--section", default=None, help="특정 섹션만 번역 (기본값: 전체)")
+def warm_translations_command(section):
+    # Questions.js 의 모든 질문을 미리 번역해 캐시에 저장
+    from app.services.test_service import question_bank
+    from app.services.translation_service import (
+        translate_to_english,
+        is_translation_cached,
+    )
+
+    sections = [section] if section else question_bank.sections()
+    translated = skipped = failed = 0
+
+    for name in sections:
+        for question in question_bank.questions(name):
+            if is_translation_cached(question):
+                skipped += 1
+                continue
+            try:
+                translate_to_english(question)
+                translated += 1
+            except APIError as e:
+                failed += 1
+                click.echo(f"번역 실패: {question} ({e.message})", err=True)
+
+    click.echo(f"translated={translated} cached={skipped} failed={failed}")
+
+
+@click.command("prerender-audio")
+@click.option("--section", default=None, help="특정 섹션만 합성 (기본값: 전체)")
+def prerender_audio_command(section):
+    # 질문 은행의 모든 질문을 번역한 뒤 영어 음성을 미리 합성해 캐시에 저장
+    from app.services.test_service import question_bank
+    from app.services.translation_service import translate_to_english
+    from app.services.audio_service import (
+        audio_cache,
+        audio_cache_key,
+        generate_audio_file,
+    )
+
+    sections = [section] if section else question_bank.sections()
+    rendered = skipped = failed = 0
+
+    for name in sections:
+        for question in question_bank.questions(name):
+            try:
+                english = translate_to_english(question)
+                if audio_cache.get(audio_cache_key(english)):
+                    skipped += 1
+                    continue
+                generate_audio_file(english)
+                rendered += 1
+            except APIError as e:
+                failed += 1
+                click.echo(f"음성 합성 실패: {question} ({e.message})", err=True)
+
+    click.echo(f"rendered={rendered} cached={skipped} failed={failed}")
+
+
+def register_commands(app):
+    app.cli.add_command(warm_translations_command)
+    app.cli.add_command(prerender_audio_command)
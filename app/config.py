@@ -1,17 +1,255 @@
 import os
-from g4f.client import Client as G4FClient
-from gradio_client import Client as GradioClient
-from kiwipiepy import Kiwi
+import tempfile
+from app.utils.clients import ClientRegistry
+from app.utils.resilience import Upstream
+from app.utils.ratelimit import RateLimiter
 
-# 공통 클라이언트 초기화
-g4f_client = G4FClient(api_key="not needed")  # GPT 모델용
-stt_client = GradioClient("mindspark121/Whisper-STT")  # STT 모델용
-tts_client = GradioClient("https://k2-fsa-text-to-speech.hf.space")  # TTS 모델용
-model_client = GradioClient("k2-fsa/text-to-speech")  # 모델 목록 클라이언트
+STT_SPACE = "mindspark121/Whisper-STT"
+TTS_SPACE = "https://k2-fsa-text-to-speech.hf.space"
+CLIENT_WARMUP = os.environ.get("CLIENT_WARMUP", "1") == "1"  # 부팅 후 백그라운드 연결
+CLIENT_RETRY_INTERVAL = 30.0  # 클라이언트 생성 실패 후 재시도 간격(초)
+KIWI_NUM_WORKERS = int(os.environ.get("KIWI_NUM_WORKERS", "-1"))  # -1: 모든 코어
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")  # DEBUG | INFO | WARNING | ERROR | OFF
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")  # text | json
+# ASGI 모드에서 Flask 라우트를 실행하는 스레드 수 (동시에 열 수 있는 SSE/WAV 스트림 상한)
+ASGI_WSGI_WORKERS = int(os.environ.get("ASGI_WSGI_WORKERS", "32"))
 
-# Kiwi 형태소 분석기 초기화
-kiwi = Kiwi()
+# 벤치마크용 가짜 업스트림 (g4f / Gradio Space 대신 로컬 대체 클라이언트 사용)
+FAKE_UPSTREAMS = os.environ.get("FAKE_UPSTREAMS", "0") == "1"
+FAKE_G4F_LATENCY = float(os.environ.get("FAKE_G4F_LATENCY", "0.8"))  # 중앙값(초)
+FAKE_SPACE_LATENCY = float(os.environ.get("FAKE_SPACE_LATENCY", "1.5"))  # 중앙값(초)
+FAKE_LATENCY_SIGMA = float(os.environ.get("FAKE_LATENCY_SIGMA", "0.5"))  # 로그정규 퍼짐
+FAKE_FAILURE_RATE = float(os.environ.get("FAKE_FAILURE_RATE", "0"))  # 0 ~ 1
+
+
+def _fake_latency(latency):
+    from app.utils.fake_clients import LatencyModel
+
+    return LatencyModel(latency, FAKE_LATENCY_SIGMA, FAKE_FAILURE_RATE)
+
+
+def _create_g4f_client():
+    if FAKE_UPSTREAMS:
+        from app.utils.fake_clients import FakeG4FClient
+
+        return FakeG4FClient(_fake_latency(FAKE_G4F_LATENCY))
+
+    from g4f.client import Client as G4FClient
+
+    return G4FClient(api_key="not needed")
+
+
+def _create_g4f_async_client():
+    if FAKE_UPSTREAMS:
+        from app.utils.fake_clients import FakeG4FAsyncClient
+
+        return FakeG4FAsyncClient(_fake_latency(FAKE_G4F_LATENCY))
+
+    from g4f.client import AsyncClient as G4FAsyncClient
+
+    return G4FAsyncClient(api_key="not needed")
+
+
+def _create_gradio_client(space):
+    if FAKE_UPSTREAMS:
+        from app.utils.fake_clients import FakeGradioClient
+
+        return FakeGradioClient(_fake_latency(FAKE_SPACE_LATENCY))
+
+    from gradio_client import Client as GradioClient
+
+    return GradioClient(space)
+
+
+def _create_kiwi():
+    from kiwipiepy import Kiwi
+
+    return Kiwi(num_workers=KIWI_NUM_WORKERS)
+
+
+# 공통 클라이언트는 import 시점이 아니라 처음 사용할 때 생성
+clients = ClientRegistry()
+g4f_client = clients.register("g4f", _create_g4f_client)  # GPT 모델용
+g4f_async_client = clients.register("g4f_async", _create_g4f_async_client)  # ASGI 용
+stt_client = clients.register(  # STT 모델용
+    "stt", lambda: _create_gradio_client(STT_SPACE), CLIENT_RETRY_INTERVAL
+)
+tts_client = clients.register(  # TTS 모델용
+    "tts", lambda: _create_gradio_client(TTS_SPACE), CLIENT_RETRY_INTERVAL
+)
+
+# Kiwi 형태소 분석기 (분석 오류로 모델을 다시 로드하지 않도록 재생성 비활성화)
+kiwi = clients.register("kiwi", _create_kiwi, recreate_on_error=False)
 
 # 설정값
 GPT_MODEL = "gpt-4o-mini"
 JS_PATH = "./app/assets/Questions.js"
+QUESTION_SECTION = "서베이"  # 모의고사 출제 섹션
+QUESTION_BANK_CHECK_INTERVAL = 5.0  # Questions.js 변경 확인 주기(초)
+
+# 일괄 형태소 분석 요청당 최대 텍스트 수
+MAX_BATCH_TEXTS = int(os.environ.get("MAX_BATCH_TEXTS", "1000"))
+
+# 미리 만들어 두는 모의고사 세트 (번역 + TTS 완료). 0 이면 비활성화
+TEST_SESSION_POOL_SIZE = int(os.environ.get("TEST_SESSION_POOL_SIZE", "4"))
+TEST_SESSION_LOW_WATER = int(os.environ.get("TEST_SESSION_LOW_WATER", "2"))  # 이보다 적으면 다시 채움
+TEST_SESSION_CACHE_SIZE = 1024  # 발급한 세션을 다시 조회할 수 있도록 보관하는 개수
+
+# 채점 모드 기본값 (요청마다 "mode" 로 변경 가능)
+# parallel: 답변마다 개별 호출, batch: 모든 답변을 한 번의 호출로 채점
+FEEDBACK_MODE = os.environ.get("FEEDBACK_MODE", "parallel")
+
+# 거의 같은 답변(재제출, STT 재실행 등)은 이전 피드백을 재사용 (MinHash/LSH)
+# 기본은 꺼 둠: 실수를 고친 재제출에 이전 피드백이 돌아가거나, 다른 사용자의 답변을
+# 인용한 피드백이 나갈 수 있음 (README 참고)
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP_ENABLED", "0") == "1"
+NEAR_DUP_THRESHOLD = float(  # 추정 자카드 유사도 기준
+    os.environ.get("NEAR_DUP_THRESHOLD", "0.95")
+)
+NEAR_DUP_INDEX_SIZE = 5000  # 인덱스에 유지할 채점된 답변 수
+NEAR_DUP_NUM_PERM = 128  # MinHash 서명 길이
+NEAR_DUP_BANDS = 32  # LSH 밴드 수 (밴드당 4행, 유사도 0.8 이상이면 후보에 들 확률 ~100%)
+NEAR_DUP_SHINGLE_SIZE = 3  # 형태소 n-gram 크기
+
+# 업로드 크기 제한 (multipart/원본 오디오/JSON 공통)
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(64 * 1024 * 1024)))
+
+# 원격 호출 병렬 처리 설정
+FANOUT_MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "4"))  # 동시 호출 수
+UPSTREAM_CALL_TIMEOUT = float(os.environ.get("UPSTREAM_CALL_TIMEOUT", "60"))  # 초
+
+# 캐시 설정
+CACHE_DIR = os.environ.get(
+    "CACHE_DIR", os.path.join(tempfile.gettempdir(), "opic-magician")
+)
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "cache.sqlite3")
+TRANSLATION_CACHE_SIZE = 2048  # 메모리에 유지할 번역 개수
+ANALYSIS_CACHE_SIZE = 1024  # 메모리에 유지할 형태소 분석 결과 개수
+ANALYSIS_MAX_TOP_K = 100  # 품사별로 요청할 수 있는 최대 상위 단어 수
+SENTENCE_CACHE_SIZE = 512  # 메모리에 유지할 만능문장 생성 결과 개수
+SENTENCE_REPAIR_RETRIES = 1  # 형식이 깨진 문장 응답을 모델에 다시 고쳐 달라고 요청하는 횟수
+# 학습자별 어휘 프로필 (임시 캐시와 달리 유지해야 하므로 경로를 따로 지정 가능)
+PROFILE_DB_PATH = os.environ.get(
+    "PROFILE_DB_PATH", os.path.join(CACHE_DIR, "profiles.sqlite3")
+)
+PROFILE_TOP_K = 20  # 품사별로 미리 계산해 두는 상위 단어 수
+PROFILE_HALF_LIFE_DAYS = float(  # 0 이면 감쇠 없이 누적
+    os.environ.get("PROFILE_HALF_LIFE_DAYS", "0")
+)
+AUDIO_CACHE_DIR = os.path.join(CACHE_DIR, "audio")
+AUDIO_CACHE_MAX_BYTES = int(
+    os.environ.get("AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# 스트리밍 STT 세션 설정
+STT_STREAM_SAMPLE_RATE = 16000  # 청크 기본 샘플레이트 (16-bit 모노 PCM)
+STT_STREAM_WORKERS = int(os.environ.get("STT_STREAM_WORKERS", "4"))
+STT_SESSION_TTL = 600.0  # 마지막 청크 이후 세션 보관 시간(초)
+STT_MAX_SESSIONS = int(os.environ.get("STT_MAX_SESSIONS", "200"))  # 동시에 열 수 있는 세션 수 (0 이면 제한 없음)
+
+# STT 전처리 설정 (WAV 업로드를 16kHz 모노로 줄인 뒤 전송)
+STT_PREPROCESS = os.environ.get("STT_PREPROCESS", "1") == "1"
+STT_TARGET_SAMPLE_RATE = 16000  # Whisper 입력 샘플레이트
+STT_MAX_DURATION = float(os.environ.get("STT_MAX_DURATION", "600"))  # 초
+
+# 비동기 작업 큐 설정
+JOB_STORE = os.environ.get("JOB_STORE", "sqlite")  # sqlite | memory
+JOB_DB_PATH = os.path.join(CACHE_DIR, "jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_TTL = 3600.0  # 완료된 작업 결과 보관 시간(초)
+# callback_url 로 허용할 호스트 (쉼표 구분). 비어 있으면 공인 IP 로 조회되는 호스트만 허용
+JOB_CALLBACK_ALLOWED_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.environ.get("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+)
+
+# TTS 설정
+TTS_LANGUAGE = "English"
+TTS_REPO_ID = "csukuangfj/kokoro-en-v0_19|11 speakers"
+TTS_SID = "0"
+TTS_SPEED = 1.0
+# 긴 텍스트는 문장 단위로 나눠 병렬 합성 (chunked 모드, /generate-audio/stream)
+TTS_CHUNK_MAX_CHARS = 300  # 한 번에 합성할 최대 글자 수
+TTS_CHUNK_MIN_CHARS = 40  # 이보다 짧은 문장은 다음 문장과 합쳐서 합성
+TTS_CHUNK_WORKERS = int(os.environ.get("TTS_CHUNK_WORKERS", "4"))  # 동시 합성 수
+
+# 업스트림 복원력 설정 (시도별 타임아웃, 지터 재시도, 서킷 브레이커, 대체 공급자)
+G4F_FALLBACK_MODELS = [  # GPT_MODEL 실패 시 순서대로 시도할 모델
+    model.strip()
+    for model in os.environ.get("G4F_FALLBACK_MODELS", "").split(",")
+    if model.strip()
+]
+STT_FALLBACK_SPACE = os.environ.get("STT_FALLBACK_SPACE")  # 예비 Whisper Space
+TTS_FALLBACK_SPACE = os.environ.get("TTS_FALLBACK_SPACE")  # 같은 API 의 예비 TTS Space
+G4F_TIMEOUT = float(os.environ.get("G4F_TIMEOUT", "30"))  # 시도당 타임아웃(초)
+SPACE_TIMEOUT = float(os.environ.get("SPACE_TIMEOUT", "45"))  # 시도당 타임아웃(초)
+UPSTREAM_RETRIES = int(os.environ.get("UPSTREAM_RETRIES", "1"))  # 공급자별 재시도 횟수
+UPSTREAM_BACKOFF = 0.5  # 재시도 대기 기준(초), 0 ~ backoff * 2^n 에서 무작위
+BREAKER_FAILURE_THRESHOLD = 5  # 연속 실패 시 차단
+BREAKER_RESET_TIMEOUT = 30.0  # 차단 후 시험 호출까지 대기(초)
+
+# 업스트림 허용 제어: 공급자별 동시 호출 상한 (0 이면 제한 없음, 워커 프로세스마다 적용)
+G4F_MAX_CONCURRENCY = int(os.environ.get("G4F_MAX_CONCURRENCY", "8"))
+STT_MAX_CONCURRENCY = int(os.environ.get("STT_MAX_CONCURRENCY", "4"))
+TTS_MAX_CONCURRENCY = int(os.environ.get("TTS_MAX_CONCURRENCY", "4"))
+ADMISSION_MAX_WAIT = float(  # 이보다 오래 기다려야 하면 바로 429
+    os.environ.get("ADMISSION_MAX_WAIT", "10")
+)
+
+# 클라이언트(IP)별 요청 한도 (토큰 버킷, 0 이면 제한 없음)
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "40"))
+RATE_LIMIT_MAX_CLIENTS = 10000  # 메모리에 유지할 클라이언트 버킷 수
+# 앞단의 신뢰하는 리버스 프록시 수. 0 이면 X-Forwarded-For 를 무시하고 접속 주소로 구분
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+rate_limiter = RateLimiter(
+    RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS
+)
+
+
+def _create_upstream(name, providers, timeout, max_concurrency):
+    return Upstream(
+        name,
+        providers,
+        timeout=timeout,
+        deadline=UPSTREAM_CALL_TIMEOUT,
+        retries=UPSTREAM_RETRIES,
+        backoff=UPSTREAM_BACKOFF,
+        failure_threshold=BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+        max_concurrency=max_concurrency,
+        max_wait=ADMISSION_MAX_WAIT,
+    )
+
+
+def _space_providers(name, space, client, fallback_space):
+    providers = {space: client}
+    if fallback_space:
+        providers[fallback_space] = clients.register(
+            f"{name}_fallback",
+            lambda: _create_gradio_client(fallback_space),
+            CLIENT_RETRY_INTERVAL,
+        )
+    return providers
+
+
+# 모든 원격 호출은 아래 업스트림을 거쳐 실행 (g4f 는 모델 이름, Space 는 클라이언트가 공급자)
+g4f_upstream = _create_upstream(
+    "g4f",
+    {model: model for model in [GPT_MODEL, *G4F_FALLBACK_MODELS]},
+    G4F_TIMEOUT,
+    G4F_MAX_CONCURRENCY,
+)
+stt_upstream = _create_upstream(
+    "stt",
+    _space_providers("stt", STT_SPACE, stt_client, STT_FALLBACK_SPACE),
+    SPACE_TIMEOUT,
+    STT_MAX_CONCURRENCY,
+)
+tts_upstream = _create_upstream(
+    "tts",
+    _space_providers("tts", TTS_SPACE, tts_client, TTS_FALLBACK_SPACE),
+    SPACE_TIMEOUT,
+    TTS_MAX_CONCURRENCY,
+)
@@ -0,0 +1,257 @@
+import json
+import time
+import logging
+import mimetypes
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.services.text_service import generate_sentences_async
+from app.services.test_service import get_test_questions_async, get_feedback_async
+from app.services.audio_service import (
+    generate_audio_async,
+    generate_chunked_audio_async,
+    transcribe_audio_async,
+    transcribe_chunks_async,
+)
+from app.config import rate_limiter, TRUSTED_PROXY_HOPS, MAX_UPLOAD_BYTES
+from app.utils.metrics import observe_request
+from app.utils.ratelimit import client_key
+from app.utils.admission import priority
+from app.exception import ValidationError, APIError, PayloadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEndpoint:
+    # 비동기 서비스로 처리할 수 있는 요청만 가로채고, 나머지는 Flask(WSGI) 앱으로 넘김
+    def __init__(
+        self,
+        handler,
+        fallback,
+        accepts=None,
+        error_message="",
+        cost=1,
+        priority_class="normal",
+    ):
+        self.handler = handler
+        self.fallback = fallback
+        self.accepts = accepts
+        self.error_message = error_message
+        self.cost = cost
+        self.priority_class = priority_class
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        if self.accepts is not None and not self.accepts(request):
+            await self.fallback(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            # Flask 라우트와 같은 클라이언트별 요청 한도 / 업스트림 우선순위 적용
+            client = request.client.host if request.client else None
+            rate_limiter.check(
+                client_key(
+                    client, request.headers.get("x-forwarded-for"), TRUSTED_PROXY_HOPS
+                ),
+                self.cost,
+            )
+            with priority(self.priority_class):
+                response = JSONResponse(await self.handler(request))
+        except ValidationError as e:
+            logger.warning("Validation error", extra={"error": str(e)})
+            response = JSONResponse({"status": "error", "message": str(e)}, 400)
+        except APIError as e:
+            response = JSONResponse(e.to_dict(), e.status_code)
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after:
+                response.headers["Retry-After"] = str(retry_after)
+        except Exception as e:
+            logger.error("Async endpoint error", extra={"error": str(e)})
+            error = APIError(f"{self.error_message}: {str(e)}")
+            response = JSONResponse(error.to_dict(), error.status_code)
+
+        content_length = request.headers.get("content-length")
+        observe_request(
+            request.method,
+            scope["path"],
+            response.status_code,
+            time.perf_counter() - started,
+            int(content_length) if content_length else None,
+            len(response.body),
+        )
+        await response(scope, receive, send)
+
+
+def is_sync_only(request):
+    # 작업 큐(?async=1), 스트리밍, WAV 바이너리 응답은 기존 Flask 라우트가 처리
+    if request.query_params.get("async", "").lower() in ("1", "true"):
+        return True
+    if "respond-async" in request.headers.get("prefer", ""):
+        return True
+    return False
+
+
+def accepts_json(request):
+    return not is_sync_only(request)
+
+
+def accepts_generate_audio(request):
+    if is_sync_only(request) or request.query_params.get("format") == "wav":
+        return False
+    return "audio/wav" not in request.headers.get("accept", "")
+
+
+def accepts_transcribe(request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if is_sync_only(request) or content_type == "multipart/form-data":
+        return False
+    return True
+
+
+def upload_too_large():
+    return PayloadTooLargeError(f"업로드 크기 제한({MAX_UPLOAD_BYTES}바이트)을 초과했습니다")
+
+
+def check_content_length(request):
+    # Flask 의 MAX_CONTENT_LENGTH 와 같은 상한: 본문을 읽기 전에 Content-Length 로 거절
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_UPLOAD_BYTES:
+        raise upload_too_large()
+
+
+async def read_body(request):
+    # Content-Length 가 없거나 틀린 경우(chunked 전송)를 위해 읽으면서도 크기를 확인
+    check_content_length(request)
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_UPLOAD_BYTES:
+            raise upload_too_large()
+    return bytes(body)
+
+
+async def read_json(request):
+    body = await read_body(request)
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValidationError("올바른 JSON 본문이 아닙니다")
+    if not isinstance(data, dict):
+        raise ValidationError("올바른 JSON 본문이 아닙니다")
+    return data
+
+
+async def get_test_questions_handler(request):
+    return await get_test_questions_async()
+
+
+async def get_feedback_handler(request):
+    data = await read_json(request)
+    answers = data.get("answers")
+    if not answers:
+        raise ValidationError("답변이 제공되지 않았습니다")
+
+    return await get_feedback_async(answers, data.get("mode"))
+
+
+async def generate_sentences_handler(request):
+    data = await read_json(request)
+    analysis = data.get("analysis", {})
+    learner_id = data.get("learner_id")
+    if not analysis and learner_id is None:
+        raise ValidationError("분석 데이터가 제공되지 않았습니다")
+
+    return await generate_sentences_async(analysis, learner_id)
+
+
+async def generate_audio_handler(request):
+    data = await read_json(request)
+    text = data.get("text")
+    if not text:
+        raise ValidationError("텍스트가 제공되지 않았습니다")
+
+    if data.get("chunked") or request.query_params.get("chunked", "").lower() in (
+        "1",
+        "true",
+    ):
+        return await generate_chunked_audio_async(text)
+    return await generate_audio_async(text)
+
+
+async def transcribe_handler(request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    # audio/* 원본 바이너리 업로드는 청크 단위로 디스크에 기록
+    if content_type.startswith("audio/") or content_type == "application/octet-stream":
+        suffix = ".wav"
+        if content_type.startswith("audio/"):
+            suffix = mimetypes.guess_extension(content_type) or suffix
+        check_content_length(request)
+        return await transcribe_chunks_async(
+            request.stream(), suffix=suffix, max_bytes=MAX_UPLOAD_BYTES
+        )
+
+    data = await read_json(request)
+    if "audio" not in data:
+        raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+
+    return await transcribe_audio_async(data["audio"])
+
+
+def async_routes(fallback):
+    from starlette.routing import Route
+
+    return [
+        Route(
+            "/get-test-questions",
+            AsyncEndpoint(
+                get_test_questions_handler,
+                fallback,
+                accepts_json,
+                "테스트 질문을 가져오는 중 오류가 발생했습니다",
+            ),
+            methods=["GET"],
+        ),
+        Route(
+            "/get-feedback",
+            AsyncEndpoint(
+                get_feedback_handler,
+                fallback,
+                accepts_json,
+                "피드백을 생성하는 중 오류가 발생했습니다",
+                cost=4,
+            ),
+            methods=["POST"],
+        ),
+        Route(
+            "/generate-sentences",
+            AsyncEndpoint(
+                generate_sentences_handler,
+                fallback,
+                accepts_json,
+                "문장 생성 중 오류가 발생했습니다",
+            ),
+            methods=["POST"],
+        ),
+        Route(
+            "/generate-audio",
+            AsyncEndpoint(
+                generate_audio_handler,
+                fallback,
+                accepts_generate_audio,
+                "오디오 생성 중 오류가 발생했습니다",
+            ),
+            methods=["POST"],
+        ),
+        Route(
+            "/transcribe",
+            AsyncEndpoint(
+                transcribe_handler,
+                fallback,
+                accepts_transcribe,
+                "오디오 변환 중 오류가 발생했습니다",
+                priority_class="interactive",
+            ),
+            methods=["POST"],
+        ),
+    ]
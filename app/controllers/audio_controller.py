@@ -1,45 +1,224 @@
-from flask import Blueprint, request, jsonify, current_app
-from app.services.audio_service import generate_audio, transcribe_audio
+import os
+import mimetypes
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    current_app,
+    send_file,
+    stream_with_context,
+)
+from werkzeug.exceptions import HTTPException
+from app.services.audio_service import (
+    generate_audio,
+    generate_audio_file,
+    generate_chunked_audio,
+    generate_chunked_audio_file,
+    stream_chunked_audio,
+    transcribe_audio,
+    save_upload,
+    transcribe_temp_file,
+)
+from app.services.stream_stt_service import (
+    create_session,
+    add_session_chunk,
+    get_session_transcript,
+    finish_session,
+)
+from app.controllers.job_controller import async_requested, enqueue
+from app.config import rate_limiter
+from app.utils.ratelimit import rate_limited
 from app.exception import ValidationError, APIError
 
 audio_bp = Blueprint("audio", __name__)
 
 
-@audio_bp.route("/generate-audio", methods=["POST"])
-def generate_audio_route():
-    try:
+def wants_raw_audio():
+    # ?format=wav 또는 Accept: audio/wav 요청이면 base64 JSON 대신 WAV 바이너리로 응답
+    if request.args.get("format") == "wav":
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", "audio/wav"])
+    return best == "audio/wav" and request.accept_mimetypes["audio/wav"] > 0
+
+
+def read_audio_request():
+    # (text, chunked): GET 은 쿼리 문자열, POST 는 JSON 본문에서 읽음
+    if request.method == "GET":
+        text = request.args.get("text")
+        chunked = request.args.get("chunked", "").lower() in ("1", "true")
+    else:
         data = request.json
         text = data.get("text")
+        chunked = bool(data.get("chunked")) or request.args.get(
+            "chunked", ""
+        ).lower() in ("1", "true")
+
+    if not text:
+        raise ValidationError("텍스트가 제공되지 않았습니다")
+    return text, chunked
+
+
+@audio_bp.route("/generate-audio", methods=["GET", "POST"])
+@rate_limited(rate_limiter)
+def generate_audio_route():
+    try:
+        # GET 은 <audio src> 에서 바로 재생할 수 있도록 항상 WAV 로 응답 (Range 지원)
+        # chunked 면 문장 단위로 나눠 병렬 합성한 뒤 하나의 WAV 로 이어 붙임
+        text, chunked = read_audio_request()
 
-        if not text:
-            raise ValidationError("텍스트가 제공되지 않았습니다")
+        if request.method == "POST" and async_requested():
+            func = generate_chunked_audio if chunked else generate_audio
+            return enqueue("generate-audio", func, text)
 
-        result = generate_audio(text)
+        if request.method == "GET" or wants_raw_audio():
+            if chunked:
+                audio_path = generate_chunked_audio_file(text)
+            else:
+                audio_path = generate_audio_file(text)
+            return send_file(audio_path, mimetype="audio/wav", conditional=True)
+
+        result = generate_chunked_audio(text) if chunked else generate_audio(text)
         return jsonify(result)
     except ValidationError as e:
         current_app.logger.error(f"Validation error: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
-    except APIError:
+    except (APIError, HTTPException):
         raise
     except Exception as e:
         current_app.logger.error(f"Generate audio error: {str(e)}")
         raise APIError(f"오디오 생성 중 오류가 발생했습니다: {str(e)}")
 
 
+@audio_bp.route("/generate-audio/stream", methods=["GET", "POST"])
+@rate_limited(rate_limiter)
+def stream_audio_route():
+    try:
+        # 문장 단위 병렬 합성 결과를 첫 문장이 준비되는 대로 WAV 스트림으로 전송
+        text, _ = read_audio_request()
+
+        cached_path, chunks = stream_chunked_audio(text)
+        if cached_path:
+            return send_file(cached_path, mimetype="audio/wav", conditional=True)
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype="audio/wav",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Stream audio error: {str(e)}")
+        raise APIError(f"오디오 생성 중 오류가 발생했습니다: {str(e)}")
+
+
+def transcribe_upload(stream, suffix):
+    # 업로드는 응답 전에 디스크에 저장해 두고, 비동기 모드면 작업 큐에서 변환
+    temp_path = save_upload(stream, suffix)
+    if async_requested():
+        return enqueue("transcribe", transcribe_temp_file, temp_path)
+    return jsonify(transcribe_temp_file(temp_path))
+
+
 @audio_bp.route("/transcribe", methods=["POST"])
+@rate_limited(rate_limiter, priority_class="interactive")
 def transcribe_audio_route():
     try:
+        # multipart/form-data 업로드
+        if request.mimetype == "multipart/form-data":
+            upload = request.files.get("audio")
+            if not upload:
+                raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+            suffix = os.path.splitext(upload.filename or "")[1] or ".wav"
+            return transcribe_upload(upload.stream, suffix)
+
+        # audio/* 원본 바이너리 업로드
+        if request.mimetype.startswith("audio/") or (
+            request.mimetype == "application/octet-stream"
+        ):
+            suffix = ".wav"
+            if request.mimetype.startswith("audio/"):
+                suffix = mimetypes.guess_extension(request.mimetype) or suffix
+            return transcribe_upload(request.stream, suffix)
+
+        # 기존 JSON/base64 업로드
         data = request.json
         if not data or "audio" not in data:
             raise ValidationError("오디오 데이터가 제공되지 않았습니다")
 
+        if async_requested():
+            return enqueue("transcribe", transcribe_audio, data["audio"])
+
         result = transcribe_audio(data["audio"])
         return jsonify(result)
     except ValidationError as e:
         current_app.logger.error(f"Validation error: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
-    except APIError:
+    except (APIError, HTTPException):
         raise
     except Exception as e:
         current_app.logger.error(f"Transcription error: {str(e)}")
         raise APIError(f"오디오 변환 중 오류가 발생했습니다: {str(e)}")
+
+
+@audio_bp.route("/transcribe/sessions", methods=["POST"])
+@rate_limited(rate_limiter)
+def create_transcription_session_route():
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(create_session(data.get("sample_rate"))), 201
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Create transcription session error: {str(e)}")
+        raise APIError(f"전사 세션 생성 중 오류가 발생했습니다: {str(e)}")
+
+
+@audio_bp.route("/transcribe/sessions/<session_id>/chunks", methods=["POST"])
+@rate_limited(rate_limiter, priority_class="interactive")
+def add_transcription_chunk_route(session_id):
+    try:
+        # 녹음 중에 16-bit 모노 PCM(또는 WAV) 청크를 계속 전송
+        result = add_session_chunk(session_id, request.get_data())
+        return jsonify(result)
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Transcription chunk error: {str(e)}")
+        raise APIError(f"오디오 청크 처리 중 오류가 발생했습니다: {str(e)}")
+
+
+@audio_bp.route("/transcribe/sessions/<session_id>", methods=["GET"])
+def get_transcription_session_route(session_id):
+    try:
+        return jsonify(get_session_transcript(session_id))
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Get transcription session error: {str(e)}")
+        raise APIError(f"전사 결과를 가져오는 중 오류가 발생했습니다: {str(e)}")
+
+
+@audio_bp.route("/transcribe/sessions/<session_id>/finish", methods=["POST"])
+@rate_limited(rate_limiter, priority_class="interactive")
+def finish_transcription_session_route(session_id):
+    try:
+        return jsonify(finish_session(session_id))
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Finish transcription session error: {str(e)}")
+        raise APIError(f"전사 세션 종료 중 오류가 발생했습니다: {str(e)}")
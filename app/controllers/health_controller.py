@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+from app.config import clients
+from app.utils.singleflight import singleflight_stats
+from app.utils.resilience import upstream_stats
+from app.services.test_service import test_session_pool
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("/health", methods=["GET"])
+def health_route():
+    status = clients.health()
+    ready = all(client["status"] == "ready" for client in status.values())
+    return jsonify(
+        {
+            "status": "ok" if ready else "degraded",
+            "clients": status,
+            "upstreams": upstream_stats(),
+            "singleflight": singleflight_stats(),
+            "test_session_pool": test_session_pool.stats(),
+        }
+    )
@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify, current_app, url_for
+from werkzeug.exceptions import HTTPException
+from app.services.job_service import submit_job, get_job
+from app.utils.admission import run_with_priority
+from app.exception import ValidationError, APIError
+
+job_bp = Blueprint("jobs", __name__)
+
+
+def async_requested():
+    # ?async=1 또는 Prefer: respond-async 헤더가 있으면 작업 큐로 처리
+    if request.args.get("async", "").lower() in ("1", "true"):
+        return True
+    return "respond-async" in request.headers.get("Prefer", "")
+
+
+def enqueue(kind, func, *args):
+    data = request.get_json(silent=True)
+    callback_url = request.args.get("callback_url") or (
+        data.get("callback_url") if isinstance(data, dict) else None
+    )
+
+    # 작업 큐는 바로 응답을 기다리는 요청보다 뒤로 밀리도록 batch 우선순위로 실행
+    job = submit_job(
+        kind, run_with_priority, "batch", func, *args, callback_url=callback_url
+    )
+    status_url = url_for("jobs.get_job_route", job_id=job["id"])
+    response = jsonify(
+        {"job_id": job["id"], "status": job["status"], "status_url": status_url}
+    )
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
+
+
+@job_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job_route(job_id):
+    try:
+        job = get_job(job_id)
+        job.pop("callback_url", None)
+        return jsonify(job)
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Get job error: {str(e)}")
+        raise APIError(f"작업 상태를 가져오는 중 오류가 발생했습니다: {str(e)}")
@@ -0,0 +1,55 @@
+from flask import Blueprint, Response
+from app.config import clients
+from app.services.translation_service import translation_cache
+from app.services.text_service import analysis_cache
+from app.services.audio_service import audio_cache
+from app.services.test_service import feedback_index
+from app.utils.metrics import metrics, cache_collector
+from app.utils.singleflight import singleflight_stats
+
+metrics_bp = Blueprint("metrics", __name__)
+
+metrics.register_collector(
+    cache_collector(
+        {
+            "translation": translation_cache.memory,
+            "analysis": analysis_cache,
+            "audio": audio_cache,
+            "feedback_near_duplicate": feedback_index,
+        }
+    )
+)
+
+
+@metrics.register_collector
+def collect_runtime():
+    # 원격 클라이언트 연결 상태와 single-flight 합치기 현황
+    stats = singleflight_stats()
+    return [
+        (
+            "upstream_client_ready",
+            "gauge",
+            "1 if the upstream client is connected",
+            [
+                ({"client": name}, int(status["status"] == "ready"))
+                for name, status in clients.health().items()
+            ],
+        ),
+        (
+            "singleflight_calls_total",
+            "counter",
+            "Upstream calls actually executed per single-flight group",
+            [({"group": name}, group["calls"]) for name, group in stats.items()],
+        ),
+        (
+            "singleflight_coalesced_total",
+            "counter",
+            "Calls that reused another in-flight call's result",
+            [({"group": name}, group["coalesced"]) for name, group in stats.items()],
+        ),
+    ]
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics_route():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,65 @@
+import os
+import mimetypes
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import HTTPException
+from app.services.audio_service import save_upload, save_base64_upload
+from app.services.pipeline_service import stream_answer_pipeline, remove_upload
+from app.utils.sse import sse_response
+from app.config import rate_limiter
+from app.utils.ratelimit import rate_limited
+from app.utils.admission import iter_with_priority
+from app.exception import ValidationError, APIError
+
+pipeline_bp = Blueprint("pipeline", __name__)
+
+
+def save_pipeline_upload():
+    # (임시 파일 경로, 옵션): /transcribe 와 같은 세 가지 업로드 방식을 지원
+    # multipart/form-data 업로드 (옵션은 폼 필드)
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("audio")
+        if not upload:
+            raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+        suffix = os.path.splitext(upload.filename or "")[1] or ".wav"
+        return save_upload(upload.stream, suffix), request.form
+
+    # audio/* 원본 바이너리 업로드 (옵션은 쿼리 문자열)
+    if request.mimetype.startswith("audio/") or (
+        request.mimetype == "application/octet-stream"
+    ):
+        suffix = ".wav"
+        if request.mimetype.startswith("audio/"):
+            suffix = mimetypes.guess_extension(request.mimetype) or suffix
+        return save_upload(request.stream, suffix), request.args
+
+    # JSON/base64 업로드
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or "audio" not in data:
+        raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+    return save_base64_upload(data["audio"]), data
+
+
+@pipeline_bp.route("/pipeline/answer", methods=["POST"])
+@rate_limited(rate_limiter, cost=4, priority_class="interactive")
+def answer_pipeline_route():
+    try:
+        # 녹음 한 번으로 전사 → 분석 → 피드백/만능문장을 단계별 SSE 이벤트로 전송
+        audio_path, options = save_pipeline_upload()
+        events = stream_answer_pipeline(
+            audio_path,
+            options.get("question"),
+            options.get("mode"),
+            options.get("learner_id"),
+        )
+        response = sse_response(iter_with_priority("interactive", events))
+        # 클라이언트가 첫 이벤트 전에 끊어도 업로드 파일이 남지 않도록 응답 종료 시 삭제
+        response.call_on_close(lambda: remove_upload(audio_path))
+        return response
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Answer pipeline error: {str(e)}")
+        raise APIError(f"답변 처리 중 오류가 발생했습니다: {str(e)}")
@@ -1,39 +1,92 @@
 from flask import Blueprint, request, jsonify, current_app
-from app.services.test_service import get_test_questions, get_feedback
+from werkzeug.exceptions import HTTPException
+from app.services.test_service import (
+    get_test_questions,
+    get_test_session,
+    get_feedback,
+    stream_feedback,
+    validate_feedback_mode,
+)
+from app.utils.sse import sse_response
+from app.controllers.job_controller import async_requested, enqueue
+from app.config import rate_limiter
+from app.utils.ratelimit import rate_limited
 from app.exception import ValidationError, APIError
 
 test_bp = Blueprint("test", __name__)
 
 
 @test_bp.route("/get-test-questions", methods=["GET"])
+@rate_limited(rate_limiter)
 def get_test_questions_route():
     try:
+        if async_requested():
+            return enqueue("get-test-questions", get_test_questions)
+
         questions = get_test_questions()
         return jsonify(questions)
     except ValidationError as e:
         current_app.logger.error(f"Validation error: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
-    except APIError:
+    except (APIError, HTTPException):
         raise
     except Exception as e:
         current_app.logger.error(f"Get test questions error: {str(e)}")
         raise APIError(f"테스트 질문을 가져오는 중 오류가 발생했습니다: {str(e)}")
 
 
+@test_bp.route("/test-sessions/<session_id>", methods=["GET"])
+def get_test_session_route(session_id):
+    try:
+        return jsonify(get_test_session(session_id))
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Get test session error: {str(e)}")
+        raise APIError(f"테스트 세션을 가져오는 중 오류가 발생했습니다: {str(e)}")
+
+
 @test_bp.route("/get-feedback", methods=["POST"])
+@rate_limited(rate_limiter, cost=4)
 def get_feedback_route():
     try:
-        answers = request.json.get("answers")
+        data = request.json
+        answers = data.get("answers")
         if not answers:
             raise ValidationError("답변이 제공되지 않았습니다")
 
-        result = get_feedback(answers)
+        # "mode": "batch" 면 모든 답변을 한 번의 호출로 채점 (기본값은 FEEDBACK_MODE)
+        mode = validate_feedback_mode(data.get("mode"))
+
+        if async_requested():
+            return enqueue("get-feedback", get_feedback, answers, mode)
+
+        result = get_feedback(answers, mode)
         return jsonify(result)
     except ValidationError as e:
         current_app.logger.error(f"Validation error: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
-    except APIError:
+    except (APIError, HTTPException):
         raise
     except Exception as e:
         current_app.logger.error(f"Get feedback error: {str(e)}")
         raise APIError(f"피드백을 생성하는 중 오류가 발생했습니다: {str(e)}")
+
+
+@test_bp.route("/get-feedback/stream", methods=["POST"])
+@rate_limited(rate_limiter, cost=4)
+def stream_feedback_route():
+    try:
+        answers = request.json.get("answers")
+        if not answers:
+            raise ValidationError("답변이 제공되지 않았습니다")
+
+        return sse_response(stream_feedback(answers))
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Stream feedback error: {str(e)}")
+        raise APIError(f"피드백을 생성하는 중 오류가 발생했습니다: {str(e)}")
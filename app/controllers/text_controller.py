@@ -1,5 +1,19 @@
 from flask import Blueprint, request, jsonify, current_app
-from app.services.text_service import analyze_text, generate_sentences
+from werkzeug.exceptions import HTTPException
+from app.services.text_service import (
+    analyze_text,
+    analyze_texts,
+    stream_analyze_texts,
+    generate_sentences,
+    stream_sentences,
+    record_learner_text,
+    get_learner_profile,
+)
+from app.utils.sse import sse_response
+from app.controllers.job_controller import async_requested, enqueue
+from app.utils.ndjson import NDJSON_MIMETYPES, parse_ndjson, ndjson_response
+from app.config import rate_limiter
+from app.utils.ratelimit import rate_limited
 from app.exception import ValidationError, APIError
 
 text_bp = Blueprint("text", __name__)
@@ -14,34 +28,131 @@ def analyze_text_route():
         if not text:
             raise ValidationError("텍스트가 제공되지 않았습니다")
 
-        result = analyze_text(text)
+        # 선택 옵션: 품사별 상위 단어 수와 필요한 품사 태그만 요청
+        result = analyze_text(
+            text, top_k=data.get("top_k"), pos_filter=data.get("pos_filter")
+        )
+
+        # learner_id 가 있으면 학습자 어휘 프로필에 누적
+        learner_id = data.get("learner_id")
+        if learner_id is not None:
+            profile = record_learner_text(learner_id, text)
+            result["learner"] = {
+                key: profile[key] for key in ("learner_id", "text_count", "merged")
+            }
         return jsonify(result)
     except ValidationError as e:
         current_app.logger.error(f"Validation error: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
-    except APIError:
+    except (APIError, HTTPException):
         raise
     except Exception as e:
         current_app.logger.error(f"Analyze text error: {str(e)}")
         raise APIError(f"텍스트 분석 중 오류가 발생했습니다: {str(e)}")
 
 
+@text_bp.route("/analyze-text/batch", methods=["POST"])
+def analyze_texts_route():
+    try:
+        # NDJSON 본문이면 텍스트마다 한 줄씩 결과를 스트리밍
+        if request.mimetype in NDJSON_MIMETYPES:
+            lines = parse_ndjson(request.get_data(as_text=True))
+            texts = [
+                line.get("text") if isinstance(line, dict) else line for line in lines
+            ]
+            top_k = request.args.get("top_k", type=int)
+            pos_filter = request.args.get("pos_filter")
+            if pos_filter is not None:
+                pos_filter = [pos for pos in pos_filter.split(",") if pos]
+            return ndjson_response(stream_analyze_texts(texts, top_k, pos_filter))
+
+        data = request.json
+        texts = data.get("texts")
+
+        if not texts:
+            raise ValidationError("분석할 텍스트 목록이 제공되지 않았습니다")
+
+        result = analyze_texts(
+            texts, top_k=data.get("top_k"), pos_filter=data.get("pos_filter")
+        )
+        return jsonify(result)
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Analyze texts error: {str(e)}")
+        raise APIError(f"텍스트 분석 중 오류가 발생했습니다: {str(e)}")
+
+
 @text_bp.route("/generate-sentences", methods=["POST"])
+@rate_limited(rate_limiter)
 def generate_sentences_route():
     try:
         data = request.json
         analysis = data.get("analysis", {})
+        learner_id = data.get("learner_id")
 
-        if not analysis:
+        # analysis 대신 learner_id 를 주면 누적 프로필의 상위 단어로 생성
+        if not analysis and learner_id is None:
             raise ValidationError("분석 데이터가 제공되지 않았습니다")
 
-        result = generate_sentences(analysis)
+        if async_requested():
+            return enqueue(
+                "generate-sentences", generate_sentences, analysis, learner_id
+            )
+
+        result = generate_sentences(analysis, learner_id)
         return jsonify(result)
     except ValidationError as e:
         current_app.logger.error(f"Validation error: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
-    except APIError:
+    except (APIError, HTTPException):
         raise
     except Exception as e:
         current_app.logger.error(f"Generate sentences error: {str(e)}")
         raise APIError(f"문장 생성 중 오류가 발생했습니다: {str(e)}")
+
+
+@text_bp.route("/generate-sentences/stream", methods=["POST"])
+@rate_limited(rate_limiter)
+def stream_sentences_route():
+    try:
+        data = request.json
+        analysis = data.get("analysis", {})
+        learner_id = data.get("learner_id")
+
+        if not analysis and learner_id is None:
+            raise ValidationError("분석 데이터가 제공되지 않았습니다")
+
+        return sse_response(stream_sentences(analysis, learner_id))
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Stream sentences error: {str(e)}")
+        raise APIError(f"문장 생성 중 오류가 발생했습니다: {str(e)}")
+
+
+@text_bp.route("/learners/<learner_id>/profile", methods=["GET"])
+def get_learner_profile_route(learner_id):
+    try:
+        # 누적 어휘 프로필 (품사별 상위 단어, 감쇠 적용 점수)
+        pos_filter = request.args.get("pos_filter")
+        if pos_filter is not None:
+            pos_filter = [pos for pos in pos_filter.split(",") if pos]
+        result = get_learner_profile(
+            learner_id, request.args.get("top_k", type=int), pos_filter
+        )
+        return jsonify(result)
+    except ValidationError as e:
+        current_app.logger.error(f"Validation error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except (APIError, HTTPException):
+        raise
+    except Exception as e:
+        current_app.logger.error(f"Get learner profile error: {str(e)}")
+        raise APIError(f"학습자 프로필을 가져오는 중 오류가 발생했습니다: {str(e)}")
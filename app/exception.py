@@ -17,6 +17,11 @@ class ValidationError(APIError):
         super().__init__(message, status_code=400, payload=payload)
 
 
+class PayloadTooLargeError(APIError):
+    def __init__(self, message="Payload too large", payload=None):
+        super().__init__(message, status_code=413, payload=payload)
+
+
 class NotFoundError(APIError):
     def __init__(self, message="Resource not found", payload=None):
         super().__init__(message, status_code=404, payload=payload)
@@ -1,94 +1,576 @@
+import logging
 import os
+import re
+import asyncio
 import base64
+import shutil
+import wave
 import tempfile
-from app.config import tts_client, stt_client
+from urllib.parse import urlencode
+import numpy as np
+from app.config import (
+    tts_upstream,
+    stt_upstream,
+    TTS_LANGUAGE,
+    TTS_REPO_ID,
+    TTS_SID,
+    TTS_SPEED,
+    TTS_CHUNK_MAX_CHARS,
+    TTS_CHUNK_MIN_CHARS,
+    TTS_CHUNK_WORKERS,
+    UPSTREAM_CALL_TIMEOUT,
+    AUDIO_CACHE_DIR,
+    AUDIO_CACHE_MAX_BYTES,
+    STT_PREPROCESS,
+    STT_TARGET_SAMPLE_RATE,
+    STT_MAX_DURATION,
+)
 from gradio_client import handle_file
-from app.exception import ValidationError, NotFoundError, APIError
+from app.utils.cache import FileCache, make_key
+from app.utils.concurrency import ordered_map
+from app.utils.singleflight import SingleFlight
+from app.utils.vad import trim_silence
+from app.utils.wav import (
+    read_wav_file,
+    resample,
+    write_wav,
+    wav_header,
+    STREAM_DATA_SIZE,
+)
+from app.utils.metrics import metrics
+from app.exception import (
+    ValidationError,
+    NotFoundError,
+    APIError,
+    PayloadTooLargeError,
+)
 
+logger = logging.getLogger(__name__)
 
-def generate_audio(text):
+# 문장 끝(마침표/물음표/느낌표 + 공백) 또는 줄바꿈에서 나눔
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+# (text, language, repo_id, sid, speed) 해시로 주소를 매기는 TTS 결과 캐시
+audio_cache = FileCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES, suffix=".wav")
+# 같은 텍스트에 대한 동시 TTS 요청을 하나로 합침
+tts_flight = SingleFlight("tts")
+# 전처리로 줄인 STT 업로드 크기
+preprocess_bytes_saved = metrics.counter(
+    "stt_preprocess_bytes_saved_total", "Bytes removed from STT uploads by preprocessing"
+)
+
+
+def audio_cache_key(text):
+    return make_key(text, TTS_LANGUAGE, TTS_REPO_ID, TTS_SID, TTS_SPEED)
+
+
+def generate_audio_file(text):
     try:
         if not text:
             raise ValidationError("텍스트가 필요합니다")
 
-        print(f"Generating audio for text: {text}")
+        # 캐시에 있으면 원격 호출 없이 바로 반환
+        cache_key = audio_cache_key(text)
+        cached_path = audio_cache.get(cache_key)
+        if cached_path:
+            return cached_path
 
-        # TTS 생성
-        result = tts_client.predict(
-            "English",  # language
-            "csukuangfj/kokoro-en-v0_19|11 speakers",  # repo_id
-            text,  # text
-            "0",  # sid
-            1.0,  # speed
-            api_name="/process",
-        )
+        def synthesize():
+            logger.debug("Generating audio", extra={"text_length": len(text)})
+
+            # TTS 생성
+            result = tts_upstream.call(
+                lambda client: client.predict(*tts_arguments(text), api_name="/process")
+            )
+            return _store_tts_result(cache_key, result)
+
+        return tts_flight.do(cache_key, synthesize)
+
+    except (ValidationError, NotFoundError, APIError):
+        # 이미 정의된 API 에러는 그대로 전파
+        raise
+    except Exception as e:
+        logger.error("Detailed error in generate_audio", extra={"error": str(e)})
+        raise APIError(f"오디오 생성 중 내부 오류: {str(e)}")
 
-        print("Raw TTS result:", result)
 
-        # 결과가 파일 경로인 경우, 파일을 읽어서 직접 전송
-        if isinstance(result, (tuple, list)):
-            audio_path = result[0]
-        else:
-            audio_path = result
+async def generate_audio_file_async(text):
+    try:
+        if not text:
+            raise ValidationError("텍스트가 필요합니다")
 
-        print("Audio path:", audio_path)
+        cache_key = audio_cache_key(text)
+        cached_path = await asyncio.to_thread(audio_cache.get, cache_key)
+        if cached_path:
+            return cached_path
 
-        # 파일이 실제로 존재하는지 확인
-        if not os.path.exists(audio_path):
-            raise NotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
+        async def synthesize():
+            logger.debug("Generating audio", extra={"text_length": len(text)})
 
-        # 파일을 바이너리로 읽어서 base64로 인코딩
-        with open(audio_path, "rb") as audio_file:
-            audio_data = base64.b64encode(audio_file.read()).decode("utf-8")
+            # gradio Job 은 concurrent Future 이므로 이벤트 루프에서 바로 대기
+            result = await tts_upstream.call_async(
+                lambda client: asyncio.wrap_future(
+                    client.submit(*tts_arguments(text), api_name="/process")
+                )
+            )
+            return await asyncio.to_thread(_store_tts_result, cache_key, result)
 
-        return {"audio_data": audio_data, "content_type": "audio/wav"}
+        return await tts_flight.do_async(cache_key, synthesize)
 
-    except (ValidationError, NotFoundError):
-        # 이미 정의된 API 에러는 그대로 전파
+    except (ValidationError, NotFoundError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Detailed error in generate_audio", extra={"error": str(e)})
+        raise APIError(f"오디오 생성 중 내부 오류: {str(e)}")
+
+
+def split_sentences(text, max_chars=TTS_CHUNK_MAX_CHARS):
+    # TTS 청크로 나눔: 짧은 문장은 앞 문장에 붙이고, 너무 긴 문장은 쉼표/공백에서 자름
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        for piece in _split_long(sentence.strip(), max_chars):
+            if (
+                chunks
+                and len(chunks[-1]) < TTS_CHUNK_MIN_CHARS
+                and len(chunks[-1]) + 1 + len(piece) <= max_chars
+            ):
+                chunks[-1] = f"{chunks[-1]} {piece}"
+            else:
+                chunks.append(piece)
+    return chunks
+
+
+def _split_long(sentence, max_chars):
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(", ", 0, max_chars)
+        if cut <= 0:
+            cut = sentence.rfind(" ", 0, max_chars)
+        cut = cut + 1 if cut > 0 else max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def chunked_audio_cache_key(text):
+    return make_key("chunked", text, TTS_LANGUAGE, TTS_REPO_ID, TTS_SID, TTS_SPEED)
+
+
+def iter_chunked_audio(chunks):
+    # 청크를 병렬 합성(청크마다 개별 캐시)하고, 앞 청크부터 (샘플레이트, PCM) 을 반환
+    # 샘플레이트는 첫 청크 기준으로 맞춤
+    sample_rate = None
+    for path in ordered_map(
+        generate_audio_file,
+        chunks,
+        max_workers=TTS_CHUNK_WORKERS,
+        timeout=UPSTREAM_CALL_TIMEOUT,
+    ):
+        samples, rate, _ = read_wav_file(path)
+        if sample_rate is None:
+            sample_rate = rate
+        yield sample_rate, resample(samples, rate, sample_rate)
+
+
+def _store_chunked_audio(cache_key, parts, sample_rate):
+    temp_path = _write_temp_audio(b"")
+    try:
+        write_wav(temp_path, np.concatenate(parts), sample_rate)
+        return audio_cache.put(cache_key, temp_path)
+    finally:
+        _remove_temp_file(temp_path)
+
+
+def generate_chunked_audio_file(text):
+    try:
+        if not text:
+            raise ValidationError("텍스트가 필요합니다")
+
+        chunks = split_sentences(text)
+        if len(chunks) <= 1:
+            return generate_audio_file(text)
+
+        cache_key = chunked_audio_cache_key(text)
+        cached_path = audio_cache.get(cache_key)
+        if cached_path:
+            return cached_path
+
+        def synthesize():
+            logger.debug(
+                "Generating chunked audio",
+                extra={"text_length": len(text), "chunks": len(chunks)},
+            )
+            parts = []
+            for sample_rate, samples in iter_chunked_audio(chunks):
+                parts.append(samples)
+            return _store_chunked_audio(cache_key, parts, sample_rate)
+
+        return tts_flight.do(cache_key, synthesize)
+
+    except (ValidationError, NotFoundError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Detailed error in generate_audio", extra={"error": str(e)})
+        raise APIError(f"오디오 생성 중 내부 오류: {str(e)}")
+
+
+def stream_chunked_audio(text):
+    # 첫 청크까지는 여기서 합성해 오류를 HTTP 상태로 돌려주고,
+    # 이후 청크는 반환한 제너레이터가 준비되는 대로 이어서 보냄 (헤더 길이는 미정)
+    try:
+        # 공백뿐인 텍스트는 나눌 문장이 없으므로 청크 합성 전에 거절
+        if not text or not text.strip():
+            raise ValidationError("텍스트가 필요합니다")
+
+        chunks = split_sentences(text)
+        cache_key = chunked_audio_cache_key(text)
+        cached_path = audio_cache.get(cache_key)
+        if cached_path:
+            return cached_path, None
+
+        pcm = iter_chunked_audio(chunks)
+        sample_rate, first = next(pcm)
+
+    except (ValidationError, NotFoundError, APIError):
         raise
     except Exception as e:
-        print(f"Detailed error in generate_audio: {str(e)}")
+        logger.error("Detailed error in generate_audio", extra={"error": str(e)})
         raise APIError(f"오디오 생성 중 내부 오류: {str(e)}")
 
+    def generate():
+        parts = [first]
+        yield wav_header(sample_rate, STREAM_DATA_SIZE)
+        yield first.astype("<i2").tobytes()
+        try:
+            for _, samples in pcm:
+                parts.append(samples)
+                yield samples.astype("<i2").tobytes()
+        except Exception as e:
+            # 이미 재생 중이므로 상태 코드를 바꿀 수 없음: 여기까지만 보내고 종료
+            logger.error("Chunked audio stream error", extra={"error": str(e)})
+            return
+        finally:
+            pcm.close()
+
+        # 끝까지 합성했으면 길이가 맞는 WAV 로 저장해 다음 요청은 캐시에서 응답
+        # (응답은 이미 끝까지 보냈으므로 저장 실패는 기록만 하고 넘어감)
+        if len(chunks) > 1:
+            try:
+                _store_chunked_audio(cache_key, parts, sample_rate)
+            except Exception as e:
+                logger.error("Chunked audio cache error", extra={"error": str(e)})
+
+    return None, generate()
+
+
+def generate_chunked_audio(text):
+    return _encode_audio_file(generate_chunked_audio_file(text))
+
+
+async def generate_chunked_audio_async(text):
+    # 청크 병렬 합성은 스레드 풀에서 실행
+    return await asyncio.to_thread(generate_chunked_audio, text)
+
+
+def audio_url(text):
+    # GET /generate-audio 는 캐시된 WAV 를 바로 내려줌 (<audio src> 용)
+    return "/generate-audio?" + urlencode({"text": text})
+
+
+def tts_arguments(text):
+    return (
+        TTS_LANGUAGE,  # language
+        TTS_REPO_ID,  # repo_id
+        text,  # text
+        TTS_SID,  # sid
+        TTS_SPEED,  # speed
+    )
+
+
+def _store_tts_result(cache_key, result):
+    # 결과가 튜플인 경우 첫 번째 항목이 파일 경로
+    if isinstance(result, (tuple, list)):
+        audio_path = result[0]
+    else:
+        audio_path = result
+
+    logger.debug("TTS result", extra={"audio_path": audio_path})
+
+    # 파일이 실제로 존재하는지 확인
+    if not os.path.exists(audio_path):
+        raise NotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
+
+    return audio_cache.put(cache_key, audio_path)
+
+
+def _encode_audio_file(audio_path):
+    # 기존 JSON 클라이언트용: 파일을 바이너리로 읽어서 base64로 인코딩
+    with open(audio_path, "rb") as audio_file:
+        audio_data = base64.b64encode(audio_file.read()).decode("utf-8")
+
+    return {"audio_data": audio_data, "content_type": "audio/wav"}
+
+
+def generate_audio(text):
+    return _encode_audio_file(generate_audio_file(text))
+
+
+async def generate_audio_async(text):
+    audio_path = await generate_audio_file_async(text)
+    return await asyncio.to_thread(_encode_audio_file, audio_path)
+
+
+def preprocess_audio(audio_path):
+    # WAV 업로드를 검증하고 모노/16kHz 로 줄이고 앞뒤 무음을 잘라 새 임시 파일로 저장
+    # 반환값: (STT 로 보낼 경로, 전처리 통계). WAV 가 아니면 원본 경로를 그대로 반환
+    original_bytes = os.path.getsize(audio_path)
+    stats = {"applied": False, "original_bytes": original_bytes}
+    if not STT_PREPROCESS:
+        return audio_path, stats
+
+    with open(audio_path, "rb") as audio_file:
+        header = audio_file.read(12)
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        # webm/ogg 등은 디코더가 없으므로 그대로 전달
+        return audio_path, stats
+
+    try:
+        with wave.open(audio_path, "rb") as wav_file:
+            frames = wav_file.getnframes()
+            sample_rate = wav_file.getframerate()
+    except wave.Error as e:
+        if str(e).startswith("unknown format"):
+            # float 등 PCM 이 아닌 인코딩은 Space 쪽 디코더에 맡김
+            return audio_path, stats
+        raise ValidationError(f"올바른 WAV 파일이 아닙니다: {str(e)}")
+    except EOFError:
+        raise ValidationError("WAV 헤더가 손상되었습니다")
+
+    if not frames or not sample_rate:
+        raise ValidationError("오디오 데이터가 비어 있습니다")
+    duration = frames / sample_rate
+    if duration > STT_MAX_DURATION:
+        raise ValidationError(
+            f"오디오 길이는 {STT_MAX_DURATION:g}초를 넘을 수 없습니다 ({duration:.1f}초)"
+        )
+
+    try:
+        samples, sample_rate, channels = read_wav_file(audio_path)
+    except ValueError:
+        return audio_path, stats
+
+    # 16kHz 보다 낮은 샘플레이트는 올리지 않음 (업로드 크기만 커짐)
+    target_rate = min(sample_rate, STT_TARGET_SAMPLE_RATE)
+    processed = trim_silence(resample(samples, sample_rate, target_rate), target_rate)
+    if not len(processed):
+        raise ValidationError("오디오 데이터가 비어 있습니다")
+
+    temp_path = _write_temp_audio(b"")
+    write_wav(temp_path, processed, target_rate)
+    processed_bytes = os.path.getsize(temp_path)
+
+    stats.update(
+        applied=True,
+        processed_bytes=processed_bytes,
+        bytes_saved=original_bytes - processed_bytes,
+        original_sample_rate=sample_rate,
+        original_channels=channels,
+        original_duration=round(duration, 3),
+        duration=round(len(processed) / target_rate, 3),
+    )
+    preprocess_bytes_saved.inc(max(0, stats["bytes_saved"]))
+    logger.info("Audio preprocessed", extra=stats)
+    return temp_path, stats
+
+
+def transcribe_file(audio_path):
+    processed_path = None
+
+    try:
+        processed_path, preprocessing = preprocess_audio(audio_path)
+
+        # API 예제와 정확히 동일한 방식으로 호출
+        result = stt_upstream.call(
+            lambda client: client.predict(
+                audio=handle_file(processed_path), api_name="/predict"  # handle_file 사용
+            )
+        )
+
+        return {"transcription": result, "preprocessing": preprocessing}
+
+    except APIError:
+        raise
+    except Exception as e:
+        logger.error("Transcription error", extra={"error": str(e)})
+        raise APIError(f"음성 변환 중 오류가 발생했습니다: {str(e)}")
+
+    finally:
+        if processed_path != audio_path:
+            _remove_temp_file(processed_path)
+
+
+async def transcribe_file_async(audio_path):
+    processed_path = None
+
+    try:
+        processed_path, preprocessing = await asyncio.to_thread(
+            preprocess_audio, audio_path
+        )
+
+        result = await stt_upstream.call_async(
+            lambda client: asyncio.wrap_future(
+                client.submit(audio=handle_file(processed_path), api_name="/predict")
+            )
+        )
+
+        return {"transcription": result, "preprocessing": preprocessing}
+
+    except APIError:
+        raise
+    except Exception as e:
+        logger.error("Transcription error", extra={"error": str(e)})
+        raise APIError(f"음성 변환 중 오류가 발생했습니다: {str(e)}")
+
+    finally:
+        if processed_path != audio_path:
+            _remove_temp_file(processed_path)
+
+
+def save_upload(stream, suffix=".wav"):
+    temp_path = None
+
+    try:
+        # 업로드 스트림을 메모리에 올리지 않고 바로 임시 파일로 복사
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            temp_path = temp_file.name
+            shutil.copyfileobj(stream, temp_file, 64 * 1024)
+            size = temp_file.tell()
+
+        if not size:
+            raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+
+        return temp_path
+
+    except ValidationError:
+        _remove_temp_file(temp_path)
+        raise
+    except Exception as e:
+        _remove_temp_file(temp_path)
+        logger.error("Transcription upload error", extra={"error": str(e)})
+        raise APIError(f"오디오 업로드 처리 중 오류가 발생했습니다: {str(e)}")
+
+
+def transcribe_temp_file(temp_path):
+    # 변환이 끝나면 업로드 임시 파일을 삭제
+    try:
+        return transcribe_file(temp_path)
+    finally:
+        _remove_temp_file(temp_path)
+
+
+def transcribe_stream(stream, suffix=".wav"):
+    return transcribe_temp_file(save_upload(stream, suffix))
+
+
+def save_base64_upload(audio_base64, suffix=".wav"):
+    if not audio_base64:
+        raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+
+    # base64 디코딩
+    try:
+        audio_data = base64.b64decode(audio_base64)
+    except Exception:
+        raise ValidationError("유효하지 않은 base64 인코딩 데이터입니다")
+    if not audio_data:
+        raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+
+    # 시스템 임시 디렉토리에 파일 저장
+    return _write_temp_audio(audio_data, suffix)
+
 
 def transcribe_audio(audio_base64):
-    temp_file = None
+    temp_path = None
+
+    try:
+        temp_path = save_base64_upload(audio_base64)
+        return transcribe_file(temp_path)
+
+    except (ValidationError, APIError):
+        # 이미 정의된 API 에러는 그대로 전파
+        raise
+    except Exception as e:
+        logger.error("Transcription error", extra={"error": str(e)})
+        raise APIError(f"음성 변환 중 오류가 발생했습니다: {str(e)}")
+
+    finally:
+        _remove_temp_file(temp_path)
+
+
+async def transcribe_audio_async(audio_base64):
     temp_path = None
 
     try:
         if not audio_base64:
             raise ValidationError("오디오 데이터가 제공되지 않았습니다")
 
-        # 시스템 임시 디렉토리에 파일 생성
-        temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        temp_path = temp_file.name
-
-        # base64 디코딩 및 임시 파일 저장
         try:
             audio_data = base64.b64decode(audio_base64)
         except Exception:
             raise ValidationError("유효하지 않은 base64 인코딩 데이터입니다")
 
-        with open(temp_path, "wb") as f:
-            f.write(audio_data)
-
-        # API 예제와 정확히 동일한 방식으로 호출
-        result = stt_client.predict(
-            audio=handle_file(temp_path), api_name="/predict"  # handle_file 사용
-        )
+        temp_path = await asyncio.to_thread(_write_temp_audio, audio_data)
+        del audio_data
 
-        return {"transcription": result}
+        return await transcribe_file_async(temp_path)
 
-    except ValidationError:
-        # 이미 정의된 API 에러는 그대로 전파
+    except (ValidationError, APIError):
         raise
     except Exception as e:
-        print(f"Transcription error: {str(e)}")
+        logger.error("Transcription error", extra={"error": str(e)})
         raise APIError(f"음성 변환 중 오류가 발생했습니다: {str(e)}")
 
     finally:
-        if temp_file and temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except Exception as e:
-                print(f"파일 삭제 중 오류: {str(e)}")
+        _remove_temp_file(temp_path)
+
+
+async def transcribe_chunks_async(chunks, suffix=".wav", max_bytes=None):
+    # ASGI 요청 본문을 청크 단위로 임시 파일에 기록한 뒤 변환
+    # max_bytes 를 넘으면 기록을 멈추고 413 (Flask 의 MAX_CONTENT_LENGTH 에 해당)
+    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    temp_path = temp_file.name
+    try:
+        with temp_file:
+            size = 0
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise PayloadTooLargeError(
+                        f"업로드 크기 제한({max_bytes}바이트)을 초과했습니다"
+                    )
+                await asyncio.to_thread(temp_file.write, chunk)
+
+        if not size:
+            raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+
+        return await transcribe_file_async(temp_path)
+
+    finally:
+        _remove_temp_file(temp_path)
+
+
+def _write_temp_audio(audio_data, suffix=".wav"):
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+        temp_file.write(audio_data)
+        return temp_file.name
+
+
+def _remove_temp_file(path):
+    if path and os.path.exists(path):
+        try:
+            os.unlink(path)
+        except Exception as e:
+            logger.error("파일 삭제 중 오류", extra={"error": str(e)})
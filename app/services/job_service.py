@@ -0,0 +1,47 @@
+from app.config import (
+    JOB_STORE,
+    JOB_DB_PATH,
+    JOB_WORKERS,
+    JOB_TTL,
+    JOB_CALLBACK_ALLOWED_HOSTS,
+)
+from app.utils.jobs import (
+    JobQueue,
+    MemoryJobStore,
+    SQLiteJobStore,
+    check_callback_url,
+)
+from app.exception import ValidationError, NotFoundError
+
+
+def create_job_store(backend):
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(JOB_DB_PATH)
+    raise ValueError(f"Unknown job store backend: {backend}")
+
+
+job_queue = JobQueue(
+    create_job_store(JOB_STORE),
+    max_workers=JOB_WORKERS,
+    ttl=JOB_TTL,
+    callback_allowed_hosts=JOB_CALLBACK_ALLOWED_HOSTS,
+)
+
+
+def submit_job(kind, func, *args, callback_url=None):
+    if callback_url:
+        try:
+            check_callback_url(callback_url, JOB_CALLBACK_ALLOWED_HOSTS)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+    return job_queue.submit(kind, func, *args, callback_url=callback_url)
+
+
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise NotFoundError(f"작업을 찾을 수 없습니다: {job_id}")
+    return job
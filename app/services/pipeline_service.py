@@ -0,0 +1,112 @@
+import time
+import logging
+from app.config import UPSTREAM_CALL_TIMEOUT
+from app.services.audio_service import transcribe_file, _remove_temp_file
+from app.services.text_service import (
+    analyze_text,
+    generate_sentences,
+    record_learner_text,
+    validate_learner_id,
+)
+from app.services.test_service import get_feedback, validate_feedback_mode
+from app.utils.concurrency import fan_out_stream
+from app.utils.metrics import metrics
+from app.exception import ValidationError, APIError
+
+logger = logging.getLogger(__name__)
+
+pipeline_stage_latency = metrics.histogram(
+    "pipeline_stage_duration_seconds",
+    "Duration of each /pipeline/answer stage",
+    ("stage",),
+)
+
+
+def stream_answer_pipeline(audio_path, question_id="1", mode=None, learner_id=None):
+    # 검증은 스트림을 열기 전에 수행해 400 응답을 그대로 돌려줄 수 있게 함
+    # audio_path 는 전사가 끝나면 삭제. 스트림을 읽기 전에 연결이 끊기면 제너레이터가
+    # 시작되지 않으므로 호출한 쪽이 응답 종료 시 remove_upload 도 호출해야 함
+    try:
+        question_id = str(question_id or "1")
+        mode = validate_feedback_mode(mode)
+        if learner_id is not None:
+            learner_id = validate_learner_id(learner_id)
+    except ValidationError:
+        _remove_temp_file(audio_path)
+        raise
+    return _pipeline_events(audio_path, question_id, mode, learner_id)
+
+
+def remove_upload(audio_path):
+    # 이미 지운 파일이면 아무것도 하지 않음
+    _remove_temp_file(audio_path)
+
+
+def _run_stage(stage, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        pipeline_stage_latency.observe(time.perf_counter() - started, stage=stage)
+
+
+def _stage_error(stage, error):
+    logger.error("Pipeline stage failed", extra={"stage": stage, "error": str(error)})
+    message = error.message if isinstance(error, APIError) else str(error)
+    return "error", {"stage": stage, "message": message}
+
+
+def _pipeline_events(audio_path, question_id, mode, learner_id):
+    # 녹음 → 전사 → 형태소 분석 → (피드백 ∥ 만능문장) 순서로 실행하고
+    # 중간 결과는 클라이언트를 거치지 않고 메모리에서 다음 단계로 넘김
+    try:
+        transcribed = _run_stage("transcribe", transcribe_file, audio_path)
+    except Exception as e:
+        yield _stage_error("transcribe", e)
+        yield "end", {}
+        return
+    finally:
+        _remove_temp_file(audio_path)
+    yield "transcription", transcribed
+
+    text = transcribed["transcription"]
+    if not isinstance(text, str) or not text.strip():
+        yield "error", {"stage": "transcribe", "message": "인식된 음성이 없습니다"}
+        yield "end", {}
+        return
+
+    try:
+        analysis = _run_stage("analyze", analyze_text, text)
+    except Exception as e:
+        yield _stage_error("analyze", e)
+        yield "end", {}
+        return
+    yield "analysis", analysis
+
+    if learner_id is not None:
+        # 분석 결과는 캐시에 있으므로 프로필 누적은 재분석 없이 처리
+        try:
+            profile = _run_stage("profile", record_learner_text, learner_id, text)
+            yield "learner", {
+                key: profile[key] for key in ("learner_id", "text_count", "merged")
+            }
+        except Exception as e:
+            yield _stage_error("profile", e)
+
+    # 피드백과 만능문장 생성은 서로 독립적이므로 병렬로 실행하고 먼저 끝난 쪽부터 전송
+    stages = {
+        "feedback": lambda: get_feedback({question_id: text}, mode),
+        "sentences": lambda: generate_sentences(analysis),
+    }
+    events = fan_out_stream(
+        lambda stage: [_run_stage(stage, stages[stage])],
+        {stage: stage for stage in stages},
+        max_workers=len(stages),
+        timeout=UPSTREAM_CALL_TIMEOUT,
+    )
+    for kind, stage, value in events:
+        if kind == "item":
+            yield stage, value
+        elif kind == "error":
+            yield _stage_error(stage, value)
+    yield "end", {}
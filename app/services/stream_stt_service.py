@@ -0,0 +1,197 @@
+import logging
+import os
+import time
+import uuid
+import tempfile
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+from app.config import (
+    STT_STREAM_SAMPLE_RATE,
+    STT_STREAM_WORKERS,
+    STT_SESSION_TTL,
+    STT_MAX_SESSIONS,
+    UPSTREAM_CALL_TIMEOUT,
+)
+from app.services.audio_service import transcribe_temp_file
+from app.utils.vad import SilenceSegmenter
+from app.utils.wav import write_wav, wav_bytes_to_pcm
+from app.utils.admission import RateLimitedError
+from app.exception import ValidationError, NotFoundError, APIError
+
+logger = logging.getLogger(__name__)
+
+# 세그먼트별 STT 호출을 병렬로 처리하는 풀
+_executor = ThreadPoolExecutor(max_workers=STT_STREAM_WORKERS, thread_name_prefix="stt")
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class TranscriptionSession:
+    def __init__(self, sample_rate):
+        self.id = uuid.uuid4().hex
+        self.sample_rate = sample_rate
+        self.segmenter = SilenceSegmenter(sample_rate)
+        self.segments = []  # {"index", "status", "text", "error", "duration"}
+        self.futures = []
+        self.finished = False
+        self.updated_at = time.monotonic()
+        self._leftover = b""  # 홀수 바이트로 잘린 PCM 샘플 보관
+        self._lock = threading.Lock()
+
+    def add_chunk(self, data):
+        with self._lock:
+            if self.finished:
+                raise ValidationError("이미 종료된 세션입니다")
+            self.updated_at = time.monotonic()
+
+            samples = self._decode(data)
+            for segment in self.segmenter.feed(samples):
+                self._submit(segment)
+
+    def finish(self):
+        with self._lock:
+            if not self.finished:
+                self.finished = True
+                self.updated_at = time.monotonic()
+                segment = self.segmenter.flush()
+                if segment is not None:
+                    self._submit(segment)
+            return list(self.futures)
+
+    def _decode(self, data):
+        # WAV 청크는 헤더를 해석하고, 그 외에는 16-bit little-endian 모노 PCM 으로 간주
+        if data[:4] == b"RIFF":
+            try:
+                samples, sample_rate = wav_bytes_to_pcm(data)
+            except Exception:
+                raise ValidationError("올바른 WAV 청크가 아닙니다")
+            if sample_rate != self.sample_rate:
+                raise ValidationError(
+                    f"세션 샘플레이트({self.sample_rate}Hz)와 다른 청크입니다: {sample_rate}Hz"
+                )
+            return samples
+
+        data = self._leftover + data
+        usable = len(data) - len(data) % 2
+        self._leftover = data[usable:]
+        return np.frombuffer(data[:usable], dtype="<i2")
+
+    def _submit(self, samples):
+        segment = {
+            "index": len(self.segments),
+            "status": "pending",
+            "text": None,
+            "error": None,
+            "duration": round(len(samples) / self.sample_rate, 3),
+        }
+        self.segments.append(segment)
+        self.futures.append(
+            _executor.submit(
+                contextvars.copy_context().run, self._transcribe, segment, samples
+            )
+        )
+
+    def _transcribe(self, segment, samples):
+        temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        temp_file.close()
+        try:
+            write_wav(temp_file.name, samples, self.sample_rate)
+            result = transcribe_temp_file(temp_file.name)
+            segment["text"] = result["transcription"]
+            segment["status"] = "done"
+        except Exception as e:
+            logger.error(
+                "Segment transcription error",
+                extra={"segment": segment["index"], "error": str(e)},
+            )
+            segment["error"] = e.message if isinstance(e, APIError) else str(e)
+            segment["status"] = "failed"
+        finally:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+
+    def snapshot(self):
+        segments = [dict(segment) for segment in self.segments]
+
+        # 앞에서부터 연속으로 끝난 세그먼트까지만 부분 자막으로 이어 붙임
+        partial = []
+        for segment in segments:
+            if segment["status"] == "pending":
+                break
+            if segment["text"]:
+                partial.append(segment["text"].strip())
+
+        done = self.finished and all(s["status"] != "pending" for s in segments)
+        return {
+            "session_id": self.id,
+            "finished": self.finished,
+            "done": done,
+            "segments": segments,
+            "transcript": " ".join(partial),
+        }
+
+
+def _purge_sessions():
+    expired_before = time.monotonic() - STT_SESSION_TTL
+    with _sessions_lock:
+        for session_id in [
+            session_id
+            for session_id, session in _sessions.items()
+            if session.updated_at < expired_before
+        ]:
+            del _sessions[session_id]
+
+
+def create_session(sample_rate=None):
+    sample_rate = sample_rate or STT_STREAM_SAMPLE_RATE
+    if not isinstance(sample_rate, int) or not 8000 <= sample_rate <= 48000:
+        raise ValidationError("sample_rate 는 8000 이상 48000 이하의 정수여야 합니다")
+
+    _purge_sessions()
+    session = TranscriptionSession(sample_rate)
+    with _sessions_lock:
+        # 세션마다 버퍼와 STT 작업을 잡고 있으므로 열린 세션 수를 제한
+        if 0 < STT_MAX_SESSIONS <= len(_sessions):
+            oldest = min(other.updated_at for other in _sessions.values())
+            raise RateLimitedError(
+                "열린 전사 세션이 너무 많습니다. 잠시 후 다시 시도해 주세요",
+                retry_after=oldest + STT_SESSION_TTL - time.monotonic(),
+            )
+        _sessions[session.id] = session
+    return {"session_id": session.id, "sample_rate": sample_rate}
+
+
+def get_session(session_id):
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+    if session is None:
+        raise NotFoundError(f"전사 세션을 찾을 수 없습니다: {session_id}")
+    return session
+
+
+def add_session_chunk(session_id, data):
+    if not data:
+        raise ValidationError("오디오 데이터가 제공되지 않았습니다")
+
+    session = get_session(session_id)
+    session.add_chunk(data)
+    return session.snapshot()
+
+
+def get_session_transcript(session_id):
+    return get_session(session_id).snapshot()
+
+
+def finish_session(session_id, timeout=UPSTREAM_CALL_TIMEOUT):
+    # 남은 오디오를 마지막 세그먼트로 보내고, 모든 세그먼트 변환을 기다림
+    session = get_session(session_id)
+    futures = session.finish()
+    wait(futures, timeout=timeout)
+
+    result = session.snapshot()
+    if result["done"]:
+        with _sessions_lock:
+            _sessions.pop(session_id, None)
+    return result
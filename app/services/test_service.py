@@ -1,117 +1,173 @@
-import re
-import random
-import os
-from app.config import g4f_client, GPT_MODEL, JS_PATH
-from app.services.translation_service import translate_to_english
+import json
+import time
+import uuid
+import asyncio
+import logging
+from app.config import (
+    g4f_client,
+    g4f_async_client,
+    g4f_upstream,
+    JS_PATH,
+    QUESTION_SECTION,
+    QUESTION_BANK_CHECK_INTERVAL,
+    FANOUT_MAX_WORKERS,
+    FEEDBACK_MODE,
+    UPSTREAM_CALL_TIMEOUT,
+    TEST_SESSION_POOL_SIZE,
+    TEST_SESSION_LOW_WATER,
+    TEST_SESSION_CACHE_SIZE,
+    CACHE_DB_PATH,
+    NEAR_DUP_ENABLED,
+    NEAR_DUP_THRESHOLD,
+    NEAR_DUP_INDEX_SIZE,
+    NEAR_DUP_NUM_PERM,
+    NEAR_DUP_BANDS,
+    NEAR_DUP_SHINGLE_SIZE,
+)
+from app.services.translation_service import (
+    translate_to_english,
+    translate_to_english_async,
+)
+from app.services.audio_service import generate_audio_file, audio_url
+from app.services.text_service import normalize_text, tokenize_forms
+from app.utils.cache import LRUCache, make_key
+from app.utils.minhash import MinHashIndex, shingles
+from app.utils.pool import ReadyPool
+from app.utils.admission import RateLimitedError, run_with_priority
+from app.utils.question_bank import QuestionBank
+from app.utils.concurrency import fan_out, fan_out_stream, async_fan_out
+from app.utils.llm import stream_chat_completion
 from app.exception import ValidationError, NotFoundError, APIError
 
+logger = logging.getLogger(__name__)
+
+# Questions.js 는 한 번만 파싱하고, 파일이 바뀌었을 때만 다시 로드
+question_bank = QuestionBank(JS_PATH, check_interval=QUESTION_BANK_CHECK_INTERVAL)
+
 
 def load_questions_from_js():
     try:
-        print("Attempting to load questions from:", JS_PATH)
+        return question_bank.questions(QUESTION_SECTION)
+    except (ValidationError, NotFoundError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Error loading questions", extra={"error": str(e)})
+        raise APIError(f"질문 파일 로드 중 오류가 발생했습니다: {str(e)}")
 
-        if not os.path.exists(JS_PATH):
-            raise NotFoundError(f"질문 파일을 찾을 수 없습니다: {JS_PATH}")
 
-        with open(JS_PATH, "r", encoding="utf-8") as file:
-            content = file.read()
-            print("\nFile content preview:")
-            print(content[:200])  # 파일 내용 앞부분 출력
+def build_test_session(render_audio=False):
+    # 메모리에 올라간 질문 은행에서 랜덤하게 4개 선택
+    selected_questions = question_bank.sample(QUESTION_SECTION, 4)
+    logger.debug("Selected questions", extra={"questions": selected_questions})
 
-            # JavaScript 객체에서 서베이 배열 찾기
-            survey_start = content.find("서베이")  # ':' 제거
-            if survey_start == -1:
-                raise ValidationError("파일 내에서 '서베이' 항목을 찾을 수 없습니다")
+    # 각 문제에 대해 영어 번역을 병렬로 수행
+    translations, errors = fan_out(
+        translate_to_english,
+        dict(enumerate(selected_questions)),
+        max_workers=FANOUT_MAX_WORKERS,
+        timeout=UPSTREAM_CALL_TIMEOUT,
+    )
+    questions = _questions_result(selected_questions, translations, errors)
 
-            # 배열 시작 찾기
-            array_start = content.find("[", survey_start)
-            if array_start == -1:
-                raise ValidationError("서베이 항목의 시작 괄호를 찾을 수 없습니다")
+    if render_audio:
+        # 영어 질문 음성을 미리 합성해 오디오 캐시에 저장
+        _, audio_errors = fan_out(
+            generate_audio_file,
+            {i: question["english"] for i, question in enumerate(questions)},
+            max_workers=FANOUT_MAX_WORKERS,
+            timeout=UPSTREAM_CALL_TIMEOUT,
+        )
+        if audio_errors:
+            raise next(iter(audio_errors.values()))
 
-            array_start += 1  # Skip the opening bracket
+    return _new_session(questions, render_audio)
 
-            # 괄호 매칭을 사용하여 정확한 끝 위치 찾기
-            bracket_count = 1
-            array_end = array_start
 
-            while bracket_count > 0 and array_end < len(content):
-                if content[array_end] == "[":
-                    bracket_count += 1
-                elif content[array_end] == "]":
-                    bracket_count -= 1
-                array_end += 1
+# 번역과 TTS 까지 끝낸 모의고사 세트를 백그라운드에서 미리 만들어 둠
+test_session_pool = ReadyPool(
+    "test-sessions",
+    # 미리 만들기는 사용자 요청보다 뒤로 밀리도록 batch 우선순위로 호출
+    lambda: run_with_priority("batch", build_test_session, render_audio=True),
+    size=TEST_SESSION_POOL_SIZE,
+    low_water=TEST_SESSION_LOW_WATER,
+)
+# 발급한 세션 (GET /test-sessions/<id> 로 다시 조회)
+test_sessions = LRUCache(TEST_SESSION_CACHE_SIZE)
 
-            questions_str = content[array_start : array_end - 1]
 
-            # 각 질문을 분리 (쌍따옴표로 둘러싸인 문자열 추출)
-            questions = re.findall(r'"([^"]+)"', questions_str)
+def _new_session(questions, audio_ready):
+    return {
+        "session_id": uuid.uuid4().hex,
+        "questions": [
+            {**question, "audio_url": audio_url(question["english"])}
+            for question in questions
+        ],
+        "audio_ready": audio_ready,
+        "created_at": time.time(),
+    }
 
-            # 주석과 빈 문자열 제거
-            questions = [
-                q.strip()
-                for q in questions
-                if q.strip() and not q.strip().startswith("//")
-            ]
 
-            if not questions:
-                raise ValidationError("질문 목록이 비어 있습니다")
+def _issue_session(session, pooled):
+    test_sessions.set(session["session_id"], session)
+    return {**session, "pooled": pooled}
 
-            print(f"Total questions loaded: {len(questions)}")
-            return questions
 
-    except (ValidationError, NotFoundError):
+def get_test_questions():
+    try:
+        # 풀에 준비된 세트가 있으면 바로 발급, 없으면 번역만 해서 즉석으로 생성
+        session = test_session_pool.take()
+        if session is not None:
+            return _issue_session(session, True)
+        return _issue_session(build_test_session(), False)
+    except (ValidationError, NotFoundError, APIError):
         raise
     except Exception as e:
-        print(f"Error loading questions: {str(e)}")
-        raise APIError(f"질문 파일 로드 중 오류가 발생했습니다: {str(e)}")
+        logger.error("Error in get_test_questions", extra={"error": str(e)})
+        raise APIError(f"테스트 질문을 가져오는 중 오류가 발생했습니다: {str(e)}")
 
 
-def get_test_questions():
+async def get_test_questions_async():
     try:
-        # Questions.js에서 문제 로드
-        all_questions = load_questions_from_js()
-        print("Total questions loaded:", len(all_questions))  # 로드된 전체 문제 수
-
-        if not all_questions:
-            raise ValidationError("이용 가능한 질문이 없습니다")
-
-        # 랜덤하게 4개 선택
-        selected_questions = random.sample(all_questions, min(4, len(all_questions)))
-        print("Selected questions:", selected_questions)  # 선택된 문제들
-
-        # 각 문제에 대해 영어 번역 수행
-        questions = []
-        for q in selected_questions:
-            translated = translate_to_english(q)
-            print(f"Original: {q}")  # 원본 문제
-            print(f"Translated: {translated}")  # 번역된 문제
-            questions.append({"korean": q, "english": translated})
-
-        return questions
-    except (ValidationError, NotFoundError):
+        session = test_session_pool.take()
+        if session is not None:
+            return _issue_session(session, True)
+
+        selected_questions = question_bank.sample(QUESTION_SECTION, 4)
+
+        translations, errors = await async_fan_out(
+            translate_to_english_async,
+            dict(enumerate(selected_questions)),
+            max_workers=FANOUT_MAX_WORKERS,
+            timeout=UPSTREAM_CALL_TIMEOUT,
+        )
+        questions = _questions_result(selected_questions, translations, errors)
+        return _issue_session(_new_session(questions, False), False)
+    except (ValidationError, NotFoundError, APIError):
         raise
     except Exception as e:
-        print(f"Error in get_test_questions: {str(e)}")
+        logger.error("Error in get_test_questions", extra={"error": str(e)})
         raise APIError(f"테스트 질문을 가져오는 중 오류가 발생했습니다: {str(e)}")
 
 
-def get_feedback(answers):
-    try:
-        if not answers:
-            raise ValidationError("답변이 제공되지 않았습니다")
+def get_test_session(session_id):
+    session = test_sessions.get(session_id)
+    if session is None:
+        raise NotFoundError(f"테스트 세션을 찾을 수 없습니다: {session_id}")
+    return session
+
+
+def _questions_result(selected_questions, translations, errors):
+    if errors:
+        error = next(iter(errors.values()))
+        raise error if isinstance(error, APIError) else APIError(str(error))
 
-        feedback = {}
+    return [
+        {"korean": q, "english": translations[i]}
+        for i, q in enumerate(selected_questions)
+    ]
 
-        for idx, answer in answers.items():
-            if not answer:
-                raise ValidationError(f"질문 {idx}에 대한 답변이 비어 있습니다")
 
-            response = g4f_client.chat.completions.create(
-                model=GPT_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """당신은 OPIC 전문 채점관입니다. 
+FEEDBACK_SYSTEM_PROMPT = """당신은 OPIC 전문 채점관입니다. 
                     다음 OPIC 채점 기준에 따라 학생의 답변을 평가하고, 친근하고 명확한 한국어로 피드백을 제공해주세요.
                     반드시 학생의 답변에 따라 평가해주세요. 
 
@@ -132,19 +188,298 @@ def get_feedback(answers):
                        - 서론-본론-결론의 명확한 구성
                        - 답변 내용의 체계적 전개
                        
-                    """,
-                    },
-                    {
-                        "role": "user",
-                        "content": f"다음 OPIC 답변을 평가해주세요: {answer}",
-                    },
-                ],
-            )
-            feedback[idx] = response.choices[0].message.content
+                    """
+
+
+def feedback_messages(answer):
+    return [
+        {"role": "system", "content": FEEDBACK_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"다음 OPIC 답변을 평가해주세요: {answer}",
+        },
+    ]
+
+
+def evaluate_answer(answer):
+    response = g4f_upstream.call(
+        lambda model: g4f_client.chat.completions.create(
+            model=model, messages=feedback_messages(answer)
+        )
+    )
+    return response.choices[0].message.content
+
+
+async def evaluate_answer_async(answer):
+    response = await g4f_upstream.call_async(
+        lambda model: g4f_async_client.chat.completions.create(
+            model=model, messages=feedback_messages(answer)
+        )
+    )
+    return response.choices[0].message.content
+
+
+BATCH_FEEDBACK_INSTRUCTIONS = """
+                    여러 학생 답변이 JSON 배열로 주어집니다. 각 답변을 서로 독립적으로 평가하고,
+                    다른 설명 없이 아래 형식의 JSON 객체 하나만 반환하세요.
+                    {"feedback": [{"id": "<답변 id 그대로>", "feedback": "<해당 답변에 대한 피드백>"}]}
+                    """
+
+FEEDBACK_MODES = ("parallel", "batch")
+
+
+def batch_feedback_messages(answers):
+    # 채점 기준 프롬프트는 한 번만 보내고, 답변은 id 를 붙여 한 번에 전달
+    tagged = [{"id": str(idx), "answer": answer} for idx, answer in answers.items()]
+    return [
+        {
+            "role": "system",
+            "content": FEEDBACK_SYSTEM_PROMPT + BATCH_FEEDBACK_INSTRUCTIONS,
+        },
+        {
+            "role": "user",
+            "content": "다음 OPIC 답변들을 평가해주세요: "
+            + json.dumps(tagged, ensure_ascii=False),
+        },
+    ]
+
+
+def parse_batch_feedback(content, ids):
+    # 응답에서 JSON 객체를 꺼내 id 별 피드백으로 나눔. 형식이 맞지 않는 항목은 제외
+    if not content:
+        return {}
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        parsed = json.loads(content[start : end + 1])
+    except ValueError:
+        return {}
+
+    items = parsed.get("feedback") if isinstance(parsed, dict) else None
+    if not isinstance(items, list):
+        return {}
+
+    wanted = {str(idx): idx for idx in ids}
+    feedback = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        idx = wanted.get(str(item.get("id")))
+        text = item.get("feedback")
+        if idx is not None and isinstance(text, str) and text.strip():
+            feedback[idx] = text
+    return feedback
+
+
+def evaluate_answers_batch(answers):
+    response = g4f_upstream.call(
+        lambda model: g4f_client.chat.completions.create(
+            model=model, messages=batch_feedback_messages(answers)
+        )
+    )
+    return parse_batch_feedback(response.choices[0].message.content, answers)
+
+
+async def evaluate_answers_batch_async(answers):
+    response = await g4f_upstream.call_async(
+        lambda model: g4f_async_client.chat.completions.create(
+            model=model, messages=batch_feedback_messages(answers)
+        )
+    )
+    return parse_batch_feedback(response.choices[0].message.content, answers)
+
 
-        return {"feedback": feedback}
-    except ValidationError:
+# 채점한 답변의 MinHash 서명 -> 피드백 (거의 같은 답변 재제출 시 재사용)
+feedback_index = MinHashIndex(
+    CACHE_DB_PATH,
+    "feedback_index",
+    num_perm=NEAR_DUP_NUM_PERM,
+    bands=NEAR_DUP_BANDS,
+    maxsize=NEAR_DUP_INDEX_SIZE,
+)
+
+
+def answer_signature(answer):
+    try:
+        tokens = tokenize_forms(answer)
+    except Exception as e:
+        # 형태소 분석기를 쓸 수 없으면 공백 기준 토큰으로 대체
+        logger.warning("Answer tokenize failed", extra={"error": str(e)})
+        tokens = normalize_text(answer).lower().split()
+    return feedback_index.signature(shingles(tokens, NEAR_DUP_SHINGLE_SIZE))
+
+
+def find_reusable_feedback(answers):
+    # 반환값: ({idx: (피드백, 유사도)}, {idx: 서명})
+    if not NEAR_DUP_ENABLED:
+        return {}, {}
+    signatures = {idx: answer_signature(answer) for idx, answer in answers.items()}
+    reused = {}
+    for idx, signature in signatures.items():
+        match = feedback_index.query(signature, NEAR_DUP_THRESHOLD)
+        if match is not None:
+            _, similarity, feedback = match
+            reused[idx] = (feedback, similarity)
+    return reused, signatures
+
+
+def remember_feedback(answers, feedback, signatures):
+    for idx, text in feedback.items():
+        signature = signatures.get(idx)
+        if signature is not None:
+            key = make_key(normalize_text(answers[idx]))
+            feedback_index.add(key, signature, text)
+
+
+def validate_feedback_mode(mode):
+    mode = mode or FEEDBACK_MODE
+    if mode not in FEEDBACK_MODES:
+        raise ValidationError(f"mode 는 {', '.join(FEEDBACK_MODES)} 중 하나여야 합니다")
+    return mode
+
+
+def validate_answers(answers):
+    if not answers:
+        raise ValidationError("답변이 제공되지 않았습니다")
+
+    for idx, answer in answers.items():
+        if not answer:
+            raise ValidationError(f"질문 {idx}에 대한 답변이 비어 있습니다")
+
+
+def get_feedback(answers, mode=None):
+    try:
+        validate_answers(answers)
+        mode = validate_feedback_mode(mode)
+
+        # 이미 채점한 답변과 거의 같으면 그 피드백을 재사용하고 나머지만 채점
+        reused, signatures = find_reusable_feedback(answers)
+        pending = {idx: answer for idx, answer in answers.items() if idx not in reused}
+
+        batched = {}
+        if mode == "batch" and pending:
+            # 한 번의 호출로 채점하고, 파싱에 실패한 답변만 개별 호출로 보충
+            try:
+                batched = evaluate_answers_batch(pending)
+            except APIError as e:
+                logger.warning("Batch feedback failed", extra={"error": e.message})
+
+        # 답변별 채점 요청을 병렬로 보내고, 실패한 답변만 따로 보고
+        feedback, errors = fan_out(
+            evaluate_answer,
+            {idx: answer for idx, answer in pending.items() if idx not in batched},
+            max_workers=FANOUT_MAX_WORKERS,
+            timeout=UPSTREAM_CALL_TIMEOUT,
+        )
+        remember_feedback(answers, {**batched, **feedback}, signatures)
+        return _feedback_result(feedback, errors, answers, mode, batched, reused)
+    except (ValidationError, APIError):
         raise
     except Exception as e:
-        print(f"Error in get_feedback: {str(e)}")
+        logger.error("Error in get_feedback", extra={"error": str(e)})
         raise APIError(f"피드백을 생성하는 중 오류가 발생했습니다: {str(e)}")
+
+
+async def get_feedback_async(answers, mode=None):
+    try:
+        validate_answers(answers)
+        mode = validate_feedback_mode(mode)
+
+        # 형태소 분석/서명 계산은 이벤트 루프를 막지 않도록 스레드에서 실행
+        reused, signatures = await asyncio.to_thread(find_reusable_feedback, answers)
+        pending = {idx: answer for idx, answer in answers.items() if idx not in reused}
+
+        batched = {}
+        if mode == "batch" and pending:
+            try:
+                batched = await evaluate_answers_batch_async(pending)
+            except APIError as e:
+                logger.warning("Batch feedback failed", extra={"error": e.message})
+
+        feedback, errors = await async_fan_out(
+            evaluate_answer_async,
+            {idx: answer for idx, answer in pending.items() if idx not in batched},
+            max_workers=FANOUT_MAX_WORKERS,
+            timeout=UPSTREAM_CALL_TIMEOUT,
+        )
+        await asyncio.to_thread(
+            remember_feedback, answers, {**batched, **feedback}, signatures
+        )
+        return _feedback_result(feedback, errors, answers, mode, batched, reused)
+    except (ValidationError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Error in get_feedback", extra={"error": str(e)})
+        raise APIError(f"피드백을 생성하는 중 오류가 발생했습니다: {str(e)}")
+
+
+def _feedback_result(feedback, errors, answers, mode, batched, reused):
+    if errors and not feedback and not batched and not reused:
+        error = next(iter(errors.values()))
+        if isinstance(error, RateLimitedError):
+            # 업스트림 혼잡은 500 대신 429 + Retry-After 로 전달
+            raise error
+        raise APIError(f"피드백을 생성하는 중 오류가 발생했습니다: {str(error)}")
+
+    # 재사용/일괄/개별 결과를 요청한 답변 순서대로 합침
+    merged = {
+        **{idx: text for idx, (text, _) in reused.items()},
+        **batched,
+        **feedback,
+    }
+    result = {
+        "feedback": {idx: merged[idx] for idx in answers if idx in merged},
+        # 재사용한 답변: 이전 답변과의 추정 유사도
+        "reused": {
+            idx: round(similarity, 3) for idx, (_, similarity) in reused.items()
+        },
+    }
+    if mode == "batch":
+        result["mode"] = mode
+        result["fallback"] = [
+            idx for idx in answers if idx not in batched and idx not in reused
+        ]
+    if errors:
+        for idx, error in errors.items():
+            logger.error("Feedback error", extra={"idx": idx, "error": str(error)})
+        result["errors"] = {idx: str(error) for idx, error in errors.items()}
+    return result
+
+
+def stream_feedback(answers):
+    # 검증은 스트림을 열기 전에 수행해 400 응답을 그대로 돌려줄 수 있게 함
+    validate_answers(answers)
+    return _feedback_events(answers)
+
+
+def _feedback_events(answers):
+    reused, signatures = find_reusable_feedback(answers)
+    for idx, (text, similarity) in reused.items():
+        yield "feedback", {
+            "idx": idx,
+            "feedback": text,
+            "reused": round(similarity, 3),
+        }
+
+    feedback = {}
+    events = fan_out_stream(
+        lambda answer: stream_chat_completion(feedback_messages(answer)),
+        {idx: answer for idx, answer in answers.items() if idx not in reused},
+        max_workers=FANOUT_MAX_WORKERS,
+        timeout=UPSTREAM_CALL_TIMEOUT,
+    )
+    for kind, idx, value in events:
+        if kind == "item":
+            feedback.setdefault(idx, []).append(value)
+            yield "token", {"idx": idx, "delta": value}
+        elif kind == "done":
+            text = "".join(feedback.pop(idx, []))
+            remember_feedback(answers, {idx: text}, signatures)
+            yield "feedback", {"idx": idx, "feedback": text}
+        else:
+            logger.error(
+                "Feedback stream error", extra={"idx": idx, "error": str(value)}
+            )
+            yield "error", {"idx": idx, "message": str(value)}
+    yield "end", {}
@@ -1,137 +1,584 @@
+import re
+import json
+import asyncio
+import logging
+import heapq
+import unicodedata
 from collections import Counter
-from app.config import kiwi, g4f_client, GPT_MODEL
-from app.exception import ValidationError, APIError
+from operator import itemgetter
+from app.config import (
+    kiwi,
+    g4f_client,
+    g4f_async_client,
+    g4f_upstream,
+    GPT_MODEL,
+    MAX_BATCH_TEXTS,
+    ANALYSIS_CACHE_SIZE,
+    ANALYSIS_MAX_TOP_K,
+    CACHE_DB_PATH,
+    SENTENCE_CACHE_SIZE,
+    SENTENCE_REPAIR_RETRIES,
+    PROFILE_DB_PATH,
+    PROFILE_TOP_K,
+    PROFILE_HALF_LIFE_DAYS,
+)
+from app.utils.cache import LRUCache, PersistentCache, make_key
+from app.utils.profile_store import VocabularyProfileStore
+from app.utils.singleflight import SingleFlight
+from app.utils.llm import stream_chat_completion
+from app.exception import ValidationError, NotFoundError, APIError
 
+logger = logging.getLogger(__name__)
 
-def analyze_text(text):
+# 정규화된 텍스트 해시 -> 품사별 카운트 (top_k / pos_filter 는 조회 시 적용)
+analysis_cache = LRUCache(ANALYSIS_CACHE_SIZE)
+# 같은 단어 조합에 대한 동시 문장 생성 요청을 하나로 합침
+sentence_flight = SingleFlight("sentences")
+# 정렬된 (명사, 동사, 부사) 집합 기준 만능문장 캐시 (검증을 통과한 배열만 저장)
+sentence_cache = PersistentCache(CACHE_DB_PATH, "sentences", maxsize=SENTENCE_CACHE_SIZE)
+
+# 학습자별 누적 품사 카운트와 품사별 상위 단어
+learner_profiles = VocabularyProfileStore(
+    PROFILE_DB_PATH,
+    top_k=PROFILE_TOP_K,
+    half_life=PROFILE_HALF_LIFE_DAYS * 86400 or None,
+)
+
+_TRAILING_COMMA = re.compile(r",\s*([\]}])")
+
+
+def normalize_text(text):
+    # 공백/유니코드 정규화로 STT/TTS 왕복 후 재제출된 같은 답변을 같은 키로 묶음
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+# 문장 부호/기호 태그 (영문 SL, 숫자 SN 은 유지)
+_PUNCTUATION_TAGS = {"SF", "SP", "SS", "SSO", "SSC", "SE", "SO", "SW"}
+
+
+def tokenize_forms(text):
+    # 문장 부호를 뺀 형태소 목록 (비교용으로 소문자화)
+    return [
+        token.form.lower()
+        for token in kiwi.tokenize(normalize_text(text))
+        if token.tag not in _PUNCTUATION_TAGS
+    ]
+
+
+def count_tokens(tokens):
+    # 한 번의 순회로 품사별 단어 카운터와 고유 단어 집합을 함께 구성
+    word_count_by_pos = {}
+    forms = set()
+    for token in tokens:
+        pos = token.tag  # 품사
+        word = token.form  # 단어
+
+        forms.add(word)
+        counter = word_count_by_pos.get(pos)
+        if counter is None:
+            counter = word_count_by_pos[pos] = Counter()
+        counter[word] += 1
+
+    return {"total_words": len(tokens), "forms": forms, "counts": word_count_by_pos}
+
+
+def top_words_by_pos(word_count_by_pos, top_k=10, pos_filter=None):
+    # 요청된 품사만 힙으로 상위 top_k 단어 추출
+    tags = word_count_by_pos if pos_filter is None else pos_filter
+    return {
+        pos: heapq.nlargest(top_k, word_count_by_pos[pos].items(), key=itemgetter(1))
+        for pos in tags
+        if pos in word_count_by_pos
+    }
+
+
+def build_analysis(counted, top_k=10, pos_filter=None):
+    return {
+        "total_words": counted["total_words"],
+        "unique_words": len(counted["forms"]),
+        "word_count_by_pos": top_words_by_pos(counted["counts"], top_k, pos_filter),
+    }
+
+
+def validate_analysis_options(top_k, pos_filter):
+    if top_k is None:
+        top_k = 10
+    if isinstance(top_k, bool) or not isinstance(top_k, int):
+        raise ValidationError("top_k 는 정수여야 합니다")
+    if not 1 <= top_k <= ANALYSIS_MAX_TOP_K:
+        raise ValidationError(f"top_k 는 1 이상 {ANALYSIS_MAX_TOP_K} 이하여야 합니다")
+    if pos_filter is not None and (
+        not isinstance(pos_filter, list)
+        or not all(isinstance(pos, str) for pos in pos_filter)
+    ):
+        raise ValidationError("pos_filter 는 품사 태그 문자열 목록이어야 합니다")
+    return top_k, pos_filter
+
+
+def count_texts(texts):
+    # 캐시에 없는 텍스트만 모아 Kiwi 다중 텍스트 분석(멀티스레드)으로 처리하고,
+    # 입력 순서대로 카운트 결과를 반환
+    normalized = [normalize_text(text) for text in texts]
+    keys = [make_key(text) for text in normalized]
+    cached = [analysis_cache.get(key) for key in keys]
+
+    misses = [text for text, counted in zip(normalized, cached) if counted is None]
+    analyses = iter(kiwi.analyze(misses)) if misses else iter(())
+
+    for key, counted in zip(keys, cached):
+        if counted is None:
+            tokens = next(analyses)[0][0]  # 첫 번째 분석 결과의 형태소 분석 결과
+            counted = count_tokens(tokens)
+            analysis_cache.set(key, counted)
+        yield counted
+
+
+def analyze_text(text, top_k=None, pos_filter=None):
     try:
-        if not text:
+        if not text or not text.strip():
             raise ValidationError("분석할 텍스트가 제공되지 않았습니다")
+        top_k, pos_filter = validate_analysis_options(top_k, pos_filter)
+
+        # 형태소 분석 및 품사 태깅 (같은 텍스트는 캐시에서 재사용)
+        counted = next(count_texts([text]))
+
+        return build_analysis(counted, top_k, pos_filter)
+    except (ValidationError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Error in analyze_text", extra={"error": str(e)})
+        raise APIError(f"텍스트 분석 중 오류가 발생했습니다: {str(e)}")
+
+
+def validate_texts(texts):
+    if not isinstance(texts, list) or not texts:
+        raise ValidationError("분석할 텍스트 목록이 제공되지 않았습니다")
+    if len(texts) > MAX_BATCH_TEXTS:
+        raise ValidationError(
+            f"한 번에 분석할 수 있는 텍스트는 최대 {MAX_BATCH_TEXTS}개입니다"
+        )
+    for idx, text in enumerate(texts):
+        if not isinstance(text, str) or not text.strip():
+            raise ValidationError(f"{idx}번째 텍스트가 비어 있습니다")
 
-        # 형태소 분석 및 품사 태깅
-        pos_list = kiwi.analyze(text)[0][0]  # 첫 번째 분석 결과의 형태소 분석 결과
 
-        # 품사별 단어 카운팅
-        word_count_by_pos = {}
-        for token in pos_list:
-            pos = token.tag  # 품사
-            word = token.form  # 단어
+def new_corpus():
+    return {"total_words": 0, "forms": set(), "counts": {}}
 
-            if pos not in word_count_by_pos:
-                word_count_by_pos[pos] = Counter()
-            word_count_by_pos[pos][word] += 1
 
-        # 각 품사별 상위 단어 추출
-        result_by_pos = {}
-        for pos, counter in word_count_by_pos.items():
-            result_by_pos[pos] = counter.most_common(10)  # 상위 10개 단어
+def merge_counts(corpus, counted):
+    corpus["total_words"] += counted["total_words"]
+    corpus["forms"].update(counted["forms"])
+    for pos, counter in counted["counts"].items():
+        corpus["counts"].setdefault(pos, Counter()).update(counter)
+
+
+def iter_analyze_texts(texts, corpus, top_k=10, pos_filter=None):
+    # 순서대로 텍스트별 결과를 반환하며 corpus 에 누적
+    for idx, counted in enumerate(count_texts(texts)):
+        merge_counts(corpus, counted)
+        yield {"index": idx, **build_analysis(counted, top_k, pos_filter)}
+
+
+def summarize_corpus(corpus, text_count, top_k=10, pos_filter=None):
+    return {"text_count": text_count, **build_analysis(corpus, top_k, pos_filter)}
+
+
+def analyze_texts(texts, top_k=None, pos_filter=None):
+    try:
+        validate_texts(texts)
+        top_k, pos_filter = validate_analysis_options(top_k, pos_filter)
+
+        corpus = new_corpus()
+        results = list(iter_analyze_texts(texts, corpus, top_k, pos_filter))
 
         return {
-            "total_words": len(pos_list),
-            "unique_words": len(set(token.form for token in pos_list)),
-            "word_count_by_pos": result_by_pos,
+            "results": results,
+            "summary": summarize_corpus(corpus, len(texts), top_k, pos_filter),
         }
-    except ValidationError:
+    except (ValidationError, APIError):
         raise
     except Exception as e:
-        print(f"Error in analyze_text: {str(e)}")
+        logger.error("Error in analyze_texts", extra={"error": str(e)})
         raise APIError(f"텍스트 분석 중 오류가 발생했습니다: {str(e)}")
 
 
-def generate_sentences(analysis):
+def stream_analyze_texts(texts, top_k=None, pos_filter=None):
+    # 검증은 스트림을 열기 전에 수행해 400 응답을 그대로 돌려줄 수 있게 함
+    validate_texts(texts)
+    top_k, pos_filter = validate_analysis_options(top_k, pos_filter)
+    return _analysis_lines(texts, top_k, pos_filter)
+
+
+def _analysis_lines(texts, top_k, pos_filter):
+    corpus = new_corpus()
+    try:
+        for result in iter_analyze_texts(texts, corpus, top_k, pos_filter):
+            yield result
+    except Exception as e:
+        logger.error("Error in stream_analyze_texts", extra={"error": str(e)})
+        yield {"status": "error", "message": f"텍스트 분석 중 오류가 발생했습니다: {str(e)}"}
+        return
+    yield {"summary": summarize_corpus(corpus, len(texts), top_k, pos_filter)}
+
+
+def validate_learner_id(learner_id):
+    if not isinstance(learner_id, str) or not learner_id.strip():
+        raise ValidationError("learner_id 는 비어 있지 않은 문자열이어야 합니다")
+    if len(learner_id) > 128:
+        raise ValidationError("learner_id 는 128자를 넘을 수 없습니다")
+    return learner_id.strip()
+
+
+def record_learner_text(learner_id, text):
+    # 분석 결과(캐시 재사용)를 학습자 프로필에 누적. 같은 텍스트는 한 번만 반영
     try:
-        if not analysis:
-            raise ValidationError("분석 데이터가 제공되지 않았습니다")
-
-        # 분석 데이터에서 주요 단어 추출
-        nouns = [
-            word for word, _ in analysis.get("word_count_by_pos", {}).get("NNG", [])
-        ]
-        verbs = [
-            word for word, _ in analysis.get("word_count_by_pos", {}).get("VV", [])
-        ]
-        adverbs = [
-            word for word, _ in analysis.get("word_count_by_pos", {}).get("MAG", [])
-        ]
-
-        # 단어가 너무 적으면 경고
-        if not nouns and not verbs and not adverbs:
-            raise ValidationError("분석 데이터에서 충분한 단어를 추출할 수 없습니다")
-
-        # GPT 프롬프트 구성
-        prompt = f"""You are an expert OPIC tutor specializing in creating "Universal Sentences (만능문장)".
-
-        Based on these frequently used Korean words from the student:
-        Nouns: {', '.join(nouns[:5])}
-        Verbs: {', '.join(verbs[:5])}
-        Adverbs: {', '.join(adverbs[:5])}
-
-        Create 10 pairs of OPIC universal sentences (만능문장) that meet these criteria:
-        
-        Key Requirements:
-        1. REUSABILITY (재활용성)
-        - Can be adapted to various similar situations
-        - Easy to modify by changing key words
-        - Flexible enough to use in multiple OPIC topics
-
-        2. NATURALNESS (자연스러움)
-        - Must use casual, spoken Korean (구어체) like '-요', '-거든요', '-는데요' endings
-        - Avoid formal or written language patterns
-        - Use everyday conversational expressions and fillers
-        - Sound like natural daily conversation, as if talking to a friend
-        - Use declarative sentences, NOT questions
-        - Include common spoken expressions like '그래서', '사실은', '진짜' etc.
-
-        3. EFFECTIVENESS (효과성)
-        - Incorporate the student's frequently used words
-        - Simple yet sophisticated enough for OPIC
-        - Include useful expressions for scoring points
-        - Focus on casual, spoken statements and descriptions
-
-        4. PRACTICALITY (실용성)
-        - Easy to memorize and use
-        - Relevant to daily life experiences
-        - Can be used as template sentences
-        - Should be conversational declarative sentences that describe situations or express opinions
-        - Must sound natural in spoken Korean
-
-        Format each sentence pair as:
-        {{
-            "korean": "구어체 한국어 만능문장 (예: ~는데요, ~거든요, ~요 등의 말투)",
-            "english": "Natural conversational English (casual speaking style)",
-            "usage": "When and how to use this sentence (사용 상황 설명)"
-        }}
-
-        Return only the JSON array of 10 sentence pairs, focusing on creating truly reusable, natural, and effective universal sentences that reflect authentic spoken Korean."""
+        learner_id = validate_learner_id(learner_id)
+        if not text or not text.strip():
+            raise ValidationError("분석할 텍스트가 제공되지 않았습니다")
+
+        counted = next(count_texts([text]))
+        text_key = make_key(normalize_text(text))
+        profile, merged = learner_profiles.merge(learner_id, counted, text_key)
+        return _learner_result(learner_id, profile, merged=merged)
+    except (ValidationError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Error in record_learner_text", extra={"error": str(e)})
+        raise APIError(f"학습자 프로필을 갱신하는 중 오류가 발생했습니다: {str(e)}")
+
+
+def get_learner_profile(learner_id, top_k=None, pos_filter=None):
+    try:
+        learner_id = validate_learner_id(learner_id)
+        if top_k is not None:
+            top_k, pos_filter = validate_analysis_options(top_k, pos_filter)
+
+        profile = learner_profiles.get(learner_id)
+        if profile is None:
+            raise NotFoundError(f"학습자 프로필을 찾을 수 없습니다: {learner_id}")
+        return _learner_result(learner_id, profile, top_k, pos_filter)
+    except (ValidationError, NotFoundError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Error in get_learner_profile", extra={"error": str(e)})
+        raise APIError(f"학습자 프로필을 가져오는 중 오류가 발생했습니다: {str(e)}")
+
+
+def _learner_result(learner_id, profile, top_k=None, pos_filter=None, merged=None):
+    result = {
+        "learner_id": learner_id,
+        "text_count": profile["text_count"],
+        "total_words": profile["total_words"],
+        "updated_at": profile["updated_at"],
+        "word_count_by_pos": learner_profiles.top_words(profile, top_k, pos_filter),
+    }
+    if merged is not None:
+        result["merged"] = merged
+    return result
+
+
+def resolve_sentence_analysis(analysis, learner_id=None):
+    # analysis 가 없으면 학습자 프로필의 누적 상위 단어를 사용 (재분석 없음)
+    if analysis or learner_id is None:
+        return analysis
+    return get_learner_profile(learner_id, pos_filter=["NNG", "VV", "MAG"])
+
+
+def extract_sentence_words(analysis):
+    if not analysis:
+        raise ValidationError("분석 데이터가 제공되지 않았습니다")
+
+    # 분석 데이터에서 주요 단어 추출
+    nouns = [
+        word for word, _ in analysis.get("word_count_by_pos", {}).get("NNG", [])
+    ]
+    verbs = [
+        word for word, _ in analysis.get("word_count_by_pos", {}).get("VV", [])
+    ]
+    adverbs = [
+        word for word, _ in analysis.get("word_count_by_pos", {}).get("MAG", [])
+    ]
+
+    # 단어가 너무 적으면 경고
+    if not nouns and not verbs and not adverbs:
+        raise ValidationError("분석 데이터에서 충분한 단어를 추출할 수 없습니다")
+
+    return nouns[:5], verbs[:5], adverbs[:5]
+
+
+def sentence_messages(nouns, verbs, adverbs):
+    # GPT 프롬프트 구성
+    prompt = f"""You are an expert OPIC tutor specializing in creating "Universal Sentences (만능문장)".
+
+    Based on these frequently used Korean words from the student:
+    Nouns: {', '.join(nouns[:5])}
+    Verbs: {', '.join(verbs[:5])}
+    Adverbs: {', '.join(adverbs[:5])}
+
+    Create 10 pairs of OPIC universal sentences (만능문장) that meet these criteria:
+    
+    Key Requirements:
+    1. REUSABILITY (재활용성)
+    - Can be adapted to various similar situations
+    - Easy to modify by changing key words
+    - Flexible enough to use in multiple OPIC topics
+
+    2. NATURALNESS (자연스러움)
+    - Must use casual, spoken Korean (구어체) like '-요', '-거든요', '-는데요' endings
+    - Avoid formal or written language patterns
+    - Use everyday conversational expressions and fillers
+    - Sound like natural daily conversation, as if talking to a friend
+    - Use declarative sentences, NOT questions
+    - Include common spoken expressions like '그래서', '사실은', '진짜' etc.
+
+    3. EFFECTIVENESS (효과성)
+    - Incorporate the student's frequently used words
+    - Simple yet sophisticated enough for OPIC
+    - Include useful expressions for scoring points
+    - Focus on casual, spoken statements and descriptions
+
+    4. PRACTICALITY (실용성)
+    - Easy to memorize and use
+    - Relevant to daily life experiences
+    - Can be used as template sentences
+    - Should be conversational declarative sentences that describe situations or express opinions
+    - Must sound natural in spoken Korean
+
+    Format each sentence pair as:
+    {{
+        "korean": "구어체 한국어 만능문장 (예: ~는데요, ~거든요, ~요 등의 말투)",
+        "english": "Natural conversational English (casual speaking style)",
+        "usage": "When and how to use this sentence (사용 상황 설명)"
+    }}
+
+    Return only the JSON array of 10 sentence pairs, focusing on creating truly reusable, natural, and effective universal sentences that reflect authentic spoken Korean."""
+
+    return [
+        {
+            "role": "system",
+            "content": """You are an OPIC tutor who specializes in creating '만능문장' (universal sentences).
+            만능문장 are special sentences that:
+            - Are easy to remember
+            - Can be used in multiple situations
+            - Sound natural in conversation
+            - Help score higher on OPIC tests
+            Your goal is to create sentences that students can easily adapt and reuse.""",
+        },
+        {"role": "user", "content": prompt},
+    ]
+
+
+def sentence_key(nouns, verbs, adverbs):
+    # 단어 집합을 정렬해 빈도 순서가 달라도 같은 어휘면 같은 키를 사용
+    return make_key(
+        GPT_MODEL,
+        "|".join(sorted(nouns)),
+        "|".join(sorted(verbs)),
+        "|".join(sorted(adverbs)),
+    )
+
+
+def parse_sentences(content):
+    # 모델 응답에서 만능문장 JSON 배열을 꺼내 검증. 형식이 맞지 않으면 ValueError
+    if not content:
+        raise ValueError("빈 응답입니다")
+
+    # 코드 블록 표시나 앞뒤 설명은 건너뛰고 가장 바깥 배열만 사용
+    start, end = content.find("["), content.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError("JSON 배열을 찾을 수 없습니다")
+    raw = content[start : end + 1]
+    try:
+        items = json.loads(raw)
+    except ValueError:
+        # 닫는 괄호 앞의 쉼표처럼 흔한 형식 오류를 정리한 뒤 한 번 더 시도
+        items = json.loads(_TRAILING_COMMA.sub(r"\1", raw))
+    if not isinstance(items, list):
+        raise ValueError("JSON 배열이 아닙니다")
+
+    sentences = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        korean, english = item.get("korean"), item.get("english")
+        if not isinstance(korean, str) or not isinstance(english, str):
+            continue
+        if not korean.strip() or not english.strip():
+            continue
+        usage = item.get("usage")
+        sentences.append(
+            {
+                "korean": korean.strip(),
+                "english": english.strip(),
+                "usage": usage.strip() if isinstance(usage, str) else "",
+            }
+        )
+
+    if not sentences:
+        raise ValueError("유효한 문장이 없습니다")
+    return sentences
+
+
+def repair_messages(content, error):
+    return [
+        {
+            "role": "system",
+            "content": "You fix malformed JSON. Return only the corrected JSON array, with no explanation.",
+        },
+        {
+            "role": "user",
+            "content": f"""The following output should be a JSON array of objects with "korean", "english" and "usage" string fields, but it failed to parse ({error}).
+Return the corrected JSON array only.
+
+{content}""",
+        },
+    ]
+
+
+def _sentence_completion(messages):
+    response = g4f_upstream.call(
+        lambda model: g4f_client.chat.completions.create(model=model, messages=messages)
+    )
+    return response.choices[0].message.content
+
+
+async def _sentence_completion_async(messages):
+    response = await g4f_upstream.call_async(
+        lambda model: g4f_async_client.chat.completions.create(
+            model=model, messages=messages
+        )
+    )
+    return response.choices[0].message.content
+
+
+def _parse_or_repair(content):
+    # 파싱에 실패하면 모델에 형식 수정만 요청 (문장을 새로 생성하지 않음)
+    for attempt in range(SENTENCE_REPAIR_RETRIES + 1):
+        try:
+            return parse_sentences(content)
+        except ValueError as e:
+            logger.warning(
+                "Malformed sentences output",
+                extra={"attempt": attempt + 1, "error": str(e)},
+            )
+            if attempt == SENTENCE_REPAIR_RETRIES:
+                raise APIError("생성된 문장 형식을 해석할 수 없습니다", status_code=502)
+            content = _sentence_completion(repair_messages(content, e))
+
+
+async def _parse_or_repair_async(content):
+    for attempt in range(SENTENCE_REPAIR_RETRIES + 1):
+        try:
+            return parse_sentences(content)
+        except ValueError as e:
+            logger.warning(
+                "Malformed sentences output",
+                extra={"attempt": attempt + 1, "error": str(e)},
+            )
+            if attempt == SENTENCE_REPAIR_RETRIES:
+                raise APIError("생성된 문장 형식을 해석할 수 없습니다", status_code=502)
+            content = await _sentence_completion_async(repair_messages(content, e))
+
+
+def _sentences_result(sentences, nouns, verbs, adverbs, cached):
+    return {
+        "sentences": sentences,
+        "words": {"nouns": nouns, "verbs": verbs, "adverbs": adverbs},
+        "cached": cached,
+    }
+
+
+def generate_sentences(analysis, learner_id=None):
+    try:
+        analysis = resolve_sentence_analysis(analysis, learner_id)
+        nouns, verbs, adverbs = extract_sentence_words(analysis)
+
+        # 같은 어휘 조합은 캐시된 결과를 바로 반환
+        cache_key = sentence_key(nouns, verbs, adverbs)
+        cached = sentence_cache.get(cache_key)
+        if cached is not None:
+            return _sentences_result(cached, nouns, verbs, adverbs, True)
 
         # GPT로 문장 생성
-        response = g4f_client.chat.completions.create(
-            model=GPT_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an OPIC tutor who specializes in creating '만능문장' (universal sentences).
-                    만능문장 are special sentences that:
-                    - Are easy to remember
-                    - Can be used in multiple situations
-                    - Sound natural in conversation
-                    - Help score higher on OPIC tests
-                    Your goal is to create sentences that students can easily adapt and reuse.""",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        def generate():
+            content = _sentence_completion(sentence_messages(nouns, verbs, adverbs))
+            sentences = _parse_or_repair(content)
+            sentence_cache.set(cache_key, sentences)
+            return sentences
+
+        sentences = sentence_flight.do(cache_key, generate)
+
+        return _sentences_result(sentences, nouns, verbs, adverbs, False)
+    except (ValidationError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Error in generate_sentences", extra={"error": str(e)})
+        raise APIError(f"문장 생성 중 오류가 발생했습니다: {str(e)}")
+
+
+async def generate_sentences_async(analysis, learner_id=None):
+    try:
+        # 프로필/캐시 조회는 SQLite 를 쓰므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        analysis = await asyncio.to_thread(
+            resolve_sentence_analysis, analysis, learner_id
         )
+        nouns, verbs, adverbs = extract_sentence_words(analysis)
 
-        return {
-            "sentences": response.choices[0].message.content,
-            "words": {
-                "nouns": nouns[:5],
-                "verbs": verbs[:5],
-                "adverbs": adverbs[:5],
-            },
-        }
-    except ValidationError:
+        cache_key = sentence_key(nouns, verbs, adverbs)
+        cached = await asyncio.to_thread(sentence_cache.get, cache_key)
+        if cached is not None:
+            return _sentences_result(cached, nouns, verbs, adverbs, True)
+
+        async def generate():
+            content = await _sentence_completion_async(
+                sentence_messages(nouns, verbs, adverbs)
+            )
+            sentences = await _parse_or_repair_async(content)
+            await asyncio.to_thread(sentence_cache.set, cache_key, sentences)
+            return sentences
+
+        sentences = await sentence_flight.do_async(cache_key, generate)
+
+        return _sentences_result(sentences, nouns, verbs, adverbs, False)
+    except (ValidationError, APIError):
         raise
     except Exception as e:
-        print(f"Error in generate_sentences: {str(e)}")
+        logger.error("Error in generate_sentences", extra={"error": str(e)})
         raise APIError(f"문장 생성 중 오류가 발생했습니다: {str(e)}")
+
+
+def stream_sentences(analysis, learner_id=None):
+    # 검증은 스트림을 열기 전에 수행해 400 응답을 그대로 돌려줄 수 있게 함
+    analysis = resolve_sentence_analysis(analysis, learner_id)
+    nouns, verbs, adverbs = extract_sentence_words(analysis)
+    return _sentence_events(nouns, verbs, adverbs)
+
+
+def _sentence_events(nouns, verbs, adverbs):
+    yield "words", {"nouns": nouns, "verbs": verbs, "adverbs": adverbs}
+
+    # 캐시에 있으면 토큰 스트림 없이 바로 결과 전송
+    cache_key = sentence_key(nouns, verbs, adverbs)
+    cached = sentence_cache.get(cache_key)
+    if cached is not None:
+        yield "sentences", {"sentences": cached, "cached": True}
+        yield "end", {}
+        return
+
+    parts = []
+    try:
+        for delta in stream_chat_completion(sentence_messages(nouns, verbs, adverbs)):
+            parts.append(delta)
+            yield "token", {"delta": delta}
+
+        sentences = _parse_or_repair("".join(parts))
+        sentence_cache.set(cache_key, sentences)
+    except Exception as e:
+        logger.error("Error in stream_sentences", extra={"error": str(e)})
+        message = e.message if isinstance(e, APIError) else str(e)
+        yield "error", {"message": f"문장 생성 중 오류가 발생했습니다: {message}"}
+        return
+
+    yield "sentences", {"sentences": sentences, "cached": False}
+    yield "end", {}
@@ -1,30 +1,101 @@
-from app.config import g4f_client, GPT_MODEL
+import asyncio
+import logging
+from app.config import (
+    g4f_client,
+    g4f_async_client,
+    g4f_upstream,
+    GPT_MODEL,
+    CACHE_DB_PATH,
+    TRANSLATION_CACHE_SIZE,
+)
+from app.utils.cache import PersistentCache, make_key
+from app.utils.singleflight import SingleFlight
 from app.exception import ValidationError, APIError
 
+logger = logging.getLogger(__name__)
+
+# (원문, 모델) 기준 번역 캐시
+translation_cache = PersistentCache(
+    CACHE_DB_PATH, "translations", maxsize=TRANSLATION_CACHE_SIZE
+)
+# 같은 원문에 대한 동시 번역 요청을 하나로 합침
+translation_flight = SingleFlight("translation")
+
+
+def translation_messages(text):
+    return [
+        {
+            "role": "system",
+            "content": "You are a professional translator. Translate the given Korean text to natural English, maintaining the same meaning and nuance.",
+        },
+        {"role": "user", "content": f"Translate this to English: {text}"},
+    ]
+
+
+def _store_translation(cache_key, response):
+    if not response or not response.choices or not response.choices[0].message:
+        raise APIError("번역 API에서 올바른 응답을 받지 못했습니다")
+
+    translated = response.choices[0].message.content
+    if translated:
+        translation_cache.set(cache_key, translated)
+    return translated
+
 
 def translate_to_english(text):
     try:
         if not text:
             raise ValidationError("번역할 텍스트가 제공되지 않았습니다")
 
-        response = g4f_client.chat.completions.create(
-            model=GPT_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a professional translator. Translate the given Korean text to natural English, maintaining the same meaning and nuance.",
-                },
-                {"role": "user", "content": f"Translate this to English: {text}"},
-            ],
-        )
+        cache_key = make_key(GPT_MODEL, text)
+        cached = translation_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        if not response or not response.choices or not response.choices[0].message:
-            raise APIError("번역 API에서 올바른 응답을 받지 못했습니다")
+        def translate():
+            response = g4f_upstream.call(
+                lambda model: g4f_client.chat.completions.create(
+                    model=model, messages=translation_messages(text)
+                )
+            )
+            return _store_translation(cache_key, response)
 
-        return response.choices[0].message.content
+        return translation_flight.do(cache_key, translate)
 
-    except ValidationError:
+    except (ValidationError, APIError):
         raise
     except Exception as e:
-        print(f"Translation error: {str(e)}")
+        logger.error("Translation error", extra={"error": str(e)})
         raise APIError(f"번역 중 오류가 발생했습니다: {str(e)}")
+
+
+async def translate_to_english_async(text):
+    try:
+        if not text:
+            raise ValidationError("번역할 텍스트가 제공되지 않았습니다")
+
+        # 캐시 조회/저장은 SQLite 를 쓰므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        cache_key = make_key(GPT_MODEL, text)
+        cached = await asyncio.to_thread(translation_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        async def translate():
+            response = await g4f_upstream.call_async(
+                lambda model: g4f_async_client.chat.completions.create(
+                    model=model, messages=translation_messages(text)
+                )
+            )
+            return await asyncio.to_thread(_store_translation, cache_key, response)
+
+        return await translation_flight.do_async(cache_key, translate)
+
+    except (ValidationError, APIError):
+        raise
+    except Exception as e:
+        logger.error("Translation error", extra={"error": str(e)})
+        raise APIError(f"번역 중 오류가 발생했습니다: {str(e)}")
+
+
+def is_translation_cached(text):
+    return make_key(GPT_MODEL, text) in translation_cache
@@ -0,0 +1,228 @@
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from app.utils.metrics import metrics
+from app.exception import APIError
+
+# 숫자가 작을수록 먼저 처리 (대화형 요청 > 일반 > 미리 만들기/작업 큐)
+PRIORITIES = {"interactive": 0, "normal": 1, "batch": 2}
+
+_priority = contextvars.ContextVar("upstream_priority", default="normal")
+_gates = {}
+
+admission_wait = metrics.histogram(
+    "upstream_admission_wait_seconds",
+    "Time spent waiting for an upstream concurrency slot",
+    ("upstream", "target", "priority"),
+)
+admission_rejected = metrics.counter(
+    "upstream_admission_rejected_total",
+    "Upstream calls rejected before being sent",
+    ("upstream", "target", "reason"),
+)
+
+
+class RateLimitedError(APIError):
+    # 429 + Retry-After (초)
+    def __init__(self, message, retry_after=1, payload=None):
+        super().__init__(message, status_code=429, payload=payload)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def priority(name):
+    # 이 블록 안에서 나가는 업스트림 호출의 우선순위 (스레드 풀로도 전파됨)
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def run_with_priority(name, func, *args, **kwargs):
+    with priority(name):
+        return func(*args, **kwargs)
+
+
+def iter_with_priority(name, iterable):
+    # 스트리밍 응답은 라우트 함수가 끝난 뒤 소비되므로 항목을 꺼낼 때마다 우선순위를 지정
+    iterator = iter(iterable)
+    try:
+        while True:
+            with priority(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        if hasattr(iterator, "close"):
+            iterator.close()
+
+
+class _Waiter:
+    def __init__(self, loop=None):
+        self.granted = False
+        self.cancelled = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def grant(self):
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class AdmissionGate:
+    # 공급자별 동시 호출 상한. 자리가 없으면 우선순위 순서로 대기하고,
+    # 예상 대기 시간이 max_wait 를 넘으면 기다리지 않고 바로 429 로 거절
+    def __init__(self, upstream, target, limit, max_wait=10.0):
+        self.upstream = upstream
+        self.target = target
+        self.limit = limit
+        self.max_wait = max_wait
+        self.inflight = 0
+        self.hold_time = 1.0  # 슬롯 점유 시간 지수 이동 평균(초)
+        self._waiters = []  # (우선순위, 순번, waiter)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        _gates[(upstream, target)] = self
+
+    def _estimate_wait(self, rank):
+        # 앞에 rank 개가 기다리고 있을 때 예상 대기 시간
+        return (rank // self.limit + 1) * self.hold_time
+
+    def _enqueue(self, waiter):
+        # 자리가 있으면 바로 차지하고 None, 없으면 대기열에 넣고 예상 대기 시간을 반환
+        level = PRIORITIES.get(current_priority(), PRIORITIES["normal"])
+        with self._lock:
+            if self.limit <= 0 or (self.inflight < self.limit and not self._waiters):
+                self.inflight += 1
+                return None
+            rank = sum(1 for entry in self._waiters if entry[0] <= level)
+            estimate = self._estimate_wait(rank)
+            if estimate > self.max_wait:
+                self._reject("queue_full", estimate)
+            heapq.heappush(self._waiters, (level, next(self._sequence), waiter))
+            return estimate
+
+    def _reject(self, reason, retry_after):
+        admission_rejected.inc(upstream=self.upstream, target=self.target, reason=reason)
+        raise RateLimitedError(
+            f"'{self.upstream}' 업스트림({self.target}) 요청이 많습니다. "
+            "잠시 후 다시 시도해 주세요",
+            retry_after=retry_after,
+        )
+
+    def _abandon(self, waiter):
+        # 대기 시간 초과/취소: 이미 자리를 받았다면 되돌려줌
+        with self._lock:
+            waiter.cancelled = True
+            granted = waiter.granted
+        if granted:
+            self.release()
+
+    def acquire(self):
+        started = time.monotonic()
+        waiter = _Waiter()
+        estimate = self._enqueue(waiter)
+        if estimate is not None and not waiter.event.wait(self.max_wait):
+            self._abandon(waiter)
+            self._reject("timeout", estimate)
+        return self._observe(started)
+
+    async def acquire_async(self):
+        started = time.monotonic()
+        waiter = _Waiter(asyncio.get_running_loop())
+        estimate = self._enqueue(waiter)
+        if estimate is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait)
+            except asyncio.TimeoutError:
+                self._abandon(waiter)
+                self._reject("timeout", estimate)
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+        return self._observe(started)
+
+    def _observe(self, started):
+        # 대기 시간을 기록하고 자리를 받은 시각을 반환 (release 의 점유 시간 계산용)
+        acquired_at = time.monotonic()
+        admission_wait.observe(
+            acquired_at - started,
+            upstream=self.upstream,
+            target=self.target,
+            priority=current_priority(),
+        )
+        return acquired_at
+
+    def release(self, acquired_at=None):
+        with self._lock:
+            if acquired_at is not None:
+                held = time.monotonic() - acquired_at
+                self.hold_time = 0.8 * self.hold_time + 0.2 * held
+            # 취소되지 않은 가장 높은 우선순위 대기자에게 자리를 넘김
+            while self._waiters:
+                _, _, waiter = heapq.heappop(self._waiters)
+                if not waiter.cancelled:
+                    waiter.grant()
+                    return
+            self.inflight = max(0, self.inflight - 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "inflight": self.inflight,
+                "queued": sum(1 for entry in self._waiters if not entry[2].cancelled),
+                "hold_time": round(self.hold_time, 3),
+            }
+
+
+def admission_stats():
+    return {
+        f"{upstream}:{target}": gate.stats()
+        for (upstream, target), gate in _gates.items()
+    }
+
+
+@metrics.register_collector
+def collect_admission():
+    stats = [(key, gate.stats()) for key, gate in _gates.items()]
+    return [
+        (
+            "upstream_inflight",
+            "gauge",
+            "Upstream calls currently holding a concurrency slot",
+            [
+                ({"upstream": upstream, "target": target}, gate["inflight"])
+                for (upstream, target), gate in stats
+            ],
+        ),
+        (
+            "upstream_queue_depth",
+            "gauge",
+            "Upstream calls waiting for a concurrency slot",
+            [
+                ({"upstream": upstream, "target": target}, gate["queued"])
+                for (upstream, target), gate in stats
+            ],
+        ),
+    ]
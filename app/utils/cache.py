@@ -0,0 +1,211 @@
+import logging
+import os
+import json
+import time
+import hashlib
+import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts):
+    # 여러 값을 묶어 고정 길이 캐시 키로 변환
+    raw = "\x1f".join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PersistentCache:
+    # 메모리 LRU 앞단 + SQLite 디스크 저장소
+    def __init__(self, path, table, maxsize=1024):
+        self.path = path
+        self.table = table
+        self.memory = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        try:
+            with self._lock:
+                row = (
+                    self._connect()
+                    .execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,))
+                    .fetchone()
+                )
+        except sqlite3.Error as e:
+            logger.warning(
+                "Cache read error", extra={"table": self.table, "error": str(e)}
+            )
+            return default
+
+        if row is None:
+            return default
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            # 디스크 저장 실패는 메모리 캐시만으로 계속 진행
+            logger.warning(
+                "Cache write error", extra={"table": self.table, "error": str(e)}
+            )
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class FileCache:
+    # 콘텐츠 주소 기반 파일 캐시: 디스크에 저장하고, 메모리 인덱스로 LRU 용량 관리
+    def __init__(self, directory, max_bytes, suffix=""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._index = OrderedDict()  # key -> 파일 크기 (오래된 사용 순)
+        self._total = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def _load_index(self):
+        # 재시작 후에는 파일 접근 시간 순으로 인덱스를 복원
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                key = entry.name[: len(entry.name) - len(self.suffix)]
+                entries.append((stat.st_atime, key, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+        self._loaded = True
+
+    def get(self, key):
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):
+                self._total -= self._index.pop(key)
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key, source_path):
+        with self._lock:
+            self._load_index()
+        path = self._path(key)
+        # 임시 파일에 복사한 뒤 교체해 읽는 쪽이 잘린 파일을 보지 않게 함
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def total_bytes(self):
+        return self._total
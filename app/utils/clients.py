@@ -0,0 +1,182 @@
+import logging
+import time
+import inspect
+import threading
+from app.exception import APIError
+
+logger = logging.getLogger(__name__)
+
+
+class ClientUnavailableError(APIError):
+    def __init__(self, message, payload=None):
+        super().__init__(message, status_code=503, payload=payload)
+
+
+class _ClientEntry:
+    def __init__(self, name, factory, retry_interval, recreate_on_error):
+        self.name = name
+        self.factory = factory
+        self.retry_interval = retry_interval
+        self.recreate_on_error = recreate_on_error
+        self.instance = None
+        self.lock = threading.Lock()
+        self.status = "pending"  # pending -> connecting -> ready / failed
+        self.error = None
+        self.failed_at = None
+        self.ready_at = None
+
+
+class ClientRegistry:
+    # 원격 클라이언트를 처음 사용할 때(또는 백그라운드 워밍업 시) 생성하고 상태를 관리
+    def __init__(self):
+        self._entries = {}
+
+    def register(self, name, factory, retry_interval=30.0, recreate_on_error=True):
+        self._entries[name] = _ClientEntry(
+            name, factory, retry_interval, recreate_on_error
+        )
+        return LazyClient(self, name)
+
+    def get(self, name):
+        entry = self._entries[name]
+        instance = entry.instance
+        if instance is not None:
+            return instance
+
+        with entry.lock:
+            if entry.instance is not None:
+                return entry.instance
+
+            # 최근에 생성이 실패했다면 재시도 간격 동안은 바로 실패 처리
+            if (
+                entry.failed_at is not None
+                and time.monotonic() - entry.failed_at < entry.retry_interval
+            ):
+                raise ClientUnavailableError(
+                    f"'{name}' 클라이언트를 사용할 수 없습니다: {entry.error}"
+                )
+
+            entry.status = "connecting"
+            try:
+                entry.instance = entry.factory()
+            except Exception as e:
+                entry.status = "failed"
+                entry.error = str(e)
+                entry.failed_at = time.monotonic()
+                logger.error(
+                    "Client init failed", extra={"client": name, "error": str(e)}
+                )
+                raise ClientUnavailableError(
+                    f"'{name}' 클라이언트 연결에 실패했습니다: {str(e)}"
+                )
+
+            entry.status = "ready"
+            entry.error = None
+            entry.failed_at = None
+            entry.ready_at = time.time()
+            return entry.instance
+
+    def mark_failed(self, name, instance, error):
+        # 호출 중 오류가 난 인스턴스는 버리고 다음 사용 시 다시 생성
+        entry = self._entries[name]
+        if not entry.recreate_on_error:
+            return
+        with entry.lock:
+            if entry.instance is instance:
+                entry.instance = None
+                entry.status = "pending"
+                entry.error = str(error)
+
+    def warm_up(self, names=None):
+        # 클라이언트마다 별도 스레드에서 생성해, 느린 Space 가 다른 클라이언트를 막지 않게 함
+        threads = []
+        for name in names or list(self._entries):
+            thread = threading.Thread(
+                target=self._warm_one, args=(name,), name=f"warm-{name}", daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _warm_one(self, name):
+        try:
+            self.get(name)
+        except APIError:
+            pass
+
+    def health(self):
+        return {
+            name: {
+                "status": entry.status,
+                "error": entry.error,
+                "ready_at": entry.ready_at,
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+# 그대로 돌려주는 값 (감쌀 필요가 없는 단순 속성)
+_PLAIN_TYPES = (str, bytes, int, float, bool, type(None), list, tuple, dict, set)
+
+
+def _wrap_attribute(registry, name, instance, value):
+    # 호출 가능한 속성은 오류 시 인스턴스를 버리도록 감싸고,
+    # 하위 객체(g4f 의 chat.completions 등)는 같은 규칙을 따르는 프록시로 감쌈
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    if not callable(value):
+        return _ClientAttribute(registry, name, instance, value)
+
+    def call(*args, **kwargs):
+        try:
+            result = value(*args, **kwargs)
+        except Exception as e:
+            registry.mark_failed(name, instance, e)
+            raise
+        if inspect.iscoroutine(result):
+            # 비동기 클라이언트는 await 할 때 오류가 나므로 코루틴도 감쌈
+            return _watch_coroutine(registry, name, instance, result)
+        return result
+
+    return call
+
+
+async def _watch_coroutine(registry, name, instance, coroutine):
+    try:
+        return await coroutine
+    except Exception as e:
+        registry.mark_failed(name, instance, e)
+        raise
+
+
+class _ClientAttribute:
+    # 클라이언트 하위 객체의 프록시 (어느 인스턴스에서 나왔는지 기억)
+    def __init__(self, registry, name, instance, value):
+        self._registry = registry
+        self._name = name
+        self._instance = instance
+        self._value = value
+
+    def __getattr__(self, attr):
+        return _wrap_attribute(
+            self._registry, self._name, self._instance, getattr(self._value, attr)
+        )
+
+    def __repr__(self):
+        return f"<ClientAttribute {self._name}: {self._value!r}>"
+
+
+class LazyClient:
+    # 실제 클라이언트 대신 import 되는 프록시. 속성 접근 시점에 클라이언트를 생성
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr):
+        instance = self._registry.get(self._name)
+        return _wrap_attribute(
+            self._registry, self._name, instance, getattr(instance, attr)
+        )
+
+    def __repr__(self):
+        return f"<LazyClient {self._name}>"
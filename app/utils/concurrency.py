@@ -0,0 +1,140 @@
+import math
+import asyncio
+import queue
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+def fan_out(func, items, max_workers=4, timeout=None):
+    # items(dict)의 각 값에 func 를 병렬 적용하고, 키를 유지한 채 결과/오류를 분리해 반환
+    results = {}
+    errors = {}
+    if not items:
+        return results, errors
+
+    workers = max(1, min(max_workers, len(items)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out")
+    try:
+        # 호출한 쪽의 contextvars(업스트림 우선순위 등)를 작업 스레드로 전달
+        futures = {
+            executor.submit(contextvars.copy_context().run, func, value): key
+            for key, value in items.items()
+        }
+
+        # 호출당 타임아웃을 실행 라운드 수만큼 늘려 전체 대기 시간을 제한
+        deadline = None
+        if timeout is not None:
+            rounds = math.ceil(len(items) / workers)
+            deadline = time.monotonic() + timeout * rounds
+
+        done, not_done = wait(
+            futures,
+            timeout=None if deadline is None else max(0, deadline - time.monotonic()),
+        )
+
+        for future in done:
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+        for future in not_done:
+            errors[futures[future]] = TimeoutError(
+                f"{timeout}초 안에 응답을 받지 못했습니다"
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # 원래 입력 순서대로 정렬
+    results = {key: results[key] for key in items if key in results}
+    errors = {key: errors[key] for key in items if key in errors}
+    return results, errors
+
+
+def fan_out_stream(func, items, max_workers=4, timeout=None):
+    # func(value)가 돌려주는 제너레이터들을 병렬로 실행하며, 도착하는 순서대로
+    # ("item", key, value) / ("done", key, None) / ("error", key, 예외) 를 반환
+    if not items:
+        return
+
+    events = queue.Queue()
+
+    def run(key, value):
+        try:
+            for item in func(value):
+                events.put(("item", key, item))
+            events.put(("done", key, None))
+        except Exception as e:
+            events.put(("error", key, e))
+
+    workers = max(1, min(max_workers, len(items)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out")
+    try:
+        for key, value in items.items():
+            executor.submit(contextvars.copy_context().run, run, key, value)
+
+        remaining = set(items)
+        while remaining:
+            try:
+                kind, key, value = events.get(timeout=timeout)
+            except queue.Empty:
+                # timeout 동안 아무 토큰도 오지 않은 항목은 시간 초과로 처리
+                for key in list(remaining):
+                    yield "error", key, TimeoutError(
+                        f"{timeout}초 안에 응답을 받지 못했습니다"
+                    )
+                return
+            if kind != "item":
+                remaining.discard(key)
+            yield kind, key, value
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def ordered_map(func, values, max_workers=4, timeout=None):
+    # values 에 func 를 병렬 적용하고, 결과를 입력 순서대로 준비되는 즉시 반환
+    # (뒤 항목이 먼저 끝나도 앞 항목이 끝날 때까지 기다림. timeout 은 항목별 대기 시간)
+    values = list(values)
+    if not values:
+        return
+
+    workers = max(1, min(max_workers, len(values)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out")
+    try:
+        futures = [
+            executor.submit(contextvars.copy_context().run, func, value)
+            for value in values
+        ]
+        for future in futures:
+            try:
+                yield future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise TimeoutError(f"{timeout}초 안에 응답을 받지 못했습니다")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_fan_out(func, items, max_workers=4, timeout=None):
+    # fan_out 의 asyncio 버전: 코루틴 func 를 세마포어로 동시 실행 수를 제한해 실행
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(value):
+        async with semaphore:
+            return await asyncio.wait_for(func(value), timeout)
+
+    outcomes = await asyncio.gather(
+        *(run(value) for value in items.values()), return_exceptions=True
+    )
+
+    results = {}
+    errors = {}
+    for key, outcome in zip(items, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[key] = TimeoutError(f"{timeout}초 안에 응답을 받지 못했습니다")
+        elif isinstance(outcome, Exception):
+            errors[key] = outcome
+        else:
+            results[key] = outcome
+    return results, errors
@@ -0,0 +1,144 @@
+import json
+import math
+import time
+import wave
+import random
+import asyncio
+import tempfile
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+# 벤치마크/부하 테스트용 g4f · Gradio 대체 클라이언트 (FAKE_UPSTREAMS=1 일 때 사용)
+# 지연 시간은 로그정규 분포(중앙값 latency, 퍼짐 sigma), 실패는 failure_rate 확률로 발생
+
+
+class FakeUpstreamError(Exception):
+    pass
+
+
+class LatencyModel:
+    def __init__(self, latency=0.2, sigma=0.5, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        # (지연 시간, 실패 여부)
+        with self._lock:
+            delay = self.latency * math.exp(self._random.gauss(0, self.sigma))
+            failed = self._random.random() < self.failure_rate
+        return delay, failed
+
+    def wait(self):
+        delay, failed = self.sample()
+        time.sleep(delay)
+        if failed:
+            raise FakeUpstreamError("fake upstream failure")
+
+    async def wait_async(self):
+        delay, failed = self.sample()
+        await asyncio.sleep(delay)
+        if failed:
+            raise FakeUpstreamError("fake upstream failure")
+
+
+def fake_completion_text(messages):
+    # 프롬프트 종류에 맞는 형식으로 응답 (서비스의 파서를 그대로 통과하도록)
+    system = messages[0]["content"] if messages else ""
+    user = messages[-1]["content"] if messages else ""
+
+    if "만능문장" in system or "JSON array" in system:
+        return json.dumps(
+            [
+                {
+                    "korean": f"사실은 그게 제일 좋거든요 {i}",
+                    "english": f"Honestly, that's my favorite thing {i}.",
+                    "usage": "좋아하는 것을 설명할 때",
+                }
+                for i in range(10)
+            ],
+            ensure_ascii=False,
+        )
+
+    if "JSON 배열로 주어집니다" in system:
+        answers = json.loads(user[user.index("[") :])
+        return json.dumps(
+            {
+                "feedback": [
+                    {"id": item["id"], "feedback": f"[fake] {item['answer'][:30]}"}
+                    for item in answers
+                ]
+            },
+            ensure_ascii=False,
+        )
+
+    if "translator" in system:
+        return f"[en] {user.split(':', 1)[-1].strip()}"
+
+    return f"[fake feedback] {user[-60:]}"
+
+
+def _response(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, delta=message)])
+
+
+def _chunks(content):
+    for i in range(0, len(content), 16):
+        yield _response(content[i : i + 16])
+
+
+class FakeG4FClient:
+    def __init__(self, latency_model):
+        completions = SimpleNamespace(create=self._create)
+        self.chat = SimpleNamespace(completions=completions)
+        self._latency = latency_model
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        self._latency.wait()
+        content = fake_completion_text(messages)
+        return _chunks(content) if stream else _response(content)
+
+
+class FakeG4FAsyncClient:
+    def __init__(self, latency_model):
+        completions = SimpleNamespace(create=self._create)
+        self.chat = SimpleNamespace(completions=completions)
+        self._latency = latency_model
+
+    async def _create(self, model, messages, stream=False, **kwargs):
+        await self._latency.wait_async()
+        return _response(fake_completion_text(messages))
+
+
+class FakeGradioClient:
+    # /process (TTS) 는 텍스트 길이에 비례한 WAV 파일, /predict (STT) 는 고정 문장을 반환
+    _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="fake-gradio")
+
+    def __init__(self, latency_model):
+        self._latency = latency_model
+
+    def predict(self, *args, api_name=None, **kwargs):
+        self._latency.wait()
+        if api_name == "/process":
+            return self._synthesize(args[2] if len(args) > 2 else "")
+        return "This is a fake transcription of the uploaded answer."
+
+    def submit(self, *args, **kwargs):
+        # gradio Job 과 같이 concurrent Future 를 반환
+        return self._executor.submit(self.predict, *args, **kwargs)
+
+    def _synthesize(self, text):
+        sample_rate = 16000
+        frames = sample_rate * max(1, len(text) // 15) // 10
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            path = temp_file.name
+        with wave.open(path, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(b"\x00\x10" * frames)
+        return path
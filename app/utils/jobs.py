@@ -0,0 +1,255 @@
+import logging
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import ipaddress
+import threading
+import urllib.request
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from app.exception import APIError
+
+logger = logging.getLogger(__name__)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # 리다이렉트로 검사한 주소 밖(내부망 등)으로 결과가 나가지 않도록 따라가지 않음
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def check_callback_url(url, allowed_hosts=()):
+    # 콜백 주소 검사 (SSRF 방지). allowed_hosts 가 있으면 그 호스트만 허용하고,
+    # 없으면 호스트를 조회해 루프백/사설/링크 로컬/예약 대역 주소가 하나라도 있으면 거절
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url 은 http(s) 주소여야 합니다")
+    host = parsed.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"허용되지 않은 callback_url 호스트입니다: {host}")
+        return
+
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError):
+        raise ValueError(f"callback_url 호스트를 찾을 수 없습니다: {host}")
+
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if getattr(address, "ipv4_mapped", None):
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"내부 주소로는 callback_url 을 보낼 수 없습니다: {host}")
+
+
+def _new_job(kind, callback_url):
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "status": "queued",  # queued -> running -> succeeded / failed
+        "result": None,
+        "error": None,
+        "callback_url": callback_url,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class MemoryJobStore:
+    # 단일 프로세스용 저장소 (워커가 하나일 때만 폴링 결과가 일관됨)
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, kind, callback_url=None):
+        job = _new_job(kind, callback_url)
+        with self._lock:
+            self._jobs[job["id"]] = job
+        return dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=time.time())
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def purge(self, older_than):
+        with self._lock:
+            for job_id in [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job["updated_at"] < older_than
+                and job["status"] in ("succeeded", "failed")
+            ]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    # 같은 호스트의 gunicorn 워커들이 공유하는 저장소
+    _COLUMNS = (
+        "id",
+        "kind",
+        "status",
+        "result",
+        "error",
+        "callback_url",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, "
+                "status TEXT, result TEXT, error TEXT, callback_url TEXT, "
+                "created_at REAL, updated_at REAL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def create(self, kind, callback_url=None):
+        job = _new_job(kind, callback_url)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                [job[column] for column in self._COLUMNS],
+            )
+            conn.commit()
+        return job
+
+    def update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        for column in ("result", "error"):
+            if column in fields:
+                fields[column] = json.dumps(fields[column], ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in fields)} "
+                "WHERE id = ?",
+                [*fields.values(), job_id],
+            )
+            conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?",
+                    (job_id,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        job = dict(zip(self._COLUMNS, row))
+        for column in ("result", "error"):
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def purge(self, older_than):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM jobs WHERE updated_at < ? "
+                "AND status IN ('succeeded', 'failed')",
+                (older_than,),
+            )
+            conn.commit()
+
+
+class JobQueue:
+    # 느린 작업을 백그라운드 워커 풀에서 실행하고 상태를 저장소에 기록
+    def __init__(
+        self,
+        store,
+        max_workers=4,
+        ttl=3600.0,
+        callback_timeout=10.0,
+        callback_allowed_hosts=(),
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.callback_timeout = callback_timeout
+        self.callback_allowed_hosts = callback_allowed_hosts
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+
+    def submit(self, kind, func, *args, callback_url=None, **kwargs):
+        self.store.purge(time.time() - self.ttl)
+        job = self.store.create(kind, callback_url)
+        self._executor.submit(self._run, job["id"], func, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _run(self, job_id, func, args, kwargs):
+        self.store.update(job_id, status="running")
+        try:
+            result = func(*args, **kwargs)
+            self.store.update(job_id, status="succeeded", result=result)
+        except APIError as e:
+            self.store.update(
+                job_id,
+                status="failed",
+                error={**e.to_dict(), "status_code": e.status_code},
+            )
+        except Exception as e:
+            logger.error("Job error", extra={"job_id": job_id, "error": str(e)})
+            self.store.update(
+                job_id,
+                status="failed",
+                error={"status": "error", "message": str(e), "status_code": 500},
+            )
+
+        job = self.store.get(job_id)
+        if job and job["callback_url"]:
+            self._notify(job)
+
+    def _notify(self, job):
+        # 작업 결과를 callback_url 로 POST (실패해도 작업 상태에는 영향 없음)
+        # 접수 이후 DNS 가 바뀔 수 있으므로 보내기 직전에 주소를 다시 검사
+        try:
+            check_callback_url(job["callback_url"], self.callback_allowed_hosts)
+            request = urllib.request.Request(
+                job["callback_url"],
+                data=json.dumps(job, ensure_ascii=False).encode("utf-8"),
+                headers={"Content-Type": "application/json; charset=utf-8"},
+                method="POST",
+            )
+            with _callback_opener.open(request, timeout=self.callback_timeout):
+                pass
+        except Exception as e:
+            logger.warning(
+                "Job callback error", extra={"job_id": job["id"], "error": str(e)}
+            )
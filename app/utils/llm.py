@@ -0,0 +1,19 @@
+from app.config import g4f_client, g4f_upstream
+
+
+def stream_chat_completion(messages):
+    # g4f 스트리밍 모드로 생성되는 토큰을 순서대로 반환
+    # 첫 토큰 전에 실패하면 재시도/대체 모델로 넘어감
+    return g4f_upstream.stream(lambda model: _stream_deltas(model, messages))
+
+
+def _stream_deltas(model, messages):
+    for chunk in g4f_client.chat.completions.create(
+        model=model, messages=messages, stream=True
+    ):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        content = getattr(delta, "content", None) if delta else None
+        if content:
+            yield content
@@ -0,0 +1,66 @@
+import json
+import logging
+
+# LogRecord 기본 속성. 이 외의 속성(extra=...)은 구조화 필드로 함께 출력
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+def _fields(record):
+    return {
+        key: value for key, value in vars(record).items() if key not in _RESERVED
+    }
+
+
+class TextFormatter(logging.Formatter):
+    # "시각 레벨 로거 메시지 key=value ..." 한 줄 형식
+    def format(self, record):
+        line = (
+            f"{self.formatTime(record)} {record.levelname} {record.name} "
+            f"{record.getMessage()}"
+        )
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(
+                f"{key}={json.dumps(value, ensure_ascii=False, default=str)}"
+                for key, value in fields.items()
+            )
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    # 로그 수집기용 JSON Lines 형식
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level="INFO", fmt="text"):
+    # level 이 OFF 면 애플리케이션 로그를 모두 끔
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if getattr(handler, "_app_handler", False):
+            root.removeHandler(handler)
+
+    if level.upper() == "OFF":
+        root.setLevel(logging.CRITICAL + 1)
+        return
+
+    handler = logging.StreamHandler()
+    handler._app_handler = True
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    root.addHandler(handler)
+    root.setLevel(level.upper())
@@ -0,0 +1,193 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# 지연 시간(초) / 페이로드 크기(바이트) 히스토그램 기본 구간
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            labels = list(zip(self.labelnames, key))
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 라벨 -> [구간별 누적 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            labels = list(zip(self.labelnames, key))
+            for bound, bucket_count in zip(self.buckets, counts):
+                bucket_labels = _format_labels(labels + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    # 프로세스 단위 지표 저장소. /metrics 에서 Prometheus 텍스트 형식으로 내보냄
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._metrics.setdefault(name, Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._metrics.setdefault(
+            name, Histogram(name, help_text, labelnames, buckets)
+        )
+
+    def register_collector(self, collector):
+        # collector() 는 (name, type, help, [(labels dict, value)]) 목록을 반환
+        self._collectors.append(collector)
+        return collector
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception:
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(
+                        f"{name}{_format_labels(list(labels.items()))} {_format_value(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+request_latency = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+request_size = metrics.histogram(
+    "http_request_size_bytes", "HTTP request body size by route", ("route",), SIZE_BUCKETS
+)
+response_size = metrics.histogram(
+    "http_response_size_bytes", "HTTP response body size by route", ("route",), SIZE_BUCKETS
+)
+upstream_requests = metrics.counter(
+    "upstream_requests_total",
+    "Upstream calls by upstream, target and outcome",
+    ("upstream", "target", "outcome"),
+)
+upstream_latency = metrics.histogram(
+    "upstream_request_duration_seconds",
+    "Upstream call latency",
+    ("upstream", "target"),
+)
+
+
+def observe_request(method, route, status, duration, request_bytes=None, response_bytes=None):
+    request_latency.observe(duration, method=method, route=route, status=status)
+    if request_bytes is not None:
+        request_size.observe(request_bytes, route=route)
+    if response_bytes is not None:
+        response_size.observe(response_bytes, route=route)
+
+
+@contextmanager
+def track_upstream(upstream, target):
+    # g4f 모델 / STT·TTS Space 호출 시간과 성공·실패 횟수를 기록
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        upstream_latency.observe(time.perf_counter() - start, upstream=upstream, target=target)
+        upstream_requests.inc(upstream=upstream, target=target, outcome=outcome)
+
+
+def cache_collector(caches):
+    # caches: {이름: hits/misses/len 을 가진 캐시 객체}
+    def collect():
+        return [
+            (
+                "cache_hits_total",
+                "counter",
+                "Cache hits",
+                [({"cache": name}, cache.hits) for name, cache in caches.items()],
+            ),
+            (
+                "cache_misses_total",
+                "counter",
+                "Cache misses",
+                [({"cache": name}, cache.misses) for name, cache in caches.items()],
+            ),
+            (
+                "cache_entries",
+                "gauge",
+                "Entries currently held in the cache",
+                [({"cache": name}, len(cache)) for name, cache in caches.items()],
+            ),
+        ]
+
+    return collect
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def _hash32(feature):
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little")
+
+
+def shingles(tokens, size=3):
+    # 연속된 size 개 토큰 묶음 집합 (토큰이 적으면 있는 만큼 한 묶음)
+    if len(tokens) <= size:
+        return {"\x1f".join(tokens)} if tokens else set()
+    return {"\x1f".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHashIndex:
+    # MinHash 서명 + LSH 밴드로 비슷한 텍스트를 찾는 인덱스
+    # 메모리 LRU(maxsize) 로 유지하고, path 가 있으면 SQLite 에 저장해 재시작 후 복원
+    def __init__(
+        self, path=None, table="minhash", num_perm=128, bands=16, maxsize=5000, seed=1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다")
+        self.path = path
+        self.table = table
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        # multiply-shift 해시족: h(x) = ((a * x + b) mod 2^64) >> 32, a 는 홀수
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+        self._entries = OrderedDict()  # key -> (서명, 값)
+        self._buckets = [{} for _ in range(bands)]  # 밴드 해시 -> key 집합
+        self._lock = threading.Lock()
+        self._conn = None
+        self._loaded = False
+
+    def signature(self, features):
+        if not features:
+            return None
+        hashed = np.fromiter(
+            (_hash32(feature) for feature in features),
+            dtype=np.uint64,
+            count=len(features),
+        )
+        with np.errstate(over="ignore"):
+            values = (np.outer(hashed, self._a) + self._b) >> np.uint64(32)
+        return (values & _MASK32).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [
+            signature[i * self.rows : (i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def query(self, signature, threshold):
+        # 추정 자카드 유사도가 threshold 이상인 가장 비슷한 항목: (key, 유사도, 값) 또는 None
+        if signature is None:
+            return None
+        with self._lock:
+            self._load()
+            candidates = set()
+            for band, band_key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(band.get(band_key, ()))
+
+            best = None
+            for key in candidates:
+                other, value = self._entries[key]
+                similarity = float(np.mean(other == signature))
+                if similarity >= threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity, value)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best[0])
+            return best
+
+    def add(self, key, signature, value):
+        if signature is None:
+            return
+        with self._lock:
+            self._load()
+            self._insert(key, signature, value)
+            evicted = []
+            while len(self._entries) > self.maxsize:
+                evicted.append(self._remove(next(iter(self._entries))))
+            self._persist(key, signature, value, evicted)
+
+    def _insert(self, key, signature, value):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (signature, value)
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(band_key, set()).add(key)
+
+    def _remove(self, key):
+        signature, _ = self._entries.pop(key)
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            keys = band.get(band_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del band[band_key]
+        return key
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, signature BLOB NOT NULL, "
+                "value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _load(self):
+        # 첫 사용 시 최근 항목부터 maxsize 개를 복원 (서명 길이가 다르면 무시)
+        if self._loaded or not self.path:
+            return
+        self._loaded = True
+        try:
+            rows = (
+                self._connect()
+                .execute(
+                    f"SELECT key, signature, value FROM {self.table} "
+                    "ORDER BY updated_at DESC LIMIT ?",
+                    (self.maxsize,),
+                )
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            logger.warning(
+                "Index load error", extra={"table": self.table, "error": str(e)}
+            )
+            return
+        for key, blob, value in reversed(rows):
+            signature = np.frombuffer(blob, dtype=np.uint32)
+            if len(signature) == self.num_perm:
+                self._insert(key, signature, json.loads(value))
+
+    def _persist(self, key, signature, value, evicted):
+        if not self.path:
+            return
+        try:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, signature, value, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    signature.tobytes(),
+                    json.dumps(value, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            conn.executemany(
+                f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in evicted]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            # 디스크 저장 실패는 메모리 인덱스만으로 계속 진행
+            logger.warning(
+                "Index write error", extra={"table": self.table, "error": str(e)}
+            )
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,28 @@
+import json
+from flask import Response, stream_with_context
+from app.exception import ValidationError
+
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+def parse_ndjson(body):
+    # 한 줄에 JSON 값 하나씩 들어 있는 본문을 리스트로 변환
+    items = []
+    for line_no, line in enumerate(body.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            raise ValidationError(f"{line_no}번째 줄이 올바른 JSON 이 아닙니다")
+    return items
+
+
+def ndjson_response(items):
+    # dict 제너레이터를 한 줄씩 흘려보내는 NDJSON 응답으로 변환
+    def generate():
+        for item in items:
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,81 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class ReadyPool:
+    # 미리 만들어 둔 항목을 바로 꺼내 쓰고, 개수가 low_water 아래로 내려가면
+    # 백그라운드 스레드가 size 까지 다시 채움. 스레드는 처음 take() 할 때 시작
+    def __init__(self, name, produce, size=8, low_water=3, retry_interval=10.0):
+        self.name = name
+        self.produce = produce
+        self.size = size
+        self.low_water = min(low_water, size)
+        self.retry_interval = retry_interval
+        self.hits = 0
+        self.misses = 0
+        self.produced = 0
+        self.failures = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None or self.size <= 0:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=f"pool-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def take(self):
+        # 준비된 항목이 없으면 None (호출한 쪽이 직접 생성)
+        self.start()
+        with self._cond:
+            item = self._items.popleft() if self._items else None
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(self._items) < self.low_water:
+                self._cond.notify()
+            return item
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while len(self._items) >= self.low_water:
+                    self._cond.wait()
+
+            # low_water 아래로 내려가면 size 까지 채움
+            while len(self._items) < self.size:
+                try:
+                    item = self.produce()
+                except Exception as e:
+                    self.failures += 1
+                    logger.warning(
+                        "Pool refill failed", extra={"pool": self.name, "error": str(e)}
+                    )
+                    time.sleep(self.retry_interval)
+                    continue
+                with self._cond:
+                    self._items.append(item)
+                    self.produced += 1
+
+    def stats(self):
+        return {
+            "ready": len(self._items),
+            "size": self.size,
+            "low_water": self.low_water,
+            "hits": self.hits,
+            "misses": self.misses,
+            "produced": self.produced,
+            "failures": self.failures,
+        }
+
+    def __len__(self):
+        return len(self._items)
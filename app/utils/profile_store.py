@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 감쇠 가중치가 이보다 커지면 점수를 현재 시각 기준으로 다시 맞춤 (float 범위 보호)
+_RENORMALIZE_WEIGHT = 2.0**64
+
+
+class VocabularyProfileStore:
+    # 학습자별 품사 카운터를 SQLite 에 누적하고, 품사별 상위 top_k 단어를 미리 계산해 둠
+    # 시간 감쇠(half_life 초): 새 카운트에 2^((now - epoch) / half_life) 를 곱해 더하므로
+    # 기존 단어 점수를 다시 쓰지 않아도 순위는 감쇠를 반영한 순서와 같음
+    def __init__(self, path, top_k=20, half_life=None):
+        self.path = path
+        self.top_k = top_k
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 트랜잭션은 직접 관리 (여러 워커 프로세스가 같은 파일에 병합)
+            self._conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, timeout=10
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS learner_profiles ("
+                "learner_id TEXT PRIMARY KEY, epoch REAL NOT NULL, "
+                "total_words INTEGER NOT NULL, text_count INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL, top TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS learner_words ("
+                "learner_id TEXT NOT NULL, pos TEXT NOT NULL, word TEXT NOT NULL, "
+                "score REAL NOT NULL, PRIMARY KEY (learner_id, pos, word))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS learner_words_rank "
+                "ON learner_words (learner_id, pos, score DESC)"
+            )
+            # 같은 텍스트를 두 번 병합하지 않도록 텍스트 해시를 기록
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS learner_texts ("
+                "learner_id TEXT NOT NULL, text_key TEXT NOT NULL, "
+                "PRIMARY KEY (learner_id, text_key))"
+            )
+        return self._conn
+
+    def _weight(self, epoch, now):
+        if not self.half_life:
+            return 1.0
+        return 2.0 ** ((now - epoch) / self.half_life)
+
+    def merge(self, learner_id, counted, text_key=None):
+        # count_tokens() 결과를 학습자 프로필에 더하고 바뀐 품사의 상위 단어를 갱신
+        # 반환값: (프로필, 병합 여부). 이미 병합한 text_key 면 그대로 반환
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                profile = self._load(conn, learner_id)
+                if text_key is not None:
+                    inserted = conn.execute(
+                        "INSERT OR IGNORE INTO learner_texts (learner_id, text_key) "
+                        "VALUES (?, ?)",
+                        (learner_id, text_key),
+                    ).rowcount
+                    if not inserted:
+                        conn.execute("COMMIT")
+                        return profile, False
+
+                if profile is None:
+                    profile = {
+                        "epoch": now,
+                        "total_words": 0,
+                        "text_count": 0,
+                        "updated_at": now,
+                        "top": {},
+                    }
+
+                touched = set(counted["counts"])
+                weight = self._weight(profile["epoch"], now)
+                if weight > _RENORMALIZE_WEIGHT:
+                    conn.execute(
+                        "UPDATE learner_words SET score = score / ? WHERE learner_id = ?",
+                        (weight, learner_id),
+                    )
+                    profile["epoch"] = now
+                    weight = 1.0
+                    touched.update(profile["top"])
+
+                conn.executemany(
+                    "INSERT INTO learner_words (learner_id, pos, word, score) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT (learner_id, pos, word) "
+                    "DO UPDATE SET score = score + excluded.score",
+                    [
+                        (learner_id, pos, word, count * weight)
+                        for pos, counter in counted["counts"].items()
+                        for word, count in counter.items()
+                    ],
+                )
+                for pos in touched:
+                    profile["top"][pos] = [
+                        list(row)
+                        for row in conn.execute(
+                            "SELECT word, score FROM learner_words "
+                            "WHERE learner_id = ? AND pos = ? "
+                            "ORDER BY score DESC LIMIT ?",
+                            (learner_id, pos, self.top_k),
+                        )
+                    ]
+
+                profile["total_words"] += counted["total_words"]
+                profile["text_count"] += 1
+                profile["updated_at"] = now
+                conn.execute(
+                    "INSERT OR REPLACE INTO learner_profiles "
+                    "(learner_id, epoch, total_words, text_count, updated_at, top) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        learner_id,
+                        profile["epoch"],
+                        profile["total_words"],
+                        profile["text_count"],
+                        now,
+                        json.dumps(profile["top"], ensure_ascii=False),
+                    ),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return profile, True
+
+    def get(self, learner_id):
+        # 미리 계산한 상위 단어를 행 하나로 조회 (없으면 None)
+        with self._lock:
+            return self._load(self._connect(), learner_id)
+
+    def _load(self, conn, learner_id):
+        row = conn.execute(
+            "SELECT epoch, total_words, text_count, updated_at, top "
+            "FROM learner_profiles WHERE learner_id = ?",
+            (learner_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        epoch, total_words, text_count, updated_at, top = row
+        return {
+            "epoch": epoch,
+            "total_words": total_words,
+            "text_count": text_count,
+            "updated_at": updated_at,
+            "top": json.loads(top),
+        }
+
+    def top_words(self, profile, top_k=None, pos_filter=None, now=None):
+        # 저장된 점수를 현재 시각 기준 감쇠 점수로 환산해 analyze_text 와 같은 형태로 반환
+        top_k = top_k or self.top_k
+        weight = self._weight(profile["epoch"], now or time.time())
+        tags = profile["top"] if pos_filter is None else pos_filter
+        return {
+            pos: [
+                [word, round(score / weight, 3) if self.half_life else int(score)]
+                for word, score in profile["top"][pos][:top_k]
+            ]
+            for pos in tags
+            if pos in profile["top"]
+        }
@@ -0,0 +1,127 @@
+import logging
+import os
+import re
+import random
+import threading
+import time
+from app.exception import ValidationError, NotFoundError, APIError
+
+logger = logging.getLogger(__name__)
+
+_SECTION_START = re.compile(r"^\s*([^\s:\"']+)\s*:\s*\[")
+_SECTION_END = re.compile(r"^\s*\]")
+_CATEGORY = re.compile(r"^\s*//\s*(.+?)\s*$")
+_QUESTION = re.compile(r'"([^"]+)"')
+
+
+def parse_questions_js(content):
+    # Questions.js 를 한 줄씩 훑으며 섹션/카테고리/질문을 한 번에 추출
+    questions = []
+    sections = {}
+    categories = {}
+    section = None
+    category = None
+
+    for line in content.splitlines():
+        if section is None:
+            match = _SECTION_START.match(line)
+            if match:
+                section = match.group(1)
+                category = None
+                sections.setdefault(section, [])
+            continue
+
+        if _SECTION_END.match(line):
+            section = None
+            continue
+
+        match = _CATEGORY.match(line)
+        if match:
+            category = match.group(1)
+            continue
+
+        for q in _QUESTION.findall(line):
+            q = q.strip()
+            if not q or q.startswith("//"):
+                continue
+            idx = len(questions)
+            questions.append(q)
+            sections[section].append(idx)
+            categories.setdefault((section, category), []).append(idx)
+
+    return (
+        tuple(questions),
+        {name: tuple(ids) for name, ids in sections.items()},
+        {key: tuple(ids) for key, ids in categories.items()},
+    )
+
+
+class QuestionBank:
+    def __init__(self, path, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._questions = ()  # 질문 ID(인덱스) -> 질문
+        self._sections = {}  # 섹션명 -> 질문 ID 튜플
+        self._categories = {}  # (섹션명, 카테고리) -> 질문 ID 튜플
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            raise NotFoundError(f"질문 파일을 찾을 수 없습니다: {self.path}")
+
+    def load(self):
+        with self._lock:
+            mtime = self._stat_mtime()
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    parsed = parse_questions_js(file.read())
+            except Exception as e:
+                raise APIError(f"질문 파일 로드 중 오류가 발생했습니다: {str(e)}")
+
+            self._questions, self._sections, self._categories = parsed
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            logger.info(
+                "Question bank loaded", extra={"questions": len(self._questions)}
+            )
+
+    def reload_if_changed(self):
+        # 파일 변경 여부는 check_interval 마다 한 번만 확인
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        if self._mtime is None or self._stat_mtime() != self._mtime:
+            self.load()
+
+    def _section_ids(self, section):
+        self.reload_if_changed()
+        ids = self._sections.get(section)
+        if ids is None:
+            raise ValidationError(f"파일 내에서 '{section}' 항목을 찾을 수 없습니다")
+        if not ids:
+            raise ValidationError("질문 목록이 비어 있습니다")
+        return ids
+
+    def sections(self):
+        self.reload_if_changed()
+        return list(self._sections)
+
+    def questions(self, section):
+        return [self._questions[i] for i in self._section_ids(section)]
+
+    def categories(self, section):
+        self.reload_if_changed()
+        return {
+            category: [self._questions[i] for i in ids]
+            for (name, category), ids in self._categories.items()
+            if name == section
+        }
+
+    def sample(self, section, k):
+        ids = self._section_ids(section)
+        return [self._questions[i] for i in random.sample(ids, min(k, len(ids)))]
@@ -0,0 +1,88 @@
+import time
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import request
+from app.utils.admission import RateLimitedError, priority
+from app.utils.metrics import metrics
+
+rate_limited_requests = metrics.counter(
+    "rate_limited_requests_total", "Requests rejected by the per-client rate limit"
+)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate  # 초당 충전되는 토큰 수
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost):
+        # 토큰이 충분하면 0, 부족하면 다시 시도할 수 있을 때까지 남은 시간(초)
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    # 클라이언트별 토큰 버킷 (최근 사용한 max_clients 명만 메모리에 유지)
+    def __init__(self, per_minute, burst, max_clients=10000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client, cost=1):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(client)
+            retry_after = bucket.take(min(cost, self.burst))
+
+        if retry_after:
+            rate_limited_requests.inc()
+            raise RateLimitedError(
+                "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요", retry_after=retry_after
+            )
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def client_key(remote_addr, forwarded_for=None, trusted_hops=0):
+    # X-Forwarded-For 는 클라이언트가 마음대로 보낼 수 있으므로 기본은 접속 주소만 사용
+    # 신뢰하는 프록시가 trusted_hops 단 앞에 있을 때만 오른쪽에서 trusted_hops 번째
+    # (마지막 신뢰 프록시가 직접 받은 주소)를 사용 (werkzeug ProxyFix 와 같은 규칙)
+    if trusted_hops > 0 and forwarded_for:
+        values = forwarded_for.split(",")
+        if len(values) >= trusted_hops:
+            return values[-trusted_hops].strip() or remote_addr or "unknown"
+    return remote_addr or "unknown"
+
+
+def rate_limited(limiter, cost=1, priority_class=None):
+    # Flask 라우트용: 클라이언트별 요청 한도를 확인하고, 업스트림 호출 우선순위를 지정
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # 신뢰 프록시 주소 복원은 create_app 의 ProxyFix 가 remote_addr 에 반영
+            limiter.check(client_key(request.remote_addr), cost)
+            if priority_class is None:
+                return view(*args, **kwargs)
+            with priority(priority_class):
+                return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
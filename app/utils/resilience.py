@@ -0,0 +1,323 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from app.utils.metrics import metrics, track_upstream
+from app.utils.admission import AdmissionGate, RateLimitedError
+from app.exception import APIError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+# 동시 호출 상한이 없는 업스트림의 실행 풀 크기
+_UNBOUNDED_WORKERS = 32
+_upstreams = {}
+
+
+class UpstreamUnavailableError(APIError):
+    def __init__(self, message, payload=None):
+        super().__init__(message, status_code=503, payload=payload)
+
+
+class UpstreamTimeoutError(APIError):
+    def __init__(self, message, payload=None):
+        super().__init__(message, status_code=504, payload=payload)
+
+
+class CircuitBreaker:
+    # 연속 실패가 threshold 에 도달하면 reset_timeout 동안 호출을 바로 거절
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"  # closed -> open -> half_open -> closed / open
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            # half_open: 시험 호출 하나만 통과
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        # 결과 판정 없이 끝난 시험 호출(취소 등)은 다음 호출이 다시 시험하도록 함
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class Upstream:
+    # 순서가 있는 공급자 목록(모델 이름, Space 클라이언트 등)에 대해
+    # 시도별 타임아웃, 지터가 있는 재시도, 공급자별 서킷 브레이커, 순차 대체를 적용
+    # max_concurrency > 0 이면 공급자별 동시 호출 수를 제한 (초과분은 우선순위 대기 / 429)
+    def __init__(
+        self,
+        name,
+        providers,
+        timeout=30.0,
+        deadline=60.0,
+        retries=1,
+        backoff=0.5,
+        failure_threshold=5,
+        reset_timeout=30.0,
+        max_concurrency=0,
+        max_wait=10.0,
+    ):
+        self.name = name
+        self.providers = dict(providers)  # 라벨 -> 호출 함수에 넘길 값
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.breakers = {
+            label: CircuitBreaker(failure_threshold, reset_timeout)
+            for label in self.providers
+        }
+        self.gates = {
+            label: AdmissionGate(name, label, max_concurrency, max_wait)
+            for label in self.providers
+        }
+        # 동기 호출에 데드라인을 걸기 위해 원격 호출을 실행하는 업스트림 전용 풀
+        # 시간 초과로 포기한 호출도 스레드를 계속 점유하므로, 응답 없는 공급자가
+        # 다른 업스트림의 스레드까지 잡아먹지 않도록 업스트림마다 따로 둠.
+        # 공급자별 상한(자리는 호출이 실제로 끝나야 반납)의 합만큼이면 풀에서 기다리지 않음
+        workers = (
+            max_concurrency * len(self.providers)
+            if max_concurrency > 0
+            else _UNBOUNDED_WORKERS
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"upstream-{name}"
+        )
+        _upstreams[name] = self
+
+    def _delay(self, attempt):
+        # full jitter: 0 ~ backoff * 2^attempt
+        return random.uniform(0, self.backoff * (2**attempt))
+
+    def call(self, func):
+        # func(provider) 를 실행하고 결과를 반환. 모든 공급자가 실패하면 마지막 오류를 전파
+        started = time.monotonic()
+        last_error = None
+        for label, provider in self.providers.items():
+            for attempt in range(self.retries + 1):
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise self._final_error(last_error)
+                if not self.breakers[label].allow():
+                    last_error = last_error or self._open_error(label)
+                    break
+                if attempt:
+                    time.sleep(min(self._delay(attempt), remaining))
+
+                try:
+                    acquired_at = self.gates[label].acquire()
+                except RateLimitedError as e:
+                    # 혼잡한 공급자는 실패로 치지 않고 다음 공급자로 넘어감
+                    self.breakers[label].release()
+                    last_error = e
+                    break
+                future = self._executor.submit(func, provider)
+                # 시간 초과로 포기해도 원격 호출이 끝날 때까지 자리를 차지
+                future.add_done_callback(
+                    lambda _, gate=self.gates[label], at=acquired_at: gate.release(at)
+                )
+                try:
+                    with track_upstream(self.name, label):
+                        result = future.result(timeout=min(self.timeout, remaining))
+                except FutureTimeoutError:
+                    future.cancel()
+                    last_error = self._timeout_error(label)
+                except ValidationError:
+                    self.breakers[label].release()
+                    raise
+                except Exception as e:
+                    last_error = e
+                else:
+                    self.breakers[label].record_success()
+                    return result
+
+                self._record_failure(label, attempt, last_error)
+                if isinstance(last_error, UpstreamTimeoutError):
+                    # 응답이 없는 공급자는 재시도하지 않고 다음 공급자로 넘어감
+                    break
+        raise self._final_error(last_error)
+
+    async def call_async(self, coro_func):
+        # coro_func(provider) 코루틴을 await. 타임아웃 시 코루틴을 취소
+        started = time.monotonic()
+        last_error = None
+        for label, provider in self.providers.items():
+            for attempt in range(self.retries + 1):
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise self._final_error(last_error)
+                if not self.breakers[label].allow():
+                    last_error = last_error or self._open_error(label)
+                    break
+                if attempt:
+                    await asyncio.sleep(min(self._delay(attempt), remaining))
+
+                try:
+                    acquired_at = await self.gates[label].acquire_async()
+                except RateLimitedError as e:
+                    self.breakers[label].release()
+                    last_error = e
+                    break
+                except asyncio.CancelledError:
+                    self.breakers[label].release()
+                    raise
+                try:
+                    with track_upstream(self.name, label):
+                        result = await asyncio.wait_for(
+                            coro_func(provider), timeout=min(self.timeout, remaining)
+                        )
+                except asyncio.TimeoutError:
+                    last_error = self._timeout_error(label)
+                except asyncio.CancelledError:
+                    self.breakers[label].release()
+                    raise
+                except ValidationError:
+                    self.breakers[label].release()
+                    raise
+                except Exception as e:
+                    last_error = e
+                else:
+                    self.breakers[label].record_success()
+                    return result
+                finally:
+                    self.gates[label].release(acquired_at)
+
+                self._record_failure(label, attempt, last_error)
+                if isinstance(last_error, UpstreamTimeoutError):
+                    break
+        raise self._final_error(last_error)
+
+    def stream(self, gen_func):
+        # 첫 항목을 받기 전까지만 재시도/대체하고, 이후 오류는 그대로 전파
+        last_error = None
+        for label, provider in self.providers.items():
+            for attempt in range(self.retries + 1):
+                if not self.breakers[label].allow():
+                    last_error = last_error or self._open_error(label)
+                    break
+                if attempt:
+                    time.sleep(self._delay(attempt))
+
+                try:
+                    acquired_at = self.gates[label].acquire()
+                except RateLimitedError as e:
+                    self.breakers[label].release()
+                    last_error = e
+                    break
+                started = False
+                try:
+                    with track_upstream(self.name, label):
+                        for item in gen_func(provider):
+                            started = True
+                            yield item
+                except GeneratorExit:
+                    # 소비자가 스트림을 중간에 닫은 경우
+                    self.breakers[label].release()
+                    raise
+                except ValidationError:
+                    self.breakers[label].release()
+                    raise
+                except Exception as e:
+                    if started:
+                        self.breakers[label].record_failure()
+                        raise
+                    last_error = e
+                else:
+                    self.breakers[label].record_success()
+                    return
+                finally:
+                    self.gates[label].release(acquired_at)
+
+                self._record_failure(label, attempt, last_error)
+        raise self._final_error(last_error)
+
+    def _record_failure(self, label, attempt, error):
+        self.breakers[label].record_failure()
+        logger.warning(
+            "Upstream call failed",
+            extra={
+                "upstream": self.name,
+                "provider": label,
+                "attempt": attempt + 1,
+                "error": str(error),
+            },
+        )
+
+    def _open_error(self, label):
+        return UpstreamUnavailableError(
+            f"'{self.name}' 업스트림({label})이 일시적으로 차단되었습니다"
+        )
+
+    def _timeout_error(self, label):
+        return UpstreamTimeoutError(
+            f"'{self.name}' 업스트림({label}) 응답 시간이 초과되었습니다"
+        )
+
+    def _final_error(self, error):
+        if error is None:
+            return UpstreamTimeoutError(f"'{self.name}' 호출 데드라인을 초과했습니다")
+        return error
+
+    def health(self):
+        return {
+            label: {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "admission": self.gates[label].stats(),
+            }
+            for label, breaker in self.breakers.items()
+        }
+
+
+def upstream_stats():
+    return {name: upstream.health() for name, upstream in _upstreams.items()}
+
+
+@metrics.register_collector
+def collect_breakers():
+    return [
+        (
+            "upstream_circuit_open",
+            "gauge",
+            "1 if the provider's circuit breaker is open",
+            [
+                (
+                    {"upstream": name, "target": label},
+                    int(state["state"] == "open"),
+                )
+                for name, providers in upstream_stats().items()
+                for label, state in providers.items()
+            ],
+        )
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+_groups = {}
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # 같은 키로 동시에 들어온 호출을 하나의 업스트림 요청으로 합치고 결과를 공유
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0  # 실제로 실행된 호출 수
+        self.coalesced = 0  # 다른 호출의 결과를 기다려 재사용한 호출 수
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        _groups[name] = self
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def do_async(self, key, func):
+        # 이벤트 루프별로 진행 중인 태스크를 공유 (func 는 코루틴 함수)
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = asyncio.ensure_future(func())
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda _: self._forget(task_key))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        # 한 호출자가 취소되어도 공유 태스크는 계속 진행
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key):
+        with self._lock:
+            self._tasks.pop(task_key, None)
+
+
+def singleflight_stats():
+    return {
+        name: {"calls": group.calls, "coalesced": group.coalesced}
+        for name, group in _groups.items()
+    }
@@ -0,0 +1,32 @@
+import logging
+import json
+from flask import Response, stream_with_context
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(data, event=None):
+    # Server-Sent Events 한 건을 문자열로 직렬화
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    payload = json.dumps(data, ensure_ascii=False)
+    lines.extend(f"data: {line}" for line in payload.splitlines())
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(events):
+    # (event, data) 제너레이터를 text/event-stream 응답으로 변환
+    def generate():
+        try:
+            for event, data in events:
+                yield format_sse(data, event)
+        except Exception as e:
+            logger.error("SSE stream error", extra={"error": str(e)})
+            yield format_sse({"status": "error", "message": str(e)}, "error")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
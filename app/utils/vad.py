@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class SilenceSegmenter:
+    # 프레임 단위 RMS 에너지로 무음 구간을 찾아 발화 단위 세그먼트로 잘라냄
+    def __init__(
+        self,
+        sample_rate,
+        frame_ms=30,
+        threshold=500,
+        min_silence_ms=600,
+        min_segment_ms=1000,
+        max_segment_ms=30000,
+    ):
+        self.frame = max(1, sample_rate * frame_ms // 1000)
+        self.threshold = threshold
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_segment_frames = max(1, min_segment_ms // frame_ms)
+        self.max_segment_frames = max(1, max_segment_ms // frame_ms)
+        self._pending = np.empty(0, dtype=np.int16)  # 아직 프레임으로 묶이지 않은 샘플
+        self._frames = []  # 현재 세그먼트의 프레임들
+        self._silence_run = 0
+        self._has_speech = False
+
+    def feed(self, samples):
+        # 새 샘플을 추가하고, 완성된 세그먼트 목록을 반환
+        pending = np.concatenate([self._pending, samples.astype(np.int16, copy=False)])
+        count = len(pending) // self.frame
+        self._pending = pending[count * self.frame :]
+        if not count:
+            return []
+
+        frames = pending[: count * self.frame].reshape(count, self.frame)
+        energy = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+        voiced = energy >= self.threshold
+
+        segments = []
+        for frame, is_voiced in zip(frames, voiced):
+            self._frames.append(frame)
+            if is_voiced:
+                self._has_speech = True
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+
+            if not self._has_speech and self._silence_run >= self.min_silence_frames:
+                # 발화 없이 무음만 이어지면 STT 로 보내지 않고 버림
+                self._reset()
+            elif (
+                self._has_speech
+                and self._silence_run >= self.min_silence_frames
+                and len(self._frames) >= self.min_segment_frames
+            ) or len(self._frames) >= self.max_segment_frames:
+                segments.append(self._cut())
+        return segments
+
+    def flush(self):
+        # 남은 샘플을 마지막 세그먼트로 반환 (발화가 없으면 None)
+        if len(self._pending):
+            self._frames.append(self._pending)
+            self._pending = np.empty(0, dtype=np.int16)
+        if not self._frames or not self._has_speech:
+            self._reset()
+            return None
+        return self._cut()
+
+    def _cut(self):
+        segment = np.concatenate(self._frames)
+        self._reset()
+        return segment
+
+    def _reset(self):
+        self._frames = []
+        self._silence_run = 0
+        self._has_speech = False
+
+
+def trim_silence(samples, sample_rate, frame_ms=30, threshold=500, padding_ms=200):
+    # 앞뒤 무음을 잘라냄 (발화가 전혀 없으면 원본 그대로 반환)
+    frame = max(1, sample_rate * frame_ms // 1000)
+    count = len(samples) // frame
+    if not count:
+        return samples
+
+    frames = samples[: count * frame].reshape(count, frame).astype(np.float32)
+    voiced = np.flatnonzero(np.sqrt(np.mean(frames**2, axis=1)) >= threshold)
+    if not len(voiced):
+        return samples
+
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(samples), (voiced[-1] + 1) * frame + padding)
+    return samples[start:end]
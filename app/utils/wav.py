@@ -0,0 +1,89 @@
+import io
+import wave
+import struct
+import numpy as np
+
+# 길이를 모르는 스트리밍 WAV 의 data 크기 (브라우저는 끝까지 재생)
+STREAM_DATA_SIZE = 0xFFFFFFFF - 37
+
+
+def wav_header(sample_rate, data_size, channels=1):
+    # 16-bit PCM WAV 헤더 (44바이트)
+    block_align = channels * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt 청크 크기
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        16,  # bits per sample
+        b"data",
+        data_size,
+    )
+
+
+def write_wav(path, samples, sample_rate, channels=1):
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+
+
+def wav_bytes_to_pcm(data):
+    # WAV 바이트에서 (모노 int16 샘플, 샘플레이트)를 추출
+    with wave.open(io.BytesIO(data), "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError("16-bit PCM WAV 만 지원합니다")
+        channels = wav_file.getnchannels()
+        sample_rate = wav_file.getframerate()
+        samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), "<i2")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, sample_rate
+
+
+def read_wav_file(path):
+    # WAV 파일을 (모노 int16 샘플, 샘플레이트, 원본 채널 수)로 읽음 (8/16/32-bit PCM)
+    with wave.open(path, "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        sample_width = wav_file.getsampwidth()
+        sample_rate = wav_file.getframerate()
+        data = wav_file.readframes(wav_file.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(data, np.uint8).astype(np.int16) - 128) * 256
+    elif sample_width == 2:
+        samples = np.frombuffer(data, "<i2")
+    elif sample_width == 4:
+        samples = (np.frombuffer(data, "<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"지원하지 않는 샘플 크기입니다: {sample_width * 8}-bit")
+
+    samples = samples[: len(samples) - len(samples) % channels]
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, sample_rate, channels
+
+
+def resample(samples, source_rate, target_rate):
+    # 박스 필터로 고역을 줄인 뒤 선형 보간으로 샘플레이트 변환
+    if source_rate == target_rate or not len(samples):
+        return samples
+
+    signal = samples.astype(np.float32)
+    width = int(round(source_rate / target_rate))
+    if width > 1:
+        signal = np.convolve(signal, np.ones(width, np.float32) / width, mode="same")
+
+    count = int(len(signal) * target_rate / source_rate)
+    positions = np.arange(count) * (source_rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(signal)), signal)
+    return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
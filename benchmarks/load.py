@@ -0,0 +1,230 @@
+import io
+import os
+import sys
+import time
+import wave
+import base64
+import asyncio
+import argparse
+import tempfile
+import itertools
+import subprocess
+import httpx
+
+# 저장소 루트에서 실행: python -m benchmarks.load --mode wsgi --mode asgi
+# 서버를 가짜 업스트림(FAKE_UPSTREAMS=1)으로 띄우고 6개 라우트에 동시 요청을 보냄
+
+ROUTES = (
+    "get-test-questions",
+    "get-feedback",
+    "generate-sentences",
+    "analyze-text",
+    "generate-audio",
+    "transcribe",
+)
+
+
+def sample_wav(seconds=2, sample_rate=48000, channels=2):
+    # 전처리(다운믹스/리샘플)를 거치도록 48kHz 스테레오 WAV 생성
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(os.urandom(seconds * sample_rate * channels * 2))
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def build_request(route, n, audio):
+    # n 을 섞어 캐시에 걸리지 않는 입력을 만듦 (--reuse-inputs 면 n=0 고정)
+    if route == "get-test-questions":
+        return "GET", "/get-test-questions", None
+    if route == "get-feedback":
+        answers = {
+            str(i): f"I like to go hiking with my friends on weekends {n}-{i}"
+            for i in range(1, 5)
+        }
+        return "POST", "/get-feedback", {"answers": answers}
+    if route == "generate-sentences":
+        analysis = {
+            "word_count_by_pos": {
+                "NNG": [[f"공원{n}", 3], ["친구", 2]],
+                "VV": [["가", 2]],
+                "MAG": [["정말", 1]],
+            }
+        }
+        return "POST", "/generate-sentences", {"analysis": analysis}
+    if route == "analyze-text":
+        text = f"저는 주말마다 친구들이랑 공원에 가서 산책을 하는 걸 좋아해요 {n}"
+        return "POST", "/analyze-text", {"text": text}
+    if route == "generate-audio":
+        return "POST", "/generate-audio", {"text": f"Hello, this is sentence {n}."}
+    return "POST", "/transcribe", {"audio": audio}
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    index = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+async def run_load(
+    base_url, routes, concurrency, duration, warmup, reuse_inputs, timeout
+):
+    audio = sample_wav()
+    counter = itertools.count()
+    route_cycle = itertools.cycle(routes)
+
+    async def worker(client, deadline, results):
+        while time.perf_counter() < deadline:
+            route = next(route_cycle)
+            n = 0 if reuse_inputs else next(counter)
+            method, path, body = build_request(route, n, audio)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            results[route].append((time.perf_counter() - started, ok))
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+        # 워밍업: Kiwi 모델 로드, 클라이언트 생성 등 워커별 첫 요청 비용은 측정에서 제외
+        discarded = {route: [] for route in routes}
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(
+            *(worker(client, deadline, discarded) for _ in range(concurrency))
+        )
+
+        results = {route: [] for route in routes}  # route -> [(지연 시간, 성공 여부)]
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(worker(client, deadline, results) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def print_report(mode, results, elapsed):
+    print(f"\n== {mode} ({elapsed:.1f}s) ==")
+    print(
+        f"{'route':<22}{'count':>7}{'errors':>8}{'rps':>9}"
+        f"{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+    )
+    total = []
+    for route, samples in results.items():
+        total.extend(samples)
+        print_row(route, samples, elapsed)
+    print_row("total", total, elapsed)
+
+
+def print_row(name, samples, elapsed):
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    print(
+        f"{name:<22}{len(samples):>7}{errors:>8}{len(samples) / elapsed:>9.1f}"
+        f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+        f"{percentile(latencies, 99):>10.1f}"
+    )
+
+
+def server_command(mode, host, port, workers, threads):
+    if mode == "wsgi":
+        return [
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"{host}:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "wsgi:app",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "asgi:app",
+        "--host", host,
+        "--port", str(port),
+        "--workers", str(workers),
+        "--no-access-log",
+    ]
+
+
+def start_server(mode, args):
+    env = dict(
+        os.environ,
+        FAKE_UPSTREAMS="0" if args.live else "1",
+        CLIENT_WARMUP="0",
+        LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+        CACHE_DIR=tempfile.mkdtemp(prefix=f"bench-{mode}-"),  # 매번 빈 캐시로 시작
+        JOB_STORE="memory",
+        RATE_LIMIT_PER_MINUTE="0",  # 부하 발생기는 IP 하나이므로 클라이언트별 한도는 끔
+    )
+    process = subprocess.Popen(
+        server_command(mode, args.host, args.port, args.workers, args.threads), env=env
+    )
+
+    base_url = f"http://{args.host}:{args.port}"
+    started = time.monotonic()
+    while time.monotonic() - started < 60:
+        if process.poll() is not None:
+            raise SystemExit(f"{mode} 서버가 시작되지 않았습니다 (exit {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"{mode} 서버 응답 대기 시간이 초과되었습니다")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서빙 모드별 부하 테스트")
+    parser.add_argument("--mode", action="append", choices=["wsgi", "asgi"])
+    parser.add_argument("--url", help="이미 실행 중인 서버를 대상으로 측정")
+    parser.add_argument("--route", action="append", choices=ROUTES)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0, help="측정 전 워밍업(초)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn 워커당 스레드")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--reuse-inputs", action="store_true", help="같은 입력 반복 (캐시 적중)")
+    parser.add_argument("--live", action="store_true", help="가짜 업스트림 대신 실제 서비스 호출")
+    args = parser.parse_args()
+
+    routes = args.route or list(ROUTES)
+    if args.url:
+        targets = [("url", args.url)]
+    else:
+        targets = [(mode, None) for mode in args.mode or ["wsgi", "asgi"]]
+
+    for mode, url in targets:
+        process = None
+        if url is None:
+            process, url = start_server(mode, args)
+        try:
+            results, elapsed = asyncio.run(
+                run_load(
+                    url,
+                    routes,
+                    args.concurrency,
+                    args.duration,
+                    args.warmup,
+                    args.reuse_inputs,
+                    args.timeout,
+                )
+            )
+            print_report(mode, results, elapsed)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import time
+import base64
+import argparse
+import statistics
+
+# 저장소 루트에서 실행: python -m benchmarks.micro
+os.environ.setdefault("FAKE_UPSTREAMS", "1")
+os.environ.setdefault("CLIENT_WARMUP", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+SAMPLE_ANSWER = (
+    "저는 주말마다 친구들이랑 공원에 가서 산책을 하는 걸 정말 좋아하는데요, "
+    "사실은 날씨가 좋으면 자전거도 타고 근처 카페에서 커피도 마시거든요. "
+    "그래서 요즘은 평일에도 퇴근하고 나서 가끔 혼자 걷기도 해요."
+)
+
+
+def measure(func, runs, setup=None):
+    timings = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name, timings):
+    timings_ms = sorted(t * 1000 for t in timings)
+    print(
+        f"{name:<40} runs={len(timings_ms):<5} "
+        f"mean={statistics.fmean(timings_ms):9.3f}ms "
+        f"p50={timings_ms[len(timings_ms) // 2]:9.3f}ms "
+        f"min={timings_ms[0]:9.3f}ms"
+    )
+
+
+def bench_questions(runs):
+    from app.services.test_service import question_bank, load_questions_from_js
+
+    report("question_bank.load (full parse)", measure(question_bank.load, runs))
+    report("load_questions_from_js (loaded)", measure(load_questions_from_js, runs))
+
+
+def bench_analysis(runs):
+    from app.services.text_service import analyze_text, analysis_cache
+
+    analyze_text(SAMPLE_ANSWER)  # Kiwi 모델 로드는 측정에서 제외
+    report(
+        "analyze_text (cold cache)",
+        measure(lambda: analyze_text(SAMPLE_ANSWER), runs, analysis_cache.clear),
+    )
+    report("analyze_text (cached)", measure(lambda: analyze_text(SAMPLE_ANSWER), runs))
+
+
+def bench_base64(runs):
+    # 16kHz 모노 / 48kHz 스테레오 16-bit WAV 크기 기준
+    for label, seconds, bytes_per_second in (
+        ("10s 16kHz mono", 10, 16000 * 2),
+        ("60s 48kHz stereo", 60, 48000 * 2 * 2),
+    ):
+        audio = os.urandom(seconds * bytes_per_second)
+        encoded = base64.b64encode(audio).decode("utf-8")
+        report(
+            f"base64 encode {label}",
+            measure(lambda: base64.b64encode(audio).decode("utf-8"), runs),
+        )
+        report(f"base64 decode {label}", measure(lambda: base64.b64decode(encoded), runs))
+
+
+BENCHMARKS = {
+    "questions": bench_questions,
+    "analysis": bench_analysis,
+    "base64": bench_base64,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서비스 함수 마이크로 벤치마크")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS))
+    args = parser.parse_args()
+
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](args.runs)
+
+
+if __name__ == "__main__":
+    main()
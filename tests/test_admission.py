@@ -0,0 +1,133 @@
+import time
+import asyncio
+import threading
+import pytest
+from app.utils import ratelimit
+from app.utils.admission import AdmissionGate, RateLimitedError, priority
+from app.utils.ratelimit import RateLimiter, TokenBucket
+
+
+def wait_for_queue(gate, size, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while gate.stats()["queued"] < size:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def start_waiter(gate, priority_class, served):
+    def run():
+        with priority(priority_class):
+            acquired_at = gate.acquire()
+        served.append(priority_class)
+        gate.release(acquired_at)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_interactive_served_before_batch():
+    gate = AdmissionGate("test", "priority", limit=1, max_wait=5.0)
+    gate.hold_time = 0.01
+    held = gate.acquire()
+    served = []
+
+    # batch 가 먼저 줄을 서도 interactive 가 먼저 자리를 받음
+    threads = [start_waiter(gate, "batch", served)]
+    wait_for_queue(gate, 1)
+    threads.append(start_waiter(gate, "interactive", served))
+    wait_for_queue(gate, 2)
+
+    gate.release(held)
+    for thread in threads:
+        thread.join(2.0)
+    assert served == ["interactive", "batch"]
+    assert gate.stats()["inflight"] == 0
+
+
+def test_timed_out_waiter_does_not_leak_slot():
+    gate = AdmissionGate("test", "timeout", limit=1, max_wait=0.1)
+    gate.hold_time = 0.01
+    held = gate.acquire()
+
+    with pytest.raises(RateLimitedError) as error:
+        gate.acquire()
+    assert error.value.status_code == 429
+    assert error.value.retry_after >= 1
+
+    gate.release(held)
+    stats = gate.stats()
+    assert stats["inflight"] == 0
+    assert stats["queued"] == 0
+    # 자리가 남아 있으므로 바로 다시 받을 수 있음
+    gate.release(gate.acquire())
+
+
+def test_granted_then_abandoned_waiter_returns_slot():
+    gate = AdmissionGate("test", "abandon", limit=1, max_wait=5.0)
+    gate.hold_time = 0.01
+    held = gate.acquire()
+
+    async def give_up():
+        task = asyncio.ensure_future(gate.acquire_async())
+        while gate.stats()["queued"] < 1:
+            await asyncio.sleep(0.005)
+        # 자리를 넘겨받은 직후에 취소되어도 자리는 반납되어야 함
+        gate.release(held)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(give_up())
+    assert gate.stats()["inflight"] == 0
+
+
+def test_queue_full_rejects_immediately():
+    gate = AdmissionGate("test", "full", limit=1, max_wait=0.5)
+    gate.hold_time = 2.0
+    held = gate.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(RateLimitedError) as error:
+        gate.acquire()
+    assert time.monotonic() - started < 0.1
+    assert error.value.retry_after >= 2
+    gate.release(held)
+
+
+def test_retry_after_is_at_least_one_second():
+    assert RateLimitedError("busy", retry_after=0.01).retry_after == 1
+    assert RateLimitedError("busy", retry_after=0).retry_after == 1
+    assert RateLimitedError("busy", retry_after=2.1).retry_after == 3
+
+
+def test_token_bucket_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2.0, burst=3)
+
+    assert [bucket.take(1) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(1) == pytest.approx(0.5)
+
+    now[0] += 0.5
+    assert bucket.take(1) == 0
+    # 오래 쉬어도 burst 이상으로는 쌓이지 않음
+    now[0] += 60
+    assert [bucket.take(1) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(2) == pytest.approx(1.0)
+
+
+def test_rate_limiter_rejects_per_client(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(per_minute=60, burst=2)
+
+    limiter.check("a")
+    limiter.check("a")
+    with pytest.raises(RateLimitedError) as error:
+        limiter.check("a")
+    assert error.value.retry_after >= 1
+    limiter.check("b")
+
+    now[0] += 1.0
+    limiter.check("a")
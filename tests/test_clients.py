@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from app.utils.clients import ClientRegistry
+from app.utils.fake_clients import (
+    FakeG4FClient,
+    FakeG4FAsyncClient,
+    FakeUpstreamError,
+    LatencyModel,
+)
+
+
+def failing_factory(client_class, created):
+    def factory():
+        created.append(client_class(LatencyModel(0, 0, failure_rate=1.0)))
+        return created[-1]
+
+    return factory
+
+
+def test_nested_call_error_recreates_client():
+    created = []
+    registry = ClientRegistry()
+    client = registry.register("g4f", failing_factory(FakeG4FClient, created))
+
+    with pytest.raises(FakeUpstreamError):
+        client.chat.completions.create(model="m", messages=[])
+    assert registry.health()["g4f"]["status"] == "pending"
+
+    with pytest.raises(FakeUpstreamError):
+        client.chat.completions.create(model="m", messages=[])
+    assert len(created) == 2
+
+
+def test_async_call_error_recreates_client():
+    created = []
+    registry = ClientRegistry()
+    client = registry.register("g4f_async", failing_factory(FakeG4FAsyncClient, created))
+
+    with pytest.raises(FakeUpstreamError):
+        asyncio.run(client.chat.completions.create(model="m", messages=[]))
+    assert registry.health()["g4f_async"]["status"] == "pending"
+
+
+def test_recreate_disabled_keeps_client():
+    created = []
+    registry = ClientRegistry()
+    client = registry.register(
+        "kiwi", failing_factory(FakeG4FClient, created), recreate_on_error=False
+    )
+
+    for _ in range(2):
+        with pytest.raises(FakeUpstreamError):
+            client.chat.completions.create(model="m", messages=[])
+    assert len(created) == 1
@@ -0,0 +1,44 @@
+import pytest
+from app.utils import jobs
+from app.utils.jobs import JobQueue, MemoryJobStore, check_callback_url
+from app.services.job_service import submit_job
+from app.exception import ValidationError
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1/hook",
+        "http://localhost:8080/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://[::ffff:127.0.0.1]/hook",
+        "ftp://example.com/hook",
+    ],
+)
+def test_callback_url_rejects_internal_addresses(url):
+    with pytest.raises(ValueError):
+        check_callback_url(url)
+
+
+def test_callback_url_allowlist():
+    check_callback_url("http://127.0.0.1/hook", allowed_hosts={"127.0.0.1"})
+    with pytest.raises(ValueError):
+        check_callback_url("http://example.com/hook", allowed_hosts={"127.0.0.1"})
+
+
+def test_submit_job_rejects_loopback_callback():
+    with pytest.raises(ValidationError):
+        submit_job("test", lambda: None, callback_url="http://127.0.0.1/hook")
+
+
+def test_notify_skips_loopback_callback(monkeypatch):
+    sent = []
+    monkeypatch.setattr(jobs._callback_opener, "open", lambda *a, **k: sent.append(a))
+
+    queue = JobQueue(MemoryJobStore())
+    job = queue.store.create("test", "http://127.0.0.1/hook")
+    queue._notify(job)
+
+    assert sent == []
@@ -0,0 +1,106 @@
+import pytest
+from app.utils.minhash import MinHashIndex, shingles
+from app.services import test_service
+
+THRESHOLD = 0.95
+
+ANSWER = (
+    "I usually go hiking on the weekends with my friends because it helps me "
+    "relax after a long week at work. We often choose a mountain near Seoul and "
+    "start early in the morning so that we can avoid the crowds. After reaching "
+    "the top we eat kimbap and take a lot of pictures of the view. On the way "
+    "down we sometimes stop at a small restaurant to eat pajeon and drink "
+    "makgeolli. Hiking is my favorite hobby because it keeps me healthy and I "
+    "can spend time with the people I care about."
+)
+OTHER = (
+    "My house is a small apartment in the city with two bedrooms and a tiny "
+    "kitchen. I live there with my younger sister and our cat. The living room "
+    "has a big window so it gets a lot of sunlight in the afternoon."
+)
+
+
+def signature(index, text):
+    return index.signature(shingles(text.lower().split(), 3))
+
+
+@pytest.fixture
+def index():
+    return MinHashIndex(num_perm=128, bands=32, maxsize=100)
+
+
+def test_identical_answer_matches(index):
+    index.add("a", signature(index, ANSWER), "feedback")
+    key, similarity, value = index.query(signature(index, ANSWER), THRESHOLD)
+    assert (key, similarity, value) == ("a", 1.0, "feedback")
+
+
+def test_near_identical_answer_matches(index):
+    index.add("a", signature(index, ANSWER), "feedback")
+    match = index.query(signature(index, ANSWER + " Thank you."), THRESHOLD)
+    assert match is not None
+    assert match[0] == "a"
+    assert THRESHOLD <= match[1] < 1.0
+
+
+def test_different_answer_does_not_match(index):
+    index.add("a", signature(index, ANSWER), "feedback")
+    assert index.query(signature(index, OTHER), THRESHOLD) is None
+    # 한 단어만 고친 재제출도 0.95 기준에서는 재사용하지 않음
+    edited = ANSWER.replace("kimbap", "sandwiches")
+    assert index.query(signature(index, edited), THRESHOLD) is None
+    assert (index.hits, index.misses) == (0, 2)
+
+
+def test_lru_eviction():
+    index = MinHashIndex(num_perm=128, bands=32, maxsize=1)
+    index.add("a", signature(index, ANSWER), "first")
+    index.add("b", signature(index, OTHER), "second")
+    assert len(index) == 1
+    assert index.query(signature(index, ANSWER), THRESHOLD) is None
+
+
+def test_index_persists_to_sqlite(tmp_path):
+    path = str(tmp_path / "index.sqlite3")
+    first = MinHashIndex(path, num_perm=128, bands=32)
+    first.add("a", signature(first, ANSWER), {"text": "feedback"})
+
+    restored = MinHashIndex(path, num_perm=128, bands=32)
+    match = restored.query(signature(restored, ANSWER), THRESHOLD)
+    assert match == ("a", 1.0, {"text": "feedback"})
+
+
+@pytest.fixture
+def feedback_service(monkeypatch):
+    calls = []
+
+    def evaluate(answer):
+        calls.append(answer)
+        return f"feedback for {len(calls)}"
+
+    monkeypatch.setattr(test_service, "evaluate_answer", evaluate)
+    monkeypatch.setattr(
+        test_service, "feedback_index", MinHashIndex(num_perm=128, bands=32)
+    )
+    monkeypatch.setattr(test_service, "NEAR_DUP_THRESHOLD", THRESHOLD)
+    return calls
+
+
+def test_feedback_not_reused_when_disabled(monkeypatch, feedback_service):
+    monkeypatch.setattr(test_service, "NEAR_DUP_ENABLED", False)
+
+    for _ in range(2):
+        result = test_service.get_feedback({"1": ANSWER}, "parallel")
+        assert result["reused"] == {}
+    assert len(feedback_service) == 2
+
+
+def test_feedback_reused_when_enabled(monkeypatch, feedback_service):
+    monkeypatch.setattr(test_service, "NEAR_DUP_ENABLED", True)
+
+    first = test_service.get_feedback({"1": ANSWER}, "parallel")
+    second = test_service.get_feedback({"1": ANSWER}, "parallel")
+    assert first["reused"] == {}
+    assert second["reused"] == {"1": 1.0}
+    assert second["feedback"] == first["feedback"]
+    assert len(feedback_service) == 1
@@ -0,0 +1,104 @@
+import os
+import pytest
+from app.config import JS_PATH, QUESTION_SECTION
+from app.utils.question_bank import QuestionBank, parse_questions_js
+from app.exception import ValidationError, NotFoundError
+
+FIXTURE = """export const questions = {
+  서베이: [
+    //가족
+    "가족을 묘사해 주세요.",
+    "친구를 묘사해 주세요.",
+
+    // 여가
+    "주말에 무엇을 하나요?",
+  ],
+  돌발: [
+    //날씨
+    "오늘 날씨는 어떤가요?", "어제 날씨는 어땠나요?"
+  ],
+};
+"""
+
+
+def write_fixture(path, content, mtime_ns=None):
+    path.write_text(content, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_parse_sections_and_categories():
+    questions, sections, categories = parse_questions_js(FIXTURE)
+
+    assert questions == (
+        "가족을 묘사해 주세요.",
+        "친구를 묘사해 주세요.",
+        "주말에 무엇을 하나요?",
+        "오늘 날씨는 어떤가요?",
+        "어제 날씨는 어땠나요?",
+    )
+    assert sections == {"서베이": (0, 1, 2), "돌발": (3, 4)}
+    assert categories == {
+        ("서베이", "가족"): (0, 1),
+        ("서베이", "여가"): (2,),
+        ("돌발", "날씨"): (3, 4),
+    }
+
+
+def test_bank_queries(tmp_path):
+    path = tmp_path / "Questions.js"
+    write_fixture(path, FIXTURE)
+    bank = QuestionBank(str(path))
+
+    assert bank.sections() == ["서베이", "돌발"]
+    assert bank.questions("돌발") == ["오늘 날씨는 어떤가요?", "어제 날씨는 어땠나요?"]
+    assert bank.categories("서베이") == {
+        "가족": ["가족을 묘사해 주세요.", "친구를 묘사해 주세요."],
+        "여가": ["주말에 무엇을 하나요?"],
+    }
+    sample = bank.sample("서베이", 4)
+    assert len(sample) == 3
+    assert set(sample) == set(bank.questions("서베이"))
+
+    with pytest.raises(ValidationError):
+        bank.questions("없는섹션")
+
+
+def test_reload_when_file_changes(tmp_path):
+    path = tmp_path / "Questions.js"
+    write_fixture(path, FIXTURE, mtime_ns=1_000_000_000)
+    bank = QuestionBank(str(path), check_interval=0)
+    assert len(bank.questions("서베이")) == 3
+
+    write_fixture(
+        path,
+        FIXTURE.replace('    "주말에 무엇을 하나요?",\n', ""),
+        mtime_ns=2_000_000_000,
+    )
+    assert len(bank.questions("서베이")) == 2
+
+
+def test_reload_waits_for_check_interval(tmp_path):
+    path = tmp_path / "Questions.js"
+    write_fixture(path, FIXTURE, mtime_ns=1_000_000_000)
+    bank = QuestionBank(str(path), check_interval=3600)
+    bank.load()
+
+    write_fixture(path, FIXTURE.replace("돌발", "롤플레이"), mtime_ns=2_000_000_000)
+    assert "돌발" in bank.sections()
+
+
+def test_missing_file(tmp_path):
+    bank = QuestionBank(str(tmp_path / "missing.js"))
+    with pytest.raises(NotFoundError):
+        bank.sections()
+
+
+def test_bundled_questions_parse():
+    # 실제 Questions.js 의 형식이 바뀌어 빈 세션이 나오지 않도록 확인
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    bank = QuestionBank(os.path.join(root, JS_PATH))
+    bank.load()
+    assert len(bank.questions(QUESTION_SECTION)) >= 4
+    categories = bank.categories(QUESTION_SECTION)
+    assert categories and all(categories.values())
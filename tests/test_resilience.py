@@ -0,0 +1,151 @@
+import time
+import asyncio
+import pytest
+from app.utils.fake_clients import (
+    FakeG4FClient,
+    FakeG4FAsyncClient,
+    FakeUpstreamError,
+    LatencyModel,
+)
+from app.utils.resilience import (
+    CircuitBreaker,
+    Upstream,
+    UpstreamTimeoutError,
+    UpstreamUnavailableError,
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def fake_client(latency=0.0, failure_rate=0.0, client_class=FakeG4FClient):
+    return client_class(LatencyModel(latency, 0, failure_rate))
+
+
+def complete(client):
+    return client.chat.completions.create(model="m", messages=MESSAGES)
+
+
+def make_upstream(name, providers, **kwargs):
+    options = dict(timeout=1.0, deadline=5.0, retries=0, backoff=0.0)
+    options.update(kwargs)
+    return Upstream(name, providers, **options)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_timeout_frees_slot_when_call_finishes():
+    upstream = make_upstream(
+        "test-timeout", {"slow": fake_client(latency=0.3)}, timeout=0.05, max_concurrency=1
+    )
+    gate = upstream.gates["slow"]
+
+    with pytest.raises(UpstreamTimeoutError):
+        upstream.call(complete)
+    # 포기한 호출이 끝날 때까지는 자리를 차지하고, 끝나면 반납
+    assert gate.stats()["inflight"] == 1
+    assert wait_until(lambda: gate.stats()["inflight"] == 0)
+
+
+def test_async_timeout_frees_slot():
+    upstream = make_upstream(
+        "test-timeout-async",
+        {"slow": fake_client(latency=0.3, client_class=FakeG4FAsyncClient)},
+        timeout=0.05,
+        max_concurrency=1,
+    )
+
+    with pytest.raises(UpstreamTimeoutError):
+        asyncio.run(upstream.call_async(complete))
+    assert upstream.gates["slow"].stats()["inflight"] == 0
+
+
+def test_breaker_opens_and_recloses():
+    client = fake_client(failure_rate=1.0)
+    upstream = make_upstream(
+        "test-breaker", {"model": client}, failure_threshold=2, reset_timeout=0.1
+    )
+    breaker = upstream.breakers["model"]
+
+    for _ in range(2):
+        with pytest.raises(FakeUpstreamError):
+            upstream.call(complete)
+    assert breaker.state == "open"
+    with pytest.raises(UpstreamUnavailableError):
+        upstream.call(complete)
+
+    # reset_timeout 이 지나면 시험 호출 하나가 성공하면서 다시 닫힘
+    client._latency.failure_rate = 0.0
+    time.sleep(0.15)
+    assert upstream.call(complete).choices[0].message.content
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_failover_to_next_model():
+    upstream = make_upstream(
+        "test-failover",
+        {"primary": fake_client(failure_rate=1.0), "fallback": fake_client()},
+    )
+    used = []
+
+    def tracked(client):
+        used.append(client)
+        return complete(client)
+
+    assert upstream.call(tracked).choices[0].message.content
+    assert used == [upstream.providers["primary"], upstream.providers["fallback"]]
+    assert upstream.breakers["primary"].failures == 1
+    assert upstream.breakers["fallback"].state == "closed"
+
+
+def test_async_failover_to_next_model():
+    upstream = make_upstream(
+        "test-failover-async",
+        {
+            "primary": fake_client(failure_rate=1.0, client_class=FakeG4FAsyncClient),
+            "fallback": fake_client(client_class=FakeG4FAsyncClient),
+        },
+    )
+
+    result = asyncio.run(upstream.call_async(complete))
+    assert result.choices[0].message.content
+    assert upstream.breakers["primary"].failures == 1
+
+
+def test_stream_fails_over_before_first_item():
+    upstream = make_upstream(
+        "test-stream",
+        {"primary": fake_client(failure_rate=1.0), "fallback": fake_client()},
+        max_concurrency=1,
+    )
+
+    chunks = list(
+        upstream.stream(
+            lambda client: client.chat.completions.create(
+                model="m", messages=MESSAGES, stream=True
+            )
+        )
+    )
+    assert chunks
+    assert all(gate.stats()["inflight"] == 0 for gate in upstream.gates.values())